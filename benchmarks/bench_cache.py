@@ -0,0 +1,77 @@
+"""
+benchmarks.bench_cache
+======================
+Registered benchmarks of the cache decorator's hit path and key building,
+against functools.lru_cache as a reference.
+
+Run from the repository root with `python -m devgizmos.bench -k bench_cache`.
+"""
+
+from functools import lru_cache
+
+from devgizmos import bench
+from devgizmos.decorators import cache
+
+
+@cache(128)
+def _cached_square(n):
+    return n * n
+
+
+@cache(128)
+def _cached_power(n, exponent=2):
+    return n**exponent
+
+
+@cache(128, key="freeze")
+def _cached_total(values):
+    return sum(values)
+
+
+@lru_cache(128)
+def _lru_square(n):
+    return n * n
+
+
+@bench.register(args=(7,))
+def cache_hit(n):
+    """
+    cache_hit
+    =========
+    A hit on a cache keyed by a single int.
+    """
+
+    return _cached_square(n)
+
+
+@bench.register(args=(7,), kwargs={"exponent": 3})
+def cache_hit_keyword(n, exponent):
+    """
+    cache_hit_keyword
+    =================
+    A hit on a cache called with a trailing keyword argument.
+    """
+
+    return _cached_power(n, exponent=exponent)
+
+
+@bench.register(args=([1, 2, 3],))
+def cache_hit_freeze(values):
+    """
+    cache_hit_freeze
+    ================
+    A hit on a cache whose list argument is frozen into the key.
+    """
+
+    return _cached_total(values)
+
+
+@bench.register(args=(7,))
+def lru_cache_hit(n):
+    """
+    lru_cache_hit
+    =============
+    A hit on functools.lru_cache, for reference.
+    """
+
+    return _lru_square(n)
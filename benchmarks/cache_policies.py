@@ -0,0 +1,104 @@
+"""
+benchmarks.cache_policies
+=========================
+Compares the hit ratios of the cache eviction policies on synthetic traces.
+
+Traces
+------
+- zipf: Keys drawn from a Zipf distribution, the typical skewed workload.
+- zipf+scan: The same Zipf workload with long scans over one-off keys mixed in.
+- loop: Repeated passes over slightly more keys than the cache holds.
+
+Run from the repository root with `python -m benchmarks.cache_policies`.
+"""
+
+from bisect import bisect
+from itertools import accumulate
+from random import Random
+
+from devgizmos.decorators import cache
+
+CACHE_SIZE = 500
+TRACE_LENGTH = 200_000
+KEY_SPACE = 50_000
+POLICIES = ("lru", "lfu", "tinylfu")
+
+
+def zipf_trace(rng, length, keys, skew=0.9):
+    """
+    zipf_trace
+    ==========
+    Returns a list of keys drawn from a Zipf distribution.
+    """
+
+    cumulative = list(accumulate(1 / (rank**skew) for rank in range(1, keys + 1)))
+    total = cumulative[-1]
+    return [bisect(cumulative, rng.random() * total) for _ in range(length)]
+
+
+def scan_trace(rng, length, keys, scan_every=20_000, scan_length=5_000):
+    """
+    scan_trace
+    ==========
+    Returns a Zipf trace with scans over one-off keys inserted periodically.
+    """
+
+    trace = []
+    next_scan_key = keys
+    for chunk in range(0, length, scan_every):
+        trace.extend(zipf_trace(rng, min(scan_every, length - chunk), keys))
+        trace.extend(range(next_scan_key, next_scan_key + scan_length))
+        next_scan_key += scan_length
+    return trace
+
+
+def loop_trace(length, keys):
+    """
+    loop_trace
+    ==========
+    Returns repeated passes over the given number of keys.
+    """
+
+    return [i % keys for i in range(length)]
+
+
+def hit_ratio(policy, trace):
+    """
+    hit_ratio
+    =========
+    Replays the trace through a cached function and returns its hit ratio.
+    """
+
+    @cache(CACHE_SIZE, policy=policy)
+    def lookup(key):
+        return key
+
+    for key in trace:
+        lookup(key)
+
+    return lookup.cache_info().hit_ratio
+
+
+def main():
+    """
+    main
+    ====
+    Prints a table of hit ratios for every policy and trace.
+    """
+
+    rng = Random(0)
+    traces = {
+        "zipf": zipf_trace(rng, TRACE_LENGTH, KEY_SPACE),
+        "zipf+scan": scan_trace(rng, TRACE_LENGTH, KEY_SPACE),
+        "loop": loop_trace(TRACE_LENGTH, CACHE_SIZE + CACHE_SIZE // 4),
+    }
+
+    print(f"cache size {CACHE_SIZE}, {TRACE_LENGTH} requests per trace")
+    print(f"{'trace':<12}" + "".join(f"{policy:>10}" for policy in POLICIES))
+    for name, trace in traces.items():
+        ratios = "".join(f"{hit_ratio(policy, trace):>10.2%}" for policy in POLICIES)
+        print(f"{name:<12}{ratios}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+benchmarks.cache_threads
+========================
+Compares the throughput of a single locked cache with a sharded cache
+as the number of threads calling it grows.
+
+Every thread replays its own Zipf trace through the same cached function,
+which is cheap to compute, so the time is dominated by the cache itself.
+On builds with the GIL, threads cannot run Python code in parallel and throughput
+stays roughly flat; the sharded cache mainly avoids convoys on its lock.
+On free-threaded builds, the sharded cache should scale with the number of threads.
+
+Run from the repository root with `python -m benchmarks.cache_threads`.
+"""
+
+import sys
+from random import Random
+from threading import Barrier, Thread
+from time import perf_counter
+
+from devgizmos.decorators import cache
+
+from .cache_policies import zipf_trace
+
+CACHE_SIZE = 5_000
+KEY_SPACE = 20_000
+CALLS_PER_THREAD = 100_000
+THREAD_COUNTS = (1, 2, 4, 8)
+SHARDS = 16
+
+
+def throughput(threads, **options):
+    """
+    throughput
+    ==========
+    Returns the calls per second of a cached function shared by the given number of threads.
+    """
+
+    @cache(CACHE_SIZE, thread_safe=True, **options)
+    def lookup(key):
+        return key
+
+    rng = Random(threads)
+    traces = [zipf_trace(rng, CALLS_PER_THREAD, KEY_SPACE) for _ in range(threads)]
+    barrier = Barrier(threads + 1)
+
+    def work(trace):
+        barrier.wait()
+        for key in trace:
+            lookup(key)
+
+    workers = [Thread(target=work, args=(trace,)) for trace in traces]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - start
+
+    return threads * CALLS_PER_THREAD / elapsed
+
+
+def main():
+    """
+    main
+    ====
+    Prints a table of calls per second for every thread count.
+    """
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, "
+        f"cache size {CACHE_SIZE}, {CALLS_PER_THREAD} calls per thread"
+    )
+    print(f"{'threads':<10}{'locked':>14}{f'{SHARDS} shards':>14}{'ratio':>10}")
+    for threads in THREAD_COUNTS:
+        locked = throughput(threads)
+        sharded = throughput(threads, shards=SHARDS)
+        print(f"{threads:<10}{locked:>14,.0f}{sharded:>14,.0f}{sharded / locked:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+"""
+bench.__bench
+=============
+Module containing the benchmark registry and the suite runner used by the command line interface.
+"""
+
+# --imports-- #
+import sys
+from asyncio import run as run_async
+from fnmatch import fnmatchcase
+from importlib import import_module
+from inspect import iscoroutinefunction
+from os import getcwd, path, sep
+from pkgutil import walk_packages
+
+from ..checks import check_in_bounds, check_type, check_value
+from ..decorators.__benchmarking import (
+    TIME_UNITS,
+    BenchmarkResult,
+    _compare_baseline,
+    _measure_memory,
+    _measure_memory_async,
+    _run_benchmark,
+    _run_benchmark_async,
+    _write_baseline,
+    environment,
+)
+
+# --consts-- #
+# every benchmark registered so far, keyed by its full name
+_REGISTRY = {}
+
+
+# --registry-- #
+class _Benchmark:
+    """
+    _Benchmark
+    ==========
+    A registered benchmark: a function along with the arguments and settings to run it with.
+    """
+
+    __slots__ = (
+        "name",
+        "func",
+        "args",
+        "kwargs",
+        "trials",
+        "warmup",
+        "loops",
+        "unit",
+        "memory",
+    )
+
+    def __init__(self, name, func, args, kwargs, trials, warmup, loops, unit, memory):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.trials = trials
+        self.warmup = warmup
+        self.loops = loops
+        self.unit = unit
+        self.memory = memory
+
+    def run(self, repeat=1, trials=None, unit=None, memory=False):
+        """
+        run
+        ===
+        Runs the benchmark repeat times, pooling the trials of every repetition into one result.
+        Repetitions reuse the number of loops calibrated by the first one, so their times are comparable.
+        Memory is measured once afterwards, if enabled here or at registration.
+        Coroutine functions are run in a new event loop.
+        """
+
+        loops = self.loops
+        times = []
+        result = None
+        for _ in range(repeat):
+            options = {
+                "trials": trials or self.trials,
+                "warmup": self.warmup,
+                "loops": loops,
+                "unit": unit or self.unit,
+            }
+            if iscoroutinefunction(self.func):
+                # each repetition gets its own event loop, like a standalone script
+                result = run_async(
+                    _run_benchmark_async(self.func, self.args, self.kwargs, **options)
+                )
+            else:
+                result = _run_benchmark(self.func, self.args, self.kwargs, **options)
+            loops = result.loops
+            times.extend(result.times)
+
+        measurements = None
+        if memory or self.memory:
+            calls = (self.func, self.args, self.kwargs, trials or self.trials)
+            if iscoroutinefunction(self.func):
+                measurements = run_async(_measure_memory_async(*calls))
+            else:
+                measurements = _measure_memory(*calls)
+
+        return BenchmarkResult(
+            self.name,
+            result.returned,
+            times,
+            result.unit,
+            loops,
+            self.warmup,
+            memory=measurements,
+        )
+
+
+def register(
+    name=None,
+    *,
+    args=(),
+    kwargs=None,
+    trials=10,
+    warmup=1,
+    loops=None,
+    unit="ns",
+    memory=False,
+):
+    """
+    register
+    ========
+    Registers the function it decorates as a benchmark of the suite, to be run by run
+    or the command line interface (python -m devgizmos.bench).
+    The function itself is returned unchanged. Coroutine functions are supported
+    and are run in a new event loop, so the suite must not be run from a running one.
+
+    Parameters
+    ----------
+    :param name: The name of the benchmark, defaults to None.
+    - Leave as None to use the module and qualified name of the function.\n
+    :type name: str | None, optional
+    :param args: The arguments to call the function with, defaults to ().
+    :type args: Tuple[Any, ...], optional
+    :param kwargs: The keyword arguments to call the function with, defaults to None.
+    :type kwargs: Dict[str, Any] | None, optional
+    :param trials: The number of timed trials, defaults to 10.
+    :type trials: int, optional
+    :param warmup: The number of untimed calls made before the trials, defaults to 1.
+    :type warmup: int, optional
+    :param loops: The number of calls timed together in each trial, defaults to None.
+    - Leave as None to calibrate it automatically.\n
+    :type loops: int | None, optional
+    :param unit: The unit of time to use, defaults to "ns".
+    - Supported units are "ns", "us", "ms", "s".\n
+    :type unit: Literal["ns", "us", "ms", "s"], optional
+    :param memory: Whether to also measure the memory allocated per call, defaults to False.
+    :type memory: bool, optional
+
+    Raises
+    ------
+    :raises TypeError: If name is not a str or None.
+    :raises TypeError: If args is not a tuple.
+    :raises TypeError: If kwargs is not a dict or None.
+    :raises TypeError: If trials or warmup is not an int.
+    :raises TypeError: If loops is not an int or None.
+    :raises TypeError: If memory is not a bool.
+    :raises ValueError: If trials is less than 1.
+    :raises ValueError: If warmup is less than 0.
+    :raises ValueError: If loops is less than 1.
+    :raises ValueError: If unit is not 'ns', 'us', 'ms', or 's'.
+
+    Example Usage
+    -------------
+    ```python
+    >>> # benchmarks/bench_sorting.py
+    >>> from random import random
+    >>>
+    >>> from devgizmos import bench
+    >>>
+    >>> DATA = [random() for _ in range(10_000)]
+    >>>
+    >>> @bench.register(args=(DATA,), unit="us")
+    ... def sort_floats(data):
+    ...     return sorted(data)
+    ...
+    ```
+    """
+
+    # type checks
+    check_type(name, str, optional=True)
+    check_type(args, tuple)
+    check_type(kwargs, dict, optional=True)
+    check_type(trials, int)
+    check_type(warmup, int)
+    check_type(loops, int, optional=True)
+    check_type(memory, bool)
+
+    # value checks
+    check_in_bounds(trials, 1, None)
+    check_in_bounds(warmup, 0, None)
+    if loops is not None:
+        check_in_bounds(loops, 1, None)
+    check_value(unit, TIME_UNITS)
+
+    def decorator(func):
+        full_name = name or f"{func.__module__}.{func.__qualname__}"
+        # registering a name again (such as when a module is reloaded) replaces it
+        _REGISTRY[full_name] = _Benchmark(
+            full_name, func, args, kwargs or {}, trials, warmup, loops, unit, memory
+        )
+        return func
+
+    return decorator
+
+
+def _matches(name, patterns):
+    # a pattern matches if it is part of the name, or if the whole name matches it as a glob
+    return not patterns or any(
+        pattern in name or fnmatchcase(name, pattern) for pattern in patterns
+    )
+
+
+def registered(patterns=()):
+    """
+    registered
+    ==========
+    Returns the names of the registered benchmarks, sorted.
+
+    Parameters
+    ----------
+    :param patterns: Only include names containing one of these strings or matching one of
+    these glob patterns, defaults to ().
+    - Leave empty to include every benchmark.\n
+    :type patterns: Iterable[str], optional
+
+    Return
+    ------
+    :return: The names of the benchmarks.
+    :rtype: List[str]
+    """
+
+    patterns = tuple(patterns)
+    return sorted(name for name in _REGISTRY if _matches(name, patterns))
+
+
+# --discovery-- #
+def discover(target, pattern="bench*"):
+    """
+    discover
+    ========
+    Imports the modules containing benchmarks so that they register themselves.
+
+    Parameters
+    ----------
+    :param target: A module or package name, or the path of a python file or directory
+    relative to the current working directory.
+    - Every module inside a package or directory whose name matches pattern is imported too.\n
+    :type target: str
+    :param pattern: The glob pattern module names inside packages must match, defaults to "bench*".
+    :type pattern: str, optional
+
+    Raises
+    ------
+    :raises TypeError: If target or pattern is not a str.
+    :raises ImportError: If a module cannot be imported.
+
+    Return
+    ------
+    :return: The names of the imported modules.
+    :rtype: List[str]
+
+    Example Usage
+    -------------
+    ```python
+    >>> discover("benchmarks")
+    ['benchmarks', 'benchmarks.bench_cache']
+    ```
+    """
+
+    # type checks
+    check_type(target, str)
+    check_type(pattern, str)
+
+    if path.exists(target):
+        # paths are imported as modules relative to the working directory, like python -m does
+        cwd = getcwd()
+        if cwd not in sys.path:
+            sys.path.insert(0, cwd)
+        if target.endswith(".py"):
+            target = target[:-3]
+        target = path.relpath(target).replace(sep, ".")
+
+    module = import_module(target)
+    imported = [module.__name__]
+
+    if hasattr(module, "__path__"):
+        for info in walk_packages(module.__path__, f"{module.__name__}."):
+            if fnmatchcase(info.name.rsplit(".", 1)[-1], pattern):
+                import_module(info.name)
+                imported.append(info.name)
+
+    return imported
+
+
+# --running-- #
+def run(patterns=(), *, repeat=1, trials=None, unit=None, memory=False):
+    """
+    run
+    ===
+    Runs the registered benchmarks.
+
+    Parameters
+    ----------
+    :param patterns: Only run benchmarks whose names contain one of these strings
+    or match one of these glob patterns, defaults to ().
+    - Leave empty to run every benchmark.\n
+    :type patterns: Iterable[str], optional
+    :param repeat: The number of times to run each benchmark, pooling their trials, defaults to 1.
+    :type repeat: int, optional
+    :param trials: The number of trials to override every benchmark's with, defaults to None.
+    :type trials: int | None, optional
+    :param unit: The unit of time to override every benchmark's with, defaults to None.
+    :type unit: Literal["ns", "us", "ms", "s"] | None, optional
+    :param memory: Whether to measure the memory of every benchmark,
+    rather than only of those registered with memory=True, defaults to False.
+    :type memory: bool, optional
+
+    Raises
+    ------
+    :raises TypeError: If repeat is not an int.
+    :raises TypeError: If trials is not an int or None.
+    :raises TypeError: If memory is not a bool.
+    :raises ValueError: If repeat or trials is less than 1.
+    :raises ValueError: If unit is not 'ns', 'us', 'ms', 's', or None.
+
+    Return
+    ------
+    :return: The results keyed by benchmark name, in name order.
+    :rtype: Dict[str, BenchmarkResult]
+    """
+
+    # type checks
+    check_type(repeat, int)
+    check_type(trials, int, optional=True)
+    check_type(memory, bool)
+
+    # value checks
+    check_in_bounds(repeat, 1, None)
+    if trials is not None:
+        check_in_bounds(trials, 1, None)
+    if unit is not None:
+        check_value(unit, TIME_UNITS)
+
+    return {
+        name: _REGISTRY[name].run(repeat, trials, unit, memory)
+        for name in registered(patterns)
+    }
+
+
+def compare_to_baseline(results, filepath, threshold=0.05):
+    """
+    compare_to_baseline
+    ===================
+    Compares results against the results of the same names stored in a baseline file,
+    emitting a RegressionWarning for each one that is significantly slower by more than threshold.
+
+    Parameters
+    ----------
+    :param results: The results keyed by benchmark name, as returned by run.
+    :type results: Dict[str, BenchmarkResult]
+    :param filepath: The path of the baseline file.
+    :type filepath: str
+    :param threshold: The tolerated slowdown, defaults to 0.05 (5%).
+    :type threshold: int | float, optional
+
+    Raises
+    ------
+    :raises TypeError: If filepath is not a str.
+    :raises TypeError: If threshold is not an int or float.
+    :raises ValueError: If threshold is negative.
+
+    Return
+    ------
+    :return: The comparisons of the results that have a baseline, keyed by benchmark name.
+    :rtype: Dict[str, Comparison]
+    """
+
+    # type checks
+    check_type(filepath, str)
+    check_type(threshold, (int, float))
+
+    # value checks
+    check_in_bounds(threshold, 0, None)
+
+    comparisons = {}
+    for name, result in results.items():
+        comparison = _compare_baseline(result, filepath, threshold, 0.05, stacklevel=3)
+        if comparison is not None:
+            comparisons[name] = comparison
+    return comparisons
+
+
+def write_results(filepath, results):
+    """
+    write_results
+    =============
+    Writes results with the current environment to a JSON or CSV file, replacing it.
+    The file has the format of baseline files, so it can be used as the baseline of later runs.
+
+    Parameters
+    ----------
+    :param filepath: The path of the file.
+    - Files ending in .csv are written as CSV, others as JSON.\n
+    :type filepath: str
+    :param results: The results keyed by benchmark name, as returned by run.
+    :type results: Dict[str, BenchmarkResult]
+
+    Raises
+    ------
+    :raises TypeError: If filepath is not a str.
+    """
+
+    # type checks
+    check_type(filepath, str)
+
+    entries = {name: result.as_dict() for name, result in results.items()}
+    _write_baseline(filepath, environment(), entries)
+
+
+def format_table(results, comparisons=None):
+    """
+    format_table
+    ============
+    Formats results as a plain text summary table.
+
+    Parameters
+    ----------
+    :param results: The results keyed by benchmark name, as returned by run.
+    :type results: Dict[str, BenchmarkResult]
+    :param comparisons: Comparisons against a baseline to add a column for, defaults to None.
+    :type comparisons: Dict[str, Comparison] | None, optional
+
+    Return
+    ------
+    :return: The table.
+    :rtype: str
+
+    Example Usage
+    -------------
+    ```python
+    >>> print(format_table(run(["lru"])))
+    benchmark                             trials  loops  median      mean ± 95% CI       stdev  p99      outliers
+    benchmarks.bench_cache.lru_cache_hit  10      6814   349.752 ns  349.594 ± 1.099 ns  1.537  351.711  0
+    ```
+    """
+
+    headers = [
+        "benchmark",
+        "trials",
+        "loops",
+        "median",
+        "mean ± 95% CI",
+        "stdev",
+        "p99",
+        "outliers",
+    ]
+    memory = any(result.peak_memory is not None for result in results.values())
+    if memory:
+        headers += ["peak memory", "net memory", "blocks"]
+    if comparisons is not None:
+        headers.append("vs baseline")
+
+    rows = [headers]
+    for name, result in results.items():
+        margin = round(result.ci_high - result.mean, 3)
+        row = [
+            name,
+            str(result.trials),
+            str(result.loops),
+            f"{result.median} {result.unit}",
+            f"{result.mean} ± {margin} {result.unit}",
+            str(result.stdev),
+            str(result.p99),
+            str(result.outliers),
+        ]
+        if memory and result.peak_memory is None:
+            row += ["-", "-", "-"]
+        elif memory:
+            row += [
+                f"{result.peak_memory} B",
+                f"{result.net_memory} B",
+                str(result.blocks),
+            ]
+        if comparisons is not None:
+            comparison = comparisons.get(name)
+            if comparison is None:
+                row.append("-")
+            elif not comparison.significant:
+                row.append(f"~ (p={comparison.p_value:.3g})")
+            else:
+                row.append(f"{comparison.speedup:.3f}x (p={comparison.p_value:.3g})")
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(headers))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    )
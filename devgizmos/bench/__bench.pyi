@@ -0,0 +1,50 @@
+# pylint: disable=all
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ..decorators.__benchmarking import BenchmarkResult, Comparison
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+def register(
+    name: Optional[str] = None,
+    *,
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    trials: int = 10,
+    warmup: int = 1,
+    loops: Optional[int] = None,
+    unit: Literal["ns", "us", "ms", "s"] = "ns",
+    memory: bool = False,
+) -> Callable[[F], F]: ...
+def registered(patterns: Iterable[str] = ()) -> List[str]: ...
+def discover(target: str, pattern: str = "bench*") -> List[str]: ...
+def run(
+    patterns: Iterable[str] = (),
+    *,
+    repeat: int = 1,
+    trials: Optional[int] = None,
+    unit: Optional[Literal["ns", "us", "ms", "s"]] = None,
+    memory: bool = False,
+) -> Dict[str, BenchmarkResult[Any]]: ...
+def compare_to_baseline(
+    results: Dict[str, BenchmarkResult[Any]],
+    filepath: str,
+    threshold: Union[int, float] = 0.05,
+) -> Dict[str, Comparison]: ...
+def write_results(filepath: str, results: Dict[str, BenchmarkResult[Any]]) -> None: ...
+def format_table(
+    results: Dict[str, BenchmarkResult[Any]],
+    comparisons: Optional[Dict[str, Comparison]] = None,
+) -> str: ...
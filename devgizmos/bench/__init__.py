@@ -0,0 +1,40 @@
+"""
+bench
+=====
+Module containing a registry of benchmarks and a suite runner,
+also usable from the command line with `python -m devgizmos.bench`.
+
+Built-in Utilizations
+---------------------
+This module utilizes the following functionality from built-in modules/packages:
+argparse
+- ArgumentParser\n
+asyncio
+- run\n
+fnmatch
+- fnmatchcase\n
+importlib
+- import_module\n
+inspect
+- iscoroutinefunction\n
+os
+- getcwd
+- path
+- sep\n
+pkgutil
+- walk_packages\n
+sys
+- exit
+- path
+- stderr
+"""
+
+from .__bench import (
+    compare_to_baseline,
+    discover,
+    format_table,
+    register,
+    registered,
+    run,
+    write_results,
+)
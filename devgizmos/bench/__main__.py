@@ -0,0 +1,156 @@
+"""
+bench.__main__
+==============
+Command line interface running the benchmark suite.
+
+Usage
+-----
+python -m devgizmos.bench [targets ...] [-p PATTERN] [-k FILTER] [--repeat N] [--trials N] [--unit UNIT]
+[--memory] [--output FILE] [--baseline FILE] [--threshold FRACTION] [--list]
+
+Exits with status 1 if no benchmarks were found or if any regressed against the baseline.
+"""
+
+# --imports-- #
+import sys
+from argparse import ArgumentParser
+from os import path
+
+from ..decorators.__benchmarking import TIME_UNITS
+from .__bench import (
+    compare_to_baseline,
+    discover,
+    format_table,
+    registered,
+    run,
+    write_results,
+)
+
+
+# --cli-- #
+def _parser():
+    parser = ArgumentParser(
+        prog="python -m devgizmos.bench",
+        description="Discovers, runs, and summarizes registered benchmarks.",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        default=["benchmarks"],
+        help="modules, packages, or paths to discover benchmarks in (default: benchmarks)",
+    )
+    parser.add_argument(
+        "-p",
+        "--pattern",
+        default="bench*",
+        help="glob pattern of the module names imported inside packages (default: bench*)",
+    )
+    parser.add_argument(
+        "-k",
+        dest="filters",
+        action="append",
+        default=[],
+        help="only run benchmarks whose names contain this string or match this glob "
+        "(can be repeated)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=1,
+        help="number of times to run each benchmark, pooling their trials (default: 1)",
+    )
+    parser.add_argument(
+        "-t",
+        "--trials",
+        type=int,
+        help="override the number of trials of every benchmark",
+    )
+    parser.add_argument(
+        "-u", "--unit", choices=TIME_UNITS, help="override the unit of every benchmark"
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        action="store_true",
+        help="also measure the memory allocated per call by every benchmark",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="write the results to this JSON or CSV file (by extension), "
+        "usable as a later baseline",
+    )
+    parser.add_argument(
+        "-b", "--baseline", help="compare the results against this JSON or CSV file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="tolerated slowdown against the baseline as a fraction (default: 0.05)",
+    )
+    parser.add_argument(
+        "-l",
+        "--list",
+        action="store_true",
+        help="list the matching benchmarks without running them",
+    )
+    return parser
+
+
+def main(argv=None):
+    """
+    main
+    ====
+    Runs the command line interface with the given arguments, returning the exit status.
+    """
+
+    parser = _parser()
+    options = parser.parse_args(argv)
+
+    for target in options.targets:
+        try:
+            discover(target, options.pattern)
+        except ImportError as exc:
+            parser.error(f"cannot import {target}: {exc}")
+
+    names = registered(options.filters)
+    if not names:
+        print("no benchmarks found", file=sys.stderr)
+        return 1
+
+    if options.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(
+        options.filters,
+        repeat=options.repeat,
+        trials=options.trials,
+        unit=options.unit,
+        memory=options.memory,
+    )
+
+    comparisons = None
+    if options.baseline is not None and path.exists(options.baseline):
+        comparisons = compare_to_baseline(results, options.baseline, options.threshold)
+
+    print(format_table(results, comparisons))
+
+    if options.output is not None:
+        write_results(options.output, results)
+
+    regressions = [
+        name
+        for name, comparison in (comparisons or {}).items()
+        if comparison.is_regression(options.threshold)
+    ]
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,782 @@
+"""
+decorators.__backends
+=====================
+Module containing second tier storage backends for the cache decorator.
+"""
+
+# --imports-- #
+from contextlib import contextmanager
+from hashlib import blake2b
+from io import BytesIO
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import path as os_path
+from pickle import HIGHEST_PROTOCOL, Pickler, PicklingError, dumps, loads
+from platform import system
+from sqlite3 import connect
+from struct import Struct
+from tempfile import gettempdir
+from threading import Lock
+from time import time
+
+if system() in ("Darwin", "Linux"):
+    # pylint: disable=no-name-in-module
+    from fcntl import LOCK_EX, LOCK_SH, LOCK_UN, flock  # type: ignore
+elif system() == "Windows":
+    # pylint: disable=no-name-in-module
+    from msvcrt import LK_LOCK, LK_UNLCK, locking  # type: ignore
+
+from .__keys import _canonical
+
+# --consts-- #
+# magic, slot count, data region size, next free data offset
+_SHM_HEADER = Struct("<8sQQQ")
+# state, value kind, tag count, namespace hash, key digest, data offset, value length, expiry time;
+# the data of a slot is the digests of its tags followed by its value
+_SHM_SLOT = Struct("<BBB5x8s16sQQd")
+_TAG_SIZE = 16
+_SHM_MAGIC = b"DGZSHM01"
+_SLOT_EMPTY, _SLOT_USED, _SLOT_DELETED = 0, 1, 2
+_VALUE_RAW, _VALUE_PICKLED = 0, 1
+
+
+# --helpers-- #
+def _digest(key):
+    """
+    _digest
+    =======
+    Computes a stable hash of a cache key so it can be shared between processes.
+
+    Parameters
+    ----------
+    :param key: The cache key to hash.
+    :type key: Hashable
+
+    Return
+    ------
+    :return: A 16 byte digest of the pickled key, or None if the key cannot be pickled.
+    :rtype: bytes | None
+    """
+
+    # pickle memoizes by identity, so (a, a) and (a, b) with a == b would pickle differently;
+    # fast mode disables the memo, and frozensets, which pickle in hash order, are sorted
+    buffer = BytesIO()
+    pickler = Pickler(buffer, protocol=4)
+    pickler.fast = True
+    try:
+        pickler.dump(_stable(key))
+    except (PicklingError, TypeError, AttributeError, ValueError, RecursionError):
+        return None
+
+    return blake2b(buffer.getbuffer(), digest_size=16).digest()
+
+
+def _stable(key):
+    # recursively replaces the frozensets in a key by sorted tuples tagged with their type,
+    # since their order depends on the per-process hash seed
+    if isinstance(key, (tuple, list)):
+        return tuple([_stable(value) for value in key])
+    if isinstance(key, frozenset):
+        return (frozenset, _canonical(_stable(value) for value in key))
+    return key
+
+
+class _Segment(SharedMemory):
+    """
+    _Segment
+    ========
+    A SharedMemory that does not complain when garbage collected while memoryviews of it are
+    still alive, which is normal for cached values at interpreter exit.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+# --backends-- #
+class DiskStore:
+    """
+    DiskStore
+    =========
+    A sqlite database used by the cache decorator as a persistent second tier.
+    Results stored by one process can be reused by later runs and by sibling processes.
+    """
+
+    def __init__(self, path, *, timeout=5.0):
+        """
+        DiskStore
+        =========
+        A sqlite database used by the cache decorator as a persistent second tier.
+        Results stored by one process can be reused by later runs and by sibling processes.
+
+        Parameters
+        ----------
+        :param path: The path to the database file.
+        - The file is created if it does not exist.\n
+        :type path: str | os.PathLike
+        :param timeout: The time in seconds to wait for another process to release the database,
+        defaults to 5.0.
+        :type timeout: int | float, optional
+
+        Example Usage
+        -------------
+        ```python
+        >>> store = DiskStore("results.sqlite")
+        >>>
+        >>> @cache(backend=store)
+        ... def slow_square(x):
+        ...     sleep(5)
+        ...     return x ** 2
+        ...
+        >>> slow_square(3)  # takes 5 seconds, but only the first time in any process
+        9
+        ```
+        """
+
+        self.path = path
+
+        self._lock = Lock()
+        self._conn = connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS devgizmos_cache ("
+            "namespace TEXT NOT NULL, key BLOB NOT NULL, value BLOB NOT NULL, expires REAL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        # the tags of each value, so that values stored by any process can be invalidated by tag
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS devgizmos_cache_tags ("
+            "namespace TEXT NOT NULL, tag BLOB NOT NULL, key BLOB NOT NULL, "
+            "PRIMARY KEY (namespace, tag, key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS devgizmos_cache_tags_key "
+            "ON devgizmos_cache_tags (namespace, key)"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # autocommit is on, so statements that must apply together are wrapped explicitly
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get(self, namespace, key):
+        """
+        get
+        ===
+        Returns the value stored under key along with its remaining time to live.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+
+        Return
+        ------
+        :return: A tuple of the value and its remaining ttl (or None if it never expires),
+        or None if the key is missing or expired.
+        :rtype: Tuple[Any, float | None] | None
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM devgizmos_cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        blob, expires = row
+        remaining = None
+        if expires is not None:
+            remaining = expires - time()
+            if remaining <= 0:
+                self.delete(namespace, key)
+                return None
+
+        try:
+            return loads(blob), remaining
+        # values written by incompatible code are treated as missing
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.delete(namespace, key)
+            return None
+
+    def set(self, namespace, key, value, ttl=None, tags=()):
+        """
+        set
+        ===
+        Stores value under key. Values that cannot be pickled are skipped.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+        :param value: The value to store.
+        :type value: Any
+        :param ttl: The time in seconds the value lives for, defaults to None.
+        - Enter None for a value that never expires.\n
+        :type ttl: int | float | None, optional
+        :param tags: The digests of the value's tags, defaults to ().
+        :type tags: Iterable[bytes], optional
+
+        Return
+        ------
+        :return: True if the value was stored, otherwise False.
+        :rtype: bool
+        """
+
+        try:
+            blob = dumps(value, protocol=HIGHEST_PROTOCOL)
+        except (PicklingError, TypeError, AttributeError):
+            return False
+
+        expires = None if ttl is None else time() + ttl
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO devgizmos_cache VALUES (?, ?, ?, ?)",
+                (namespace, key, blob, expires),
+            )
+            conn.execute(
+                "DELETE FROM devgizmos_cache_tags WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO devgizmos_cache_tags VALUES (?, ?, ?)",
+                [(namespace, tag, key) for tag in tags],
+            )
+
+        return True
+
+    def delete(self, namespace, key):
+        """
+        delete
+        ======
+        Removes the value stored under key, if any.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+        """
+
+        with self._transaction() as conn:
+            for table in ("devgizmos_cache", "devgizmos_cache_tags"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                )
+
+    def delete_tagged(self, namespace, tag):
+        """
+        delete_tagged
+        =============
+        Removes every value stored with the given tag, by any process.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param tag: The digest of the tag.
+        :type tag: bytes
+
+        Return
+        ------
+        :return: The number of values removed.
+        :rtype: int
+        """
+
+        with self._transaction() as conn:
+            keys = [
+                (namespace, key)
+                for (key,) in conn.execute(
+                    "SELECT key FROM devgizmos_cache_tags WHERE namespace = ? AND tag = ?",
+                    (namespace, tag),
+                )
+            ]
+            removed = 0
+            for params in keys:
+                removed += conn.execute(
+                    "DELETE FROM devgizmos_cache WHERE namespace = ? AND key = ?", params
+                ).rowcount
+            conn.executemany(
+                "DELETE FROM devgizmos_cache_tags WHERE namespace = ? AND key = ?", keys
+            )
+
+        return removed
+
+    def clear(self, namespace=None):
+        """
+        clear
+        =====
+        Removes every value stored in the namespace.
+
+        Parameters
+        ----------
+        :param namespace: The namespace to clear, defaults to None.
+        - Enter None to clear every namespace.\n
+        :type namespace: str | None, optional
+        """
+
+        with self._transaction() as conn:
+            for table in ("devgizmos_cache", "devgizmos_cache_tags"):
+                if namespace is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE namespace = ?", (namespace,))
+
+    def expire(self):
+        """
+        expire
+        ======
+        Removes every expired value.
+
+        Return
+        ------
+        :return: The number of values removed.
+        :rtype: int
+        """
+
+        with self._transaction() as conn:
+            removed = conn.execute(
+                "DELETE FROM devgizmos_cache WHERE expires <= ?", (time(),)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM devgizmos_cache_tags WHERE NOT EXISTS ("
+                "SELECT 1 FROM devgizmos_cache WHERE devgizmos_cache.namespace = "
+                "devgizmos_cache_tags.namespace AND devgizmos_cache.key = devgizmos_cache_tags.key)"
+            )
+
+        return removed
+
+    def close(self):
+        """
+        close
+        =====
+        Closes the database connection.
+        """
+
+        with self._lock:
+            self._conn.close()
+
+
+class SharedMemoryStore:
+    """
+    SharedMemoryStore
+    =================
+    A hash table in a named multiprocessing.shared_memory segment, used by the cache decorator
+    as a second tier shared by every process on the host, such as the workers of a process pool.
+    Bytes-like values are stored as is and read back zero-copy as read-only memoryviews;
+    other values are pickled.
+    """
+
+    def __init__(self, name, size=64 * 1024 * 1024, *, slots=65536):
+        """
+        SharedMemoryStore
+        =================
+        A hash table in a named multiprocessing.shared_memory segment, used by the cache decorator
+        as a second tier shared by every process on the host, such as the workers of a process pool.
+        Bytes-like values are stored as is and read back zero-copy as read-only memoryviews;
+        other values are pickled.
+
+        On Unix, the segment is kept until unlink() is called, even after every process has closed it.
+        Data is only appended, so overwritten and deleted values keep their space until clear() is called.
+        Once the data region or the slot table is full, new values are skipped.
+        Memoryviews returned by get() must be released before close() and are invalidated by clear().
+
+        Parameters
+        ----------
+        :param name: The name of the shared memory segment.
+        - Processes using the same name share the same store; the first one creates it.\n
+        :type name: str
+        :param size: The size in bytes of the data region, defaults to 64 MiB.
+        - Ignored when attaching to an existing segment.\n
+        :type size: int, optional
+        :param slots: The maximum number of values stored, defaults to 65536.
+        - Ignored when attaching to an existing segment.\n
+        :type slots: int, optional
+
+        Example Usage
+        -------------
+        ```python
+        >>> from concurrent.futures import ProcessPoolExecutor
+        >>>
+        >>> @cache(backend=SharedMemoryStore("thumbnails"))
+        ... def thumbnail(image_id):
+        ...     return render_thumbnail(image_id)  # returns bytes
+        ...
+        >>> with ProcessPoolExecutor(8) as pool:
+        ...     # each thumbnail is rendered once across all 8 workers
+        ...     sizes = list(pool.map(len_of_thumbnail, image_ids))
+        ```
+        """
+
+        self.name = name
+
+        self._thread_lock = Lock()
+        # pylint: disable=consider-using-with
+        self._lock_file = open(
+            os_path.join(gettempdir(), f"devgizmos-{name}.lock"), "a+b"
+        )
+
+        with self._locked(exclusive=True):
+            try:
+                shm = _Segment(
+                    name=name,
+                    create=True,
+                    size=_SHM_HEADER.size + slots * _SHM_SLOT.size + size,
+                )
+                _SHM_HEADER.pack_into(shm.buf, 0, _SHM_MAGIC, slots, size, 0)
+            except FileExistsError:
+                shm = _Segment(name=name)
+                magic, slots, size, _ = _SHM_HEADER.unpack_from(shm.buf, 0)
+                if magic != _SHM_MAGIC:
+                    shm.close()
+                    raise ValueError(
+                        f"Shared memory segment {name!r} is not a SharedMemoryStore"
+                    )
+
+            # like a DiskStore file, the segment outlives the processes using it until unlink()
+            # is called, rather than being removed when whichever process tracked it exits
+            if system() != "Windows":
+                # pylint: disable=protected-access
+                resource_tracker.unregister(shm._name, "shared_memory")
+
+        self._shm = shm
+        self._slots = slots
+        self._size = size
+        self._data_start = _SHM_HEADER.size + slots * _SHM_SLOT.size
+
+    def __reduce__(self):
+        # child processes reattach to the segment by name
+        return self.__class__, (self.name,)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        # the thread lock is needed too, since file locks
+        # do not exclude threads of the same process
+        with self._thread_lock:
+            fd = self._lock_file.fileno()
+            if system() == "Windows":
+                self._lock_file.seek(0)
+                locking(fd, LK_LOCK, 1)
+            else:
+                flock(fd, LOCK_EX if exclusive else LOCK_SH)
+
+            try:
+                yield
+            finally:
+                if system() == "Windows":
+                    self._lock_file.seek(0)
+                    locking(fd, LK_UNLCK, 1)
+                else:
+                    flock(fd, LOCK_UN)
+
+    def _find(self, namespace_hash, key):
+        # returns the index of the slot holding the key (or None)
+        # and the index of the slot it should be inserted into (or None if full);
+        # callers must hold the lock
+        buf = self._shm.buf
+        start = int.from_bytes(key[:8], "little") % self._slots
+        free = None
+
+        for probe in range(self._slots):
+            index = (start + probe) % self._slots
+            state, _, _, slot_namespace, slot_key, _, _, _ = _SHM_SLOT.unpack_from(
+                buf, _SHM_HEADER.size + index * _SHM_SLOT.size
+            )
+
+            if state == _SLOT_EMPTY:
+                return None, index if free is None else free
+            if state == _SLOT_DELETED:
+                if free is None:
+                    free = index
+            elif slot_namespace == namespace_hash and slot_key == key:
+                return index, index
+
+        return None, free
+
+    def _mark_deleted(self, index):
+        # callers must hold the lock
+        self._shm.buf[_SHM_HEADER.size + index * _SHM_SLOT.size] = _SLOT_DELETED
+
+    @staticmethod
+    def _hash_namespace(namespace):
+        return blake2b(namespace.encode(), digest_size=8).digest()
+
+    def get(self, namespace, key):
+        """
+        get
+        ===
+        Returns the value stored under key along with its remaining time to live.
+        Bytes-like values are returned as read-only memoryviews of the shared memory.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+
+        Return
+        ------
+        :return: A tuple of the value and its remaining ttl (or None if it never expires),
+        or None if the key is missing or expired.
+        :rtype: Tuple[Any, float | None] | None
+        """
+
+        namespace_hash = self._hash_namespace(namespace)
+
+        with self._locked(exclusive=False):
+            index, _ = self._find(namespace_hash, key)
+            if index is None:
+                return None
+
+            _, kind, ntags, _, _, offset, length, expires = _SHM_SLOT.unpack_from(
+                self._shm.buf, _SHM_HEADER.size + index * _SHM_SLOT.size
+            )
+
+            remaining = None
+            if expires:
+                remaining = expires - time()
+                if remaining <= 0:
+                    return None
+
+            # the value follows the digests of its tags
+            start = self._data_start + offset + ntags * _TAG_SIZE
+            view = self._shm.buf[start : start + length].toreadonly()
+            if kind == _VALUE_RAW:
+                return view, remaining
+
+            try:
+                return loads(view), remaining
+            finally:
+                view.release()
+
+    def set(self, namespace, key, value, ttl=None, tags=()):
+        """
+        set
+        ===
+        Stores value under key. Values that cannot be pickled,
+        or that do not fit in the remaining space, are skipped.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+        :param value: The value to store.
+        :type value: Any
+        :param ttl: The time in seconds the value lives for, defaults to None.
+        - Enter None for a value that never expires.\n
+        :type ttl: int | float | None, optional
+        :param tags: The digests of the value's tags, defaults to ().
+        - Values with more than 255 tags are skipped.\n
+        :type tags: Iterable[bytes], optional
+
+        Return
+        ------
+        :return: True if the value was stored, otherwise False.
+        :rtype: bool
+        """
+
+        tags = b"".join(tags)
+        ntags = len(tags) // _TAG_SIZE
+        if ntags > 255:
+            return False
+
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            kind = _VALUE_RAW
+            data = value
+        else:
+            kind = _VALUE_PICKLED
+            try:
+                data = dumps(value, protocol=HIGHEST_PROTOCOL)
+            except (PicklingError, TypeError, AttributeError):
+                return False
+
+        length = memoryview(data).nbytes
+        expires = 0.0 if ttl is None else time() + ttl
+        namespace_hash = self._hash_namespace(namespace)
+
+        with self._locked(exclusive=True):
+            buf = self._shm.buf
+            *_, offset = _SHM_HEADER.unpack_from(buf, 0)
+            if offset + len(tags) + length > self._size:
+                return False
+
+            _, index = self._find(namespace_hash, key)
+            if index is None:
+                return False
+
+            start = self._data_start + offset
+            buf[start : start + len(tags)] = tags
+            start += len(tags)
+            buf[start : start + length] = memoryview(data).cast("B")
+            _SHM_SLOT.pack_into(
+                buf,
+                _SHM_HEADER.size + index * _SHM_SLOT.size,
+                _SLOT_USED,
+                kind,
+                ntags,
+                namespace_hash,
+                key,
+                offset,
+                length,
+                expires,
+            )
+            _SHM_HEADER.pack_into(
+                buf, 0, _SHM_MAGIC, self._slots, self._size, offset + len(tags) + length
+            )
+
+        return True
+
+    def delete(self, namespace, key):
+        """
+        delete
+        ======
+        Removes the value stored under key, if any.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param key: The digest of the cache key.
+        :type key: bytes
+        """
+
+        with self._locked(exclusive=True):
+            index, _ = self._find(self._hash_namespace(namespace), key)
+            if index is not None:
+                self._mark_deleted(index)
+
+    def delete_tagged(self, namespace, tag):
+        """
+        delete_tagged
+        =============
+        Removes every value stored with the given tag, by any process.
+
+        Parameters
+        ----------
+        :param namespace: The namespace of the cached function.
+        :type namespace: str
+        :param tag: The digest of the tag.
+        :type tag: bytes
+
+        Return
+        ------
+        :return: The number of values removed.
+        :rtype: int
+        """
+
+        namespace_hash = self._hash_namespace(namespace)
+
+        def tagged(slot):
+            if slot[3] != namespace_hash:
+                return False
+            start = self._data_start + slot[5]
+            tags = bytes(self._shm.buf[start : start + slot[2] * _TAG_SIZE])
+            return any(
+                tags[i : i + _TAG_SIZE] == tag for i in range(0, len(tags), _TAG_SIZE)
+            )
+
+        with self._locked(exclusive=True):
+            return self._delete_where(tagged)
+
+    def _delete_where(self, predicate):
+        # marks every used slot matching the predicate as deleted;
+        # callers must hold the lock
+        buf = self._shm.buf
+        removed = 0
+
+        for index in range(self._slots):
+            slot = _SHM_SLOT.unpack_from(buf, _SHM_HEADER.size + index * _SHM_SLOT.size)
+            if slot[0] == _SLOT_USED and predicate(slot):
+                self._mark_deleted(index)
+                removed += 1
+
+        return removed
+
+    def clear(self, namespace=None):
+        """
+        clear
+        =====
+        Removes every value stored in the namespace.
+        Clearing every namespace also reclaims the space of all values.
+
+        Parameters
+        ----------
+        :param namespace: The namespace to clear, defaults to None.
+        - Enter None to clear every namespace.\n
+        :type namespace: str | None, optional
+        """
+
+        with self._locked(exclusive=True):
+            if namespace is None:
+                self._shm.buf[_SHM_HEADER.size : self._data_start] = bytes(
+                    self._data_start - _SHM_HEADER.size
+                )
+                _SHM_HEADER.pack_into(
+                    self._shm.buf, 0, _SHM_MAGIC, self._slots, self._size, 0
+                )
+            else:
+                namespace_hash = self._hash_namespace(namespace)
+                self._delete_where(lambda slot: slot[3] == namespace_hash)
+
+    def expire(self):
+        """
+        expire
+        ======
+        Removes every expired value.
+
+        Return
+        ------
+        :return: The number of values removed.
+        :rtype: int
+        """
+
+        now = time()
+        with self._locked(exclusive=True):
+            return self._delete_where(lambda slot: 0 < slot[7] <= now)
+
+    def close(self):
+        """
+        close
+        =====
+        Detaches from the shared memory segment without removing it.
+        """
+
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """
+        unlink
+        ======
+        Removes the shared memory segment once every process has closed it.
+        """
+
+        if system() != "Windows":
+            # unlink() unregisters the segment, so it must be registered again first
+            # pylint: disable=protected-access
+            resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
@@ -0,0 +1,43 @@
+# pylint: disable=all
+
+from os import PathLike
+from typing import Any, Iterable, Optional, Tuple, Union
+
+class DiskStore:
+    path: Union[str, PathLike]
+    def __init__(
+        self, path: Union[str, PathLike], *, timeout: Union[int, float] = 5.0
+    ) -> None: ...
+    def get(self, namespace: str, key: bytes) -> Optional[Tuple[Any, Optional[float]]]: ...
+    def set(
+        self,
+        namespace: str,
+        key: bytes,
+        value: Any,
+        ttl: Optional[Union[int, float]] = None,
+        tags: Iterable[bytes] = (),
+    ) -> bool: ...
+    def delete(self, namespace: str, key: bytes) -> None: ...
+    def delete_tagged(self, namespace: str, tag: bytes) -> int: ...
+    def clear(self, namespace: Optional[str] = None) -> None: ...
+    def expire(self) -> int: ...
+    def close(self) -> None: ...
+
+class SharedMemoryStore:
+    name: str
+    def __init__(self, name: str, size: int = ..., *, slots: int = 65536) -> None: ...
+    def get(self, namespace: str, key: bytes) -> Optional[Tuple[Any, Optional[float]]]: ...
+    def set(
+        self,
+        namespace: str,
+        key: bytes,
+        value: Any,
+        ttl: Optional[Union[int, float]] = None,
+        tags: Iterable[bytes] = (),
+    ) -> bool: ...
+    def delete(self, namespace: str, key: bytes) -> None: ...
+    def delete_tagged(self, namespace: str, tag: bytes) -> int: ...
+    def clear(self, namespace: Optional[str] = None) -> None: ...
+    def expire(self) -> int: ...
+    def close(self) -> None: ...
+    def unlink(self) -> None: ...
@@ -0,0 +1,1182 @@
+# pylint: disable=too-many-lines
+
+"""
+decorators.__benchmarking
+=========================
+Module containing the measurement engine and statistics used by the benchmark decorators.
+"""
+
+# --imports-- #
+from contextlib import contextmanager
+from csv import DictReader, DictWriter
+from itertools import repeat
+from json import dump, load
+from math import erfc, sqrt
+from os import cpu_count, path
+from platform import machine, processor, python_implementation, python_version
+from platform import platform as platform_name
+from statistics import mean, median, stdev
+from time import perf_counter_ns, time
+from tracemalloc import (
+    Filter,
+    get_traced_memory,
+    is_tracing,
+    reset_peak,
+    start,
+    stop,
+    take_snapshot,
+)
+from warnings import warn
+
+from ..checks import check_callable, check_in_bounds, check_type, check_value
+from .__trampoline import _call, _call_async
+
+# --consts-- #
+_UNIT_SCALES = {"ns": 1, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000}
+# loops per trial are calibrated until a trial takes at least this long,
+# so the timer's resolution and overhead are negligible
+_CALIBRATION_TARGET_NS = 2_000_000
+_MAX_LOOPS = 1_000_000_000
+# two sided 95% critical values of Student's t distribution by degrees of freedom
+_T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074,
+    23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045,
+    30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980,
+}  # fmt: skip
+_Z_95 = 1.960
+TIME_UNITS = tuple(_UNIT_SCALES)
+# bumped whenever the layout of baseline files changes incompatibly;
+# optional fields, such as the memory statistics, are read with defaults instead
+BASELINE_VERSION = 1
+_ENVIRONMENT_FIELDS = ("python", "implementation", "platform", "cpu", "cores")
+# the environment fields that must match for baselines to be comparable
+_COMPARABLE_FIELDS = ("python", "implementation", "cpu", "cores")
+_CSV_STATS = (
+    "unit", "trials", "loops", "warmup", "mean", "median", "stdev", "min", "max",
+    "p50", "p90", "p99", "ci_low", "ci_high", "outliers",
+    "peak_memory", "net_memory", "blocks",
+)  # fmt: skip
+_MEMORY_STATS = ("peak_memory", "net_memory", "blocks")
+# keeps the allocations of tracemalloc and of the measuring code out of the measured blocks;
+# measured calls go through __trampoline so that allocations of C functions are still counted
+_TRACEMALLOC_FILTERS = (Filter(False, "*tracemalloc.py"), Filter(False, __file__))
+
+
+# --exceptions-- #
+class RegressionWarning(UserWarning):
+    """
+    RegressionWarning
+    =================
+    Warning to emit when a benchmark is significantly slower than its baseline.
+    """
+
+
+# --statistics-- #
+def _percentile(sorted_values, q):
+    """
+    _percentile
+    ===========
+    Returns the q-th percentile of sorted values, interpolating linearly between the closest ranks.
+
+    Parameters
+    ----------
+    :param sorted_values: The values, sorted in ascending order.
+    :type sorted_values: Sequence[int | float]
+    :param q: The percentile to compute, between 0 and 100.
+    :type q: int | float
+
+    Return
+    ------
+    :return: The q-th percentile.
+    :rtype: float
+    """
+
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def _t_critical(df):
+    """
+    _t_critical
+    ===========
+    Returns the two sided 95% critical value of Student's t distribution,
+    conservatively using the closest tabulated degrees of freedom below df.
+
+    Parameters
+    ----------
+    :param df: The degrees of freedom.
+    :type df: int | float
+
+    Return
+    ------
+    :return: The critical value.
+    :rtype: float
+    """
+
+    if df > max(_T_95):
+        return _Z_95
+    return _T_95[max(key for key in _T_95 if key <= max(df, 1))]
+
+
+def _count_outliers(sorted_values):
+    """
+    _count_outliers
+    ===============
+    Counts the values outside Tukey's fences, more than 1.5 interquartile ranges
+    below the first quartile or above the third quartile.
+
+    Parameters
+    ----------
+    :param sorted_values: The values, sorted in ascending order.
+    :type sorted_values: Sequence[int | float]
+
+    Return
+    ------
+    :return: The number of outliers.
+    :rtype: int
+    """
+
+    q1 = _percentile(sorted_values, 25)
+    q3 = _percentile(sorted_values, 75)
+    fence = 1.5 * (q3 - q1)
+    return sum(value < q1 - fence or value > q3 + fence for value in sorted_values)
+
+
+def _mann_whitney(first, second):
+    """
+    _mann_whitney
+    =============
+    Returns the two sided p value of the Mann-Whitney U test that first and second come from
+    the same distribution, using the normal approximation with tie and continuity corrections.
+    Unlike a t test, it assumes nothing about the shape of the distributions, which for timings
+    are skewed by the occasional slow trial.
+
+    Parameters
+    ----------
+    :param first: The first sample.
+    :type first: Sequence[int | float]
+    :param second: The second sample.
+    :type second: Sequence[int | float]
+
+    Return
+    ------
+    :return: The p value.
+    :rtype: float
+    """
+
+    n1, n2 = len(first), len(second)
+    total = n1 + n2
+    ranked = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+
+    # equal values share the average of their ranks
+    rank_sum = 0.0
+    ties = 0
+    start = 0
+    while start < total:
+        end = start
+        while end + 1 < total and ranked[end + 1][0] == ranked[start][0]:
+            end += 1
+        rank = (start + end) / 2 + 1
+        firsts = sum(1 for _, sample in ranked[start : end + 1] if sample == 0)
+        rank_sum += rank * firsts
+        size = end - start + 1
+        ties += size**3 - size
+        start = end + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+
+    z = max(abs(u - n1 * n2 / 2) - 0.5, 0) / sqrt(variance)
+    return erfc(z / sqrt(2))
+
+
+# --results-- #
+# a flat record of statistics, kept in __slots__ so that results are cheap to keep around
+class BenchmarkResult:  # pylint: disable=too-many-instance-attributes
+    """
+    BenchmarkResult
+    ===============
+    The statistics of a benchmark, measured per call in the given unit.
+
+    Attributes
+    ----------
+    - name: The name of the benchmarked function.
+    - returned: The value returned by the last call.
+    - unit: The unit of time of every statistic.
+    - trials: The number of timed trials.
+    - loops: The number of calls per trial; each trial's time is divided by it.
+    - warmup: The number of untimed calls made before the trials.
+    - times: The time per call of each trial, unrounded.
+    - mean, median, stdev, min, max: The statistics of the trial times.
+    - p50, p90, p99: The 50th, 90th, and 99th percentiles of the trial times.
+    - ci_low, ci_high: The bounds of the 95% confidence interval of the mean.
+    - outliers: The number of trials outside Tukey's fences.
+    - peak_memory: The median peak memory in bytes allocated during a call, or None if not measured.
+    - net_memory: The median memory in bytes still allocated when a call returns,
+    including its return value, or None if not measured.
+    - blocks: The median number of memory blocks still allocated when a call returns,
+    or None if not measured.
+
+    For compatibility, unpacks and indexes like the (returned, avg, min, max) tuple
+    benchmark_rs used to return.
+    """
+
+    __slots__ = (
+        "name",
+        "returned",
+        "unit",
+        "trials",
+        "loops",
+        "warmup",
+        "times",
+        "mean",
+        "median",
+        "stdev",
+        "min",
+        "max",
+        "p50",
+        "p90",
+        "p99",
+        "ci_low",
+        "ci_high",
+        "outliers",
+        "peak_memory",
+        "net_memory",
+        "blocks",
+    )
+
+    def __init__(
+        self, name, returned, times, unit, loops, warmup, precision=3, memory=None
+    ):
+        """
+        BenchmarkResult
+        ===============
+        Computes the statistics of a benchmark from the time per call of each trial.
+
+        Parameters
+        ----------
+        :param name: The name of the benchmarked function.
+        :type name: str
+        :param returned: The value returned by the last call.
+        :type returned: Any
+        :param times: The time per call of each trial, in the given unit.
+        :type times: List[float]
+        :param unit: The unit of time of the times.
+        :type unit: Literal["ns", "us", "ms", "s"]
+        :param loops: The number of calls per trial.
+        :type loops: int
+        :param warmup: The number of untimed calls made before the trials.
+        :type warmup: int
+        :param precision: The precision to round the statistics to, defaults to 3.
+        :type precision: int, optional
+        :param memory: The peak memory, net memory, and net blocks of each measured call, defaults to None.
+        - Leave as None if memory was not measured.\n
+        :type memory: List[Tuple[int, int, int]] | None, optional
+        """
+
+        self.name = name
+        self.returned = returned
+        self.unit = unit
+        self.trials = len(times)
+        self.loops = loops
+        self.warmup = warmup
+        self.times = times
+
+        ordered = sorted(times)
+        spread = stdev(times) if len(times) > 1 else 0.0
+        margin = _t_critical(len(times) - 1) * spread / sqrt(len(times))
+        average = mean(times)
+
+        self.mean = round(average, precision)
+        self.median = round(median(ordered), precision)
+        self.stdev = round(spread, precision)
+        self.min = round(ordered[0], precision)
+        self.max = round(ordered[-1], precision)
+        self.p50 = round(_percentile(ordered, 50), precision)
+        self.p90 = round(_percentile(ordered, 90), precision)
+        self.p99 = round(_percentile(ordered, 99), precision)
+        self.ci_low = round(average - margin, precision)
+        self.ci_high = round(average + margin, precision)
+        self.outliers = _count_outliers(ordered)
+
+        self.peak_memory = self.net_memory = self.blocks = None
+        if memory:
+            peaks, nets, blocks = zip(*memory)
+            self.peak_memory = int(median(peaks))
+            self.net_memory = int(median(nets))
+            self.blocks = int(median(blocks))
+
+    def _legacy(self):
+        # the (returned, avg, min, max) tuple benchmark_rs used to return
+        return (self.returned, self.mean, self.min, self.max)
+
+    def __iter__(self):
+        return iter(self._legacy())
+
+    def __getitem__(self, index):
+        return self._legacy()[index]
+
+    def __len__(self):
+        return 4
+
+    def __repr__(self):
+        return (
+            f"BenchmarkResult(name={self.name!r}, trials={self.trials}, loops={self.loops}, "
+            f"unit={self.unit!r}, mean={self.mean}, median={self.median}, stdev={self.stdev}, "
+            f"min={self.min}, max={self.max}, p90={self.p90}, p99={self.p99}, "
+            f"ci=({self.ci_low}, {self.ci_high}), outliers={self.outliers}"
+            + (
+                f", peak_memory={self.peak_memory}, net_memory={self.net_memory}, "
+                f"blocks={self.blocks})"
+                if self.peak_memory is not None
+                else ")"
+            )
+        )
+
+    def as_dict(self):
+        """
+        as_dict
+        =======
+        Returns the statistics as a dict, leaving out the returned value.
+
+        Return
+        ------
+        :return: The statistics keyed by attribute name.
+        :rtype: Dict[str, Any]
+        """
+
+        return {
+            name: getattr(self, name) for name in self.__slots__ if name != "returned"
+        }
+
+    @classmethod
+    def from_dict(cls, data, unit=None, precision=3):
+        """
+        from_dict
+        =========
+        Rebuilds a result from the dict returned by as_dict, recomputing the statistics from the times
+        and keeping the memory statistics as is.
+
+        Parameters
+        ----------
+        :param data: The dict returned by as_dict.
+        :type data: Dict[str, Any]
+        :param unit: The unit to convert the times to, defaults to None.
+        - Leave as None to keep the unit of data.\n
+        :type unit: Literal["ns", "us", "ms", "s"] | None, optional
+        :param precision: The precision to round the statistics to, defaults to 3.
+        :type precision: int, optional
+
+        Return
+        ------
+        :return: The rebuilt result, whose returned value is None.
+        :rtype: BenchmarkResult
+        """
+
+        unit = unit or data["unit"]
+        scale = _UNIT_SCALES[data["unit"]] / _UNIT_SCALES[unit]
+        times = [float(value) * scale for value in data["times"]]
+        result = cls(
+            data["name"],
+            None,
+            times,
+            unit,
+            int(data["loops"]),
+            int(data["warmup"]),
+            precision,
+        )
+
+        # missing or empty (in CSV files) when memory was not measured
+        for name in _MEMORY_STATS:
+            if data.get(name) not in (None, ""):
+                setattr(result, name, int(data[name]))
+        return result
+
+
+# --engine-- #
+def _time_loops(func, args, kwargs, loops):
+    # returns the total time in ns of loops calls, and the last returned value
+    returned = None
+    begin = perf_counter_ns()
+    for _ in repeat(None, loops):
+        returned = func(*args, **kwargs)
+    return perf_counter_ns() - begin, returned
+
+
+async def _time_loops_async(func, args, kwargs, loops):
+    # like _time_loops, but awaits each call inside the timed region
+    returned = None
+    begin = perf_counter_ns()
+    for _ in repeat(None, loops):
+        returned = await func(*args, **kwargs)
+    return perf_counter_ns() - begin, returned
+
+
+def _next_loops(loops, elapsed):
+    # returns the number of loops to try after loops calls took elapsed ns, or None if enough
+    if elapsed >= _CALIBRATION_TARGET_NS or loops >= _MAX_LOOPS:
+        return None
+
+    # jump close to the target, but at least double
+    estimate = int(loops * _CALIBRATION_TARGET_NS * 1.2 / max(elapsed, 1))
+    return min(max(loops * 2, estimate), _MAX_LOOPS)
+
+
+def _calibrate(func, args, kwargs):
+    """
+    _calibrate
+    ==========
+    Finds how many calls of func are needed for a trial to last long enough to be timed accurately.
+
+    Parameters
+    ----------
+    :param func: The function to call.
+    :type func: Callable[..., Any]
+    :param args: The arguments to pass to func.
+    :type args: Tuple[Any, ...]
+    :param kwargs: The keyword arguments to pass to func.
+    :type kwargs: Dict[str, Any]
+
+    Return
+    ------
+    :return: The number of calls per trial.
+    :rtype: int
+    """
+
+    loops = 1
+    while True:
+        elapsed, _ = _time_loops(func, args, kwargs, loops)
+        following = _next_loops(loops, elapsed)
+        if following is None:
+            return loops
+        loops = following
+
+
+async def _calibrate_async(func, args, kwargs):
+    """
+    _calibrate_async
+    ================
+    Like _calibrate, but for coroutine functions.
+    """
+
+    loops = 1
+    while True:
+        elapsed, _ = await _time_loops_async(func, args, kwargs, loops)
+        following = _next_loops(loops, elapsed)
+        if following is None:
+            return loops
+        loops = following
+
+
+@contextmanager
+def _tracing():
+    # traces allocations with tracemalloc, unless they already are
+    tracing = is_tracing()
+    if not tracing:
+        start()
+    try:
+        yield
+    finally:
+        if not tracing:
+            stop()
+
+
+def _snapshot():
+    return take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+
+
+def _blocks_since(before):
+    # returns the net number of blocks allocated since the before snapshot
+    after = _snapshot()
+    return sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+
+def _measure_memory(func, args, kwargs, trials):
+    """
+    _measure_memory
+    ===============
+    Measures the memory allocated by trials separate calls of func with tracemalloc,
+    which slows allocations down too much to run during the timed trials.
+
+    Return
+    ------
+    :return: The peak memory, net memory, and net blocks of each call.
+    :rtype: List[Tuple[int, int, int]]
+    """
+
+    measurements = []
+    with _tracing():
+        for _ in repeat(None, trials):
+            before = _snapshot()
+            reset_peak()
+            baseline, _ = get_traced_memory()
+
+            # the returned value is kept alive until measured, as part of the net memory
+            returned = _call(func, args, kwargs)
+            current, peak = get_traced_memory()
+            blocks = _blocks_since(before)
+            del returned
+
+            measurements.append((peak - baseline, current - baseline, blocks))
+
+    return measurements
+
+
+async def _measure_memory_async(func, args, kwargs, trials):
+    """
+    _measure_memory_async
+    =====================
+    Like _measure_memory, but for coroutine functions.
+    Allocations made by other tasks while a call is suspended are counted too.
+    """
+
+    measurements = []
+    with _tracing():
+        for _ in repeat(None, trials):
+            before = _snapshot()
+            reset_peak()
+            baseline, _ = get_traced_memory()
+            returned = await _call_async(func, args, kwargs)
+            current, peak = get_traced_memory()
+            blocks = _blocks_since(before)
+            del returned
+
+            measurements.append((peak - baseline, current - baseline, blocks))
+
+    return measurements
+
+
+def _prepare(func, args, kwargs, warmup, loops):
+    # makes the warmup calls, then returns loops, calibrating it if it is None
+    for _ in repeat(None, warmup):
+        func(*args, **kwargs)
+
+    if loops is None:
+        return _calibrate(func, args, kwargs)
+    return loops
+
+
+async def _prepare_async(func, args, kwargs, warmup, loops):
+    # like _prepare, but for coroutine functions
+    for _ in repeat(None, warmup):
+        await func(*args, **kwargs)
+
+    if loops is None:
+        return await _calibrate_async(func, args, kwargs)
+    return loops
+
+
+def _run_benchmark(
+    func,
+    args,
+    kwargs,
+    *,
+    trials=10,
+    warmup=1,
+    loops=None,
+    unit="ns",
+    precision=3,
+    memory=False,
+):
+    """
+    _run_benchmark
+    ==============
+    Warms func up, calibrates the number of calls per trial if needed, and times the trials.
+
+    Parameters
+    ----------
+    :param func: The function to benchmark.
+    :type func: Callable[..., Any]
+    :param args: The arguments to pass to func.
+    :type args: Tuple[Any, ...]
+    :param kwargs: The keyword arguments to pass to func.
+    :type kwargs: Dict[str, Any]
+    :param trials: The number of timed trials, defaults to 10.
+    :type trials: int, optional
+    :param warmup: The number of untimed calls made first, defaults to 1.
+    :type warmup: int, optional
+    :param loops: The number of calls per trial, defaults to None.
+    - Enter None to calibrate it automatically.\n
+    :type loops: int | None, optional
+    :param unit: The unit of time of the results, defaults to "ns".
+    :type unit: Literal["ns", "us", "ms", "s"], optional
+    :param precision: The precision to round the statistics to, defaults to 3.
+    :type precision: int, optional
+    :param memory: Whether to also measure the memory allocated by trials calls, defaults to False.
+    :type memory: bool, optional
+
+    Return
+    ------
+    :return: The statistics of the trials.
+    :rtype: BenchmarkResult
+    """
+
+    loops = _prepare(func, args, kwargs, warmup, loops)
+
+    scale = _UNIT_SCALES[unit] * loops
+    times = []
+    returned = None
+    for _ in repeat(None, trials):
+        elapsed, returned = _time_loops(func, args, kwargs, loops)
+        times.append(elapsed / scale)
+
+    measurements = _measure_memory(func, args, kwargs, trials) if memory else None
+    return BenchmarkResult(
+        func.__name__, returned, times, unit, loops, warmup, precision, measurements
+    )
+
+
+async def _run_benchmark_async(
+    func,
+    args,
+    kwargs,
+    *,
+    trials=10,
+    warmup=1,
+    loops=None,
+    unit="ns",
+    precision=3,
+    memory=False,
+):
+    """
+    _run_benchmark_async
+    ====================
+    Like _run_benchmark, but for coroutine functions, awaiting each call inside the timed region.
+    Other tasks running on the event loop while a call is suspended are timed too.
+    """
+
+    loops = await _prepare_async(func, args, kwargs, warmup, loops)
+
+    scale = _UNIT_SCALES[unit] * loops
+    times = []
+    returned = None
+    for _ in repeat(None, trials):
+        elapsed, returned = await _time_loops_async(func, args, kwargs, loops)
+        times.append(elapsed / scale)
+
+    measurements = None
+    if memory:
+        measurements = await _measure_memory_async(func, args, kwargs, trials)
+    return BenchmarkResult(
+        func.__name__, returned, times, unit, loops, warmup, precision, measurements
+    )
+
+
+# --comparisons-- #
+class Comparison:
+    """
+    Comparison
+    ==========
+    The outcome of comparing the speed of a baseline function against a candidate.
+
+    Attributes
+    ----------
+    - baseline: The BenchmarkResult of the baseline.
+    - candidate: The BenchmarkResult of the candidate.
+    - speedup: The median time of the baseline divided by the median time of the candidate,
+    above 1 if the candidate is faster.
+    - p_value: The p value of the Mann-Whitney U test on the trial times.
+    - alpha: The significance level the p value is compared against.
+    - significant: Whether the difference is statistically significant, rather than noise.
+    - verdict: A sentence stating which function is faster, or that the difference is noise.
+    """
+
+    __slots__ = ("baseline", "candidate", "speedup", "p_value", "alpha", "significant")
+
+    def __init__(self, baseline, candidate, alpha=0.05):
+        """
+        Comparison
+        ==========
+        Compares the trial times of a baseline and a candidate.
+
+        Parameters
+        ----------
+        :param baseline: The BenchmarkResult of the baseline.
+        :type baseline: BenchmarkResult
+        :param candidate: The BenchmarkResult of the candidate.
+        :type candidate: BenchmarkResult
+        :param alpha: The significance level, defaults to 0.05.
+        :type alpha: float, optional
+        """
+
+        self.baseline = baseline
+        self.candidate = candidate
+        self.alpha = alpha
+
+        baseline_median = median(baseline.times)
+        candidate_median = median(candidate.times)
+        self.speedup = (
+            baseline_median / candidate_median if candidate_median else float("inf")
+        )
+        self.p_value = _mann_whitney(baseline.times, candidate.times)
+        self.significant = self.p_value < alpha
+
+    @property
+    def verdict(self):
+        """
+        verdict
+        =======
+        A sentence stating which function is faster, or that the difference is noise.
+        """
+
+        if not self.significant:
+            return (
+                f"no significant difference between {self.candidate.name} and "
+                f"{self.baseline.name} (p={self.p_value:.4g})"
+            )
+
+        if self.speedup >= 1:
+            relation = f"{self.speedup:.3f}x faster than"
+        else:
+            relation = f"{1 / self.speedup:.3f}x slower than"
+        return f"{self.candidate.name} is {relation} {self.baseline.name} (p={self.p_value:.4g})"
+
+    def is_regression(self, threshold=0.05):
+        """
+        is_regression
+        =============
+        Returns whether the candidate is significantly slower than the baseline
+        by more than the given fraction of the baseline's median time.
+
+        Parameters
+        ----------
+        :param threshold: The tolerated slowdown, defaults to 0.05 (5%).
+        :type threshold: int | float, optional
+
+        Return
+        ------
+        :return: True if the candidate regressed, otherwise False.
+        :rtype: bool
+        """
+
+        return self.significant and self.speedup < 1 / (1 + threshold)
+
+    def __str__(self):
+        return self.verdict
+
+    def __repr__(self):
+        return (
+            f"Comparison(baseline={self.baseline.name!r}, candidate={self.candidate.name!r}, "
+            f"speedup={self.speedup:.3f}, p_value={self.p_value:.4g}, "
+            f"significant={self.significant})"
+        )
+
+
+def compare(
+    baseline,
+    candidate,
+    args=(),
+    kwargs=None,
+    *,
+    trials=20,
+    warmup=1,
+    loops=None,
+    unit="ns",
+    precision=3,
+    alpha=0.05,
+):
+    """
+    compare
+    =======
+    Benchmarks two implementations of the same function on the same arguments and tests
+    whether the candidate is significantly faster or slower than the baseline.
+    Trials of both functions are interleaved, alternating which one goes first, so that drift
+    such as CPU frequency scaling or background load affects both equally.
+
+    Parameters
+    ----------
+    :param baseline: The current implementation.
+    :type baseline: Callable[..., Any]
+    :param candidate: The implementation to evaluate.
+    :type candidate: Callable[..., Any]
+    :param args: The arguments to pass to both functions, defaults to ().
+    :type args: Tuple[Any, ...], optional
+    :param kwargs: The keyword arguments to pass to both functions, defaults to None.
+    :type kwargs: Dict[str, Any] | None, optional
+    :param trials: The number of timed trials of each function, defaults to 20.
+    :type trials: int, optional
+    :param warmup: The number of untimed calls made to each function first, defaults to 1.
+    :type warmup: int, optional
+    :param loops: The number of calls timed together in each trial, defaults to None.
+    - Leave as None to calibrate it automatically for each function.\n
+    :type loops: int | None, optional
+    :param unit: The unit of time to use, defaults to "ns".
+    - Supported units are "ns", "us", "ms", "s".\n
+    :type unit: Literal["ns", "us", "ms", "s"], optional
+    :param precision: The precision to use when rounding the times, defaults to 3.
+    :type precision: int, optional
+    :param alpha: The significance level of the test, defaults to 0.05.
+    :type alpha: float, optional
+
+    Raises
+    ------
+    :raises TypeError: If baseline or candidate is not callable.
+    :raises TypeError: If args is not a tuple.
+    :raises TypeError: If kwargs is not a dict or None.
+    :raises TypeError: If trials, warmup, or precision is not an int.
+    :raises TypeError: If loops is not an int or None.
+    :raises TypeError: If alpha is not a float.
+    :raises ValueError: If trials is less than 2.
+    :raises ValueError: If warmup is less than 0.
+    :raises ValueError: If loops is less than 1.
+    :raises ValueError: If unit is not 'ns', 'us', 'ms', or 's'.
+    :raises ValueError: If alpha is not between 0 and 1.
+
+    Return
+    ------
+    :return: The comparison of the two functions.
+    :rtype: Comparison
+
+    Example Usage
+    -------------
+    ```python
+    >>> def old(n):
+    ...     return sum([i * i for i in range(n)])
+    ...
+    >>> def new(n):
+    ...     return sum(i * i for i in range(n))
+    ...
+    >>> result = compare(old, new, (1000,))
+    >>> result.speedup
+    0.871
+    >>> print(result)
+    new is 1.148x slower than old (p=6.796e-08)
+    ```
+    """
+
+    # type checks
+    check_callable((baseline, candidate))
+    check_type(args, tuple)
+    check_type(kwargs, dict, optional=True)
+    check_type(trials, int)
+    check_type(warmup, int)
+    check_type(loops, int, optional=True)
+    check_type(precision, int)
+    check_type(alpha, float)
+
+    # value checks
+    check_in_bounds(trials, 2, None)
+    check_in_bounds(warmup, 0, None)
+    if loops is not None:
+        check_in_bounds(loops, 1, None)
+    check_value(unit, TIME_UNITS)
+    check_in_bounds(alpha, 0, 1, inclusive=False)
+
+    kwargs = kwargs or {}
+    funcs = (baseline, candidate)
+    counts = [_prepare(func, args, kwargs, warmup, loops) for func in funcs]
+    times = ([], [])
+    returned = [None, None]
+
+    for trial in range(trials):
+        order = (0, 1) if trial % 2 == 0 else (1, 0)
+        for index in order:
+            elapsed, returned[index] = _time_loops(
+                funcs[index], args, kwargs, counts[index]
+            )
+            times[index].append(elapsed / (_UNIT_SCALES[unit] * counts[index]))
+
+    results = [
+        BenchmarkResult(
+            func.__name__, returned[i], times[i], unit, counts[i], warmup, precision
+        )
+        for i, func in enumerate(funcs)
+    ]
+    return Comparison(results[0], results[1], alpha)
+
+
+# --baselines-- #
+def _cpu_model():
+    # platform.processor is empty or just the architecture on most linux systems
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return processor() or machine()
+
+
+def environment():
+    """
+    environment
+    ===========
+    Describes the machine and interpreter benchmarks are run on, as stored in baseline files.
+
+    Return
+    ------
+    :return: The python version, implementation, platform, cpu model, and number of cores.
+    :rtype: Dict[str, Any]
+
+    Example Usage
+    -------------
+    ```python
+    >>> environment()
+    {'python': '3.11.7', 'implementation': 'CPython', 'platform': 'Linux-6.8.0-x86_64-with-glibc2.36',
+    'cpu': 'AMD EPYC 7B13', 'cores': 8}
+    ```
+    """
+
+    return {
+        "python": python_version(),
+        "implementation": python_implementation(),
+        "platform": platform_name(),
+        "cpu": _cpu_model(),
+        "cores": cpu_count(),
+    }
+
+
+def _is_csv(filepath):
+    return path.splitext(filepath)[1].lower() == ".csv"
+
+
+def _read_baseline(filepath):
+    # returns the file's environment and its entries (as_dict dicts) keyed by name
+    with open(filepath, encoding="utf-8", newline="") as file:
+        if not _is_csv(filepath):
+            data = load(file)
+            version = data.get("version")
+            rows = None
+        else:
+            rows = list(DictReader(file))
+            version = int(rows[0]["version"]) if rows else BASELINE_VERSION
+
+    # checked before reading the entries, whose fields depend on the version
+    if version != BASELINE_VERSION:
+        raise ValueError(
+            f"Baseline file {filepath} has version {version}, expected {BASELINE_VERSION}."
+        )
+
+    if rows is None:
+        return data.get("environment", {}), data.get("results", {})
+
+    env = {}
+    entries = {}
+    for row in rows:
+        env = {name: row[name] for name in _ENVIRONMENT_FIELDS}
+        env["cores"] = int(env["cores"]) if env["cores"] else None
+        # the memory columns are missing from files written before they were added
+        entry = {
+            name: row.get(name) if name in _MEMORY_STATS else row[name]
+            for name in _CSV_STATS
+        }
+        entry["name"] = row["name"]
+        entry["times"] = [float(value) for value in row["times"].split()]
+        entries[row["name"]] = entry
+    return env, entries
+
+
+def _write_baseline(filepath, env, entries):
+    with open(filepath, "w", encoding="utf-8", newline="") as file:
+        if not _is_csv(filepath):
+            data = {
+                "version": BASELINE_VERSION,
+                "created": time(),
+                "environment": env,
+                "results": entries,
+            }
+            dump(data, file, indent=2)
+            return
+
+        fields = ("version", "name") + _CSV_STATS + ("times",) + _ENVIRONMENT_FIELDS
+        writer = DictWriter(file, fields)
+        writer.writeheader()
+        for name, entry in entries.items():
+            row = {field: entry.get(field) for field in _CSV_STATS}
+            row.update(env, version=BASELINE_VERSION, name=name)
+            row["times"] = " ".join(repr(float(value)) for value in entry["times"])
+            writer.writerow(row)
+
+
+def load_baseline(filepath):
+    """
+    load_baseline
+    =============
+    Loads the results stored in a baseline file written by save_baseline.
+
+    Parameters
+    ----------
+    :param filepath: The path of the baseline file.
+    - Files ending in .csv are read as CSV, others as JSON.\n
+    :type filepath: str
+
+    Raises
+    ------
+    :raises TypeError: If filepath is not a str.
+    :raises ValueError: If the file was written with another BASELINE_VERSION.
+
+    Return
+    ------
+    :return: The environment the results were recorded in, and the results keyed by name.
+    :rtype: Tuple[Dict[str, Any], Dict[str, BenchmarkResult]]
+    """
+
+    # type checks
+    check_type(filepath, str)
+
+    env, entries = _read_baseline(filepath)
+    return env, {name: BenchmarkResult.from_dict(entry) for name, entry in entries.items()}
+
+
+def save_baseline(filepath, results):
+    """
+    save_baseline
+    =============
+    Stores benchmark results in a baseline file along with the current environment.
+    Results already in the file are kept, unless they have the same name as a new result
+    or were recorded in a different environment.
+
+    Parameters
+    ----------
+    :param filepath: The path of the baseline file.
+    - Files ending in .csv are written as CSV, others as JSON.\n
+    :type filepath: str
+    :param results: The result or results to store, keyed by their name.
+    :type results: BenchmarkResult | Iterable[BenchmarkResult]
+
+    Raises
+    ------
+    :raises TypeError: If filepath is not a str.
+    :raises ValueError: If the existing file was written with another BASELINE_VERSION.
+
+    Example Usage
+    -------------
+    ```python
+    >>> @benchmark_rs()
+    ... def perf_example():
+    ...     return sum(range(100))
+    ...
+    >>> save_baseline("baseline.json", perf_example())
+    ```
+    """
+
+    # type checks
+    check_type(filepath, str)
+
+    if isinstance(results, BenchmarkResult):
+        results = (results,)
+
+    env = environment()
+    entries = {}
+    if path.exists(filepath):
+        old_env, old_entries = _read_baseline(filepath)
+        if all(old_env.get(field) == env[field] for field in _COMPARABLE_FIELDS):
+            entries = old_entries
+
+    for result in results:
+        entries[result.name] = result.as_dict()
+
+    _write_baseline(filepath, env, entries)
+
+
+def check_baseline(result, filepath, threshold=0.05, alpha=0.05):
+    """
+    check_baseline
+    ==============
+    Compares a benchmark result against the result of the same name stored in a baseline file,
+    emitting a RegressionWarning if it is significantly slower by more than threshold.
+    A RuntimeWarning is emitted if the baseline was recorded in a different environment,
+    since the comparison is then meaningless.
+
+    Parameters
+    ----------
+    :param result: The result to check.
+    :type result: BenchmarkResult
+    :param filepath: The path of the baseline file.
+    :type filepath: str
+    :param threshold: The tolerated slowdown, as a fraction of the baseline's median time,
+    defaults to 0.05 (5%).
+    :type threshold: int | float, optional
+    :param alpha: The significance level of the test, defaults to 0.05.
+    :type alpha: float, optional
+
+    Raises
+    ------
+    :raises TypeError: If result is not a BenchmarkResult.
+    :raises TypeError: If filepath is not a str.
+    :raises TypeError: If threshold is not an int or float.
+    :raises TypeError: If alpha is not a float.
+    :raises ValueError: If threshold is negative.
+    :raises ValueError: If alpha is not between 0 and 1.
+
+    Return
+    ------
+    :return: The comparison against the baseline, or None if the file has no result of that name.
+    :rtype: Comparison | None
+
+    Example Usage
+    -------------
+    ```python
+    >>> comparison = check_baseline(perf_example(), "baseline.json")
+    RegressionWarning: perf_example is 1.312x slower than baseline (p=0.0001827)
+    >>> comparison.speedup
+    0.762
+    ```
+    """
+
+    # type checks
+    check_type(result, BenchmarkResult)
+    check_type(filepath, str)
+    check_type(threshold, (int, float))
+    check_type(alpha, float)
+
+    # value checks
+    check_in_bounds(threshold, 0, None)
+    check_in_bounds(alpha, 0, 1, inclusive=False)
+
+    return _compare_baseline(result, filepath, threshold, alpha, stacklevel=3)
+
+
+def _compare_baseline(result, filepath, threshold, alpha, stacklevel):
+    """
+    _compare_baseline
+    =================
+    Implements check_baseline without validating the arguments,
+    emitting warnings stacklevel frames up so that they point at the user's code.
+    """
+
+    if not path.exists(filepath):
+        return None
+
+    env, entries = _read_baseline(filepath)
+    entry = entries.get(result.name)
+    if entry is None:
+        return None
+
+    current = environment()
+    changed = [f for f in _COMPARABLE_FIELDS if env.get(f) != current[f]]
+    if changed:
+        warn(
+            f"The baseline of {result.name} was recorded in a different environment "
+            f"({', '.join(changed)} changed), so the comparison may be meaningless.",
+            RuntimeWarning,
+            stacklevel=stacklevel,
+        )
+
+    stored = BenchmarkResult.from_dict(dict(entry, name="baseline"), result.unit)
+    comparison = Comparison(stored, result, alpha)
+    if comparison.is_regression(threshold):
+        warn(comparison.verdict, RegressionWarning, stacklevel=stacklevel)
+    return comparison
+
+
+def _record_baseline(result, filepath, threshold):
+    """
+    _record_baseline
+    ================
+    Checks result against its baseline, storing it as the baseline if there is none yet.
+    """
+
+    # warnings point past this function and the decorator's wrapper
+    comparison = _compare_baseline(result, filepath, threshold, 0.05, stacklevel=4)
+    if comparison is None:
+        save_baseline(filepath, result)
+    return comparison
@@ -0,0 +1,115 @@
+# pylint: disable=all
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
+
+T = TypeVar("T")
+
+BASELINE_VERSION: int
+
+class RegressionWarning(UserWarning): ...
+
+class BenchmarkResult(Generic[T]):
+    name: str
+    returned: T
+    unit: Literal["ns", "us", "ms", "s"]
+    trials: int
+    loops: int
+    warmup: int
+    times: List[float]
+    mean: float
+    median: float
+    stdev: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+    ci_low: float
+    ci_high: float
+    outliers: int
+    peak_memory: Optional[int]
+    net_memory: Optional[int]
+    blocks: Optional[int]
+    def __init__(
+        self,
+        name: str,
+        returned: T,
+        times: List[float],
+        unit: Literal["ns", "us", "ms", "s"],
+        loops: int,
+        warmup: int,
+        precision: int = 3,
+        memory: Optional[List[Tuple[int, int, int]]] = None,
+    ) -> None: ...
+    def __iter__(self) -> Iterator[Any]: ...
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[Any, ...]: ...
+    def __len__(self) -> int: ...
+    def as_dict(self) -> Dict[str, Any]: ...
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        unit: Optional[Literal["ns", "us", "ms", "s"]] = None,
+        precision: int = 3,
+    ) -> BenchmarkResult[None]: ...
+
+class Comparison:
+    baseline: BenchmarkResult[Any]
+    candidate: BenchmarkResult[Any]
+    speedup: float
+    p_value: float
+    alpha: float
+    significant: bool
+    def __init__(
+        self,
+        baseline: BenchmarkResult[Any],
+        candidate: BenchmarkResult[Any],
+        alpha: float = 0.05,
+    ) -> None: ...
+    @property
+    def verdict(self) -> str: ...
+    def is_regression(self, threshold: Union[int, float] = 0.05) -> bool: ...
+
+def compare(
+    baseline: Callable[..., Any],
+    candidate: Callable[..., Any],
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    *,
+    trials: int = 20,
+    warmup: int = 1,
+    loops: Optional[int] = None,
+    unit: Literal["ns", "us", "ms", "s"] = "ns",
+    precision: int = 3,
+    alpha: float = 0.05,
+) -> Comparison: ...
+def environment() -> Dict[str, Any]: ...
+def load_baseline(
+    filepath: str,
+) -> Tuple[Dict[str, Any], Dict[str, BenchmarkResult[None]]]: ...
+def save_baseline(
+    filepath: str, results: Union[BenchmarkResult[Any], Iterable[BenchmarkResult[Any]]]
+) -> None: ...
+def check_baseline(
+    result: BenchmarkResult[Any],
+    filepath: str,
+    threshold: Union[int, float] = 0.05,
+    alpha: float = 0.05,
+) -> Optional[Comparison]: ...
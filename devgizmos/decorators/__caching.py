@@ -0,0 +1,1535 @@
+# pylint: disable=too-many-lines
+
+"""
+decorators.__caching
+====================
+Module containing the storage machinery used by the cache decorators.
+"""
+
+# --imports-- #
+from asyncio import current_task, ensure_future, get_running_loop, shield
+from collections import namedtuple
+from contextlib import nullcontext
+from functools import partial, wraps
+from gc import get_referents
+from heapq import heappop, heappush
+from itertools import count
+from sys import getsizeof
+from threading import Event, Lock, Thread
+from time import monotonic, perf_counter, sleep
+from types import FunctionType, GeneratorType, ModuleType
+from weakref import WeakSet, ref
+
+from .__backends import _digest
+from .__policies import POLICIES
+
+# --consts-- #
+_MISSING = object()
+_SWEEP_BATCH = 256
+# the iterator types whose results are recorded and replayed
+_RECORDED_TYPES = frozenset((GeneratorType, map, filter, zip))
+
+# --tags-- #
+# maps every tag in use to the stores holding entries with it, so that a tag
+# can be invalidated across every cached function; guarded by _TAGS_LOCK,
+# which is always acquired after a store's own lock
+_TAGS = {}
+_TAGS_LOCK = Lock()
+# the stores with a backend, whose entries may have been tagged by other processes
+_BACKED = WeakSet()
+
+
+# --stats-- #
+class CacheInfo(
+    namedtuple(
+        "CacheInfo",
+        (
+            "hits",
+            "misses",
+            "evictions",
+            "maxsize",
+            "currsize",
+            "miss_time",
+            "maxbytes",
+            "currbytes",
+        ),
+    )
+):
+    """
+    CacheInfo
+    =========
+    Snapshot of a cache's statistics, returned by the cache_info method of cached functions.
+
+    Fields
+    ------
+    - hits: The number of calls answered without computing the result.
+    - misses: The number of calls that computed the result.
+    - evictions: The number of results removed to make room for new ones.
+    - maxsize: The maximum number of results stored, or None if unbounded.
+    - currsize: The number of results currently stored.
+    - miss_time: The total time in seconds spent computing results on misses.
+    - maxbytes: The maximum estimated size in bytes of the results stored, or None if unbounded.
+    - currbytes: The estimated size in bytes of the results currently stored,
+    or 0 if sizes are not tracked.
+    """
+
+    __slots__ = ()
+
+    @property
+    def hit_ratio(self):
+        """
+        hit_ratio
+        =========
+        The fraction of calls answered without computing the result,
+        or 0.0 if there have been no calls.
+        """
+
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    @property
+    def time_saved(self):
+        """
+        time_saved
+        ==========
+        An estimate of the time in seconds saved by the cache,
+        assuming each hit would have taken the average miss time.
+        """
+
+        return self.hits * self.miss_time / self.misses if self.misses else 0.0
+
+
+# --helpers-- #
+def _deep_sizeof(obj):
+    """
+    _deep_sizeof
+    ============
+    Estimates the size in bytes of an object and everything it references,
+    counting shared objects once and skipping classes, functions, and modules.
+
+    Parameters
+    ----------
+    :param obj: The object to measure.
+    :type obj: Any
+
+    Return
+    ------
+    :return: The estimated size in bytes.
+    :rtype: int
+    """
+
+    seen = set()
+    stack = [obj]
+    size = 0
+
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(
+            current, (type, FunctionType, ModuleType)
+        ):
+            continue
+
+        seen.add(id(current))
+        size += getsizeof(current)
+        stack.extend(get_referents(current))
+
+    return size
+
+
+SIZERS = {"shallow": getsizeof, "deep": _deep_sizeof}
+
+
+def _clone_error(error):
+    # a shallow copy of an exception without its traceback, rebuilt from its pickled form;
+    # an __init__ written in Python is not called, since it may reformat the message
+    # or take other arguments than args, while built in ones only store the args;
+    # exceptions that cannot be rebuilt this way are returned as is
+    try:
+        cls, args, *state = error.__reduce_ex__(2)
+        clone = cls.__new__(cls, *args)
+        if not isinstance(cls.__init__, FunctionType):
+            clone.__init__(*args)
+        for name, value in (state[0] if state and state[0] else {}).items():
+            setattr(clone, name, value)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return error
+    clone.__cause__ = error.__cause__
+    clone.__suppress_context__ = error.__suppress_context__
+    return clone
+
+
+class _Flight:
+    """
+    _Flight
+    =======
+    A computation of a missing key that other threads can wait on.
+    """
+
+    __slots__ = ("_event", "_result", "_exc")
+
+    def __init__(self):
+        self._event = Event()
+        self._result = None
+        self._exc = None
+
+    def set_result(self, result):
+        """
+        set_result
+        ==========
+        Stores the computed result and wakes up all waiters.
+
+        Parameters
+        ----------
+        :param result: The computed result.
+        :type result: Any
+        """
+
+        self._result = result
+        self._event.set()
+
+    def set_exception(self, exc):
+        """
+        set_exception
+        =============
+        Stores the raised exception and wakes up all waiters.
+
+        Parameters
+        ----------
+        :param exc: The exception raised by the computation.
+        :type exc: BaseException
+        """
+
+        self._exc = exc
+        self._event.set()
+
+    def wait(self):
+        """
+        wait
+        ====
+        Blocks until the computation is done, then returns its result
+        or raises its exception.
+
+        Return
+        ------
+        :return: The computed result.
+        :rtype: Any
+        """
+
+        self._event.wait()
+        if self._exc is not None:
+            raise self._exc
+        return self._result
+
+
+class _Recording:
+    """
+    _Recording
+    ==========
+    A cached iterator result, recording items as they are first consumed so that
+    every call can replay them from the start. Items are only pulled from the source
+    when a consumer gets past the recorded ones, so a source abandoned early is never
+    consumed further than needed. If the source raises, consumers reaching that point raise too.
+    If on_item is set, it is called with the recording and each newly recorded item.
+    """
+
+    __slots__ = ("_source", "_items", "_lock", "_error", "on_item")
+
+    def __init__(self, source):
+        self._source = source
+        self._items = []
+        self._lock = Lock()
+        self._error = None
+        self.on_item = None
+
+    def __reduce__(self):
+        # recordings are tied to a live iterator, so they are never sent to a backend
+        raise TypeError("iterator results cannot be pickled")
+
+    def _record(self, index):
+        # pulls items from the source until index is recorded,
+        # returning False if the source is exhausted first
+        with self._lock:
+            while len(self._items) <= index:
+                if self._error is not None:
+                    raise _clone_error(self._error)
+                if self._source is None:
+                    return False
+
+                try:
+                    item = next(self._source)
+                except StopIteration:
+                    self._source = None
+                    continue
+                except Exception as e:
+                    self._source = None
+                    self._error = e
+                    raise
+
+                self._items.append(item)
+                if self.on_item is not None:
+                    self.on_item(self, item)
+            return True
+
+    def __iter__(self):
+        items = self._items
+        index = 0
+        while index < len(items) or self._record(index):
+            yield items[index]
+            index += 1
+
+
+def _record_iterators(func):
+    """
+    _record_iterators
+    =================
+    Wraps func so that the generators and lazy map, filter, and zip iterators it returns
+    are replaced by a _Recording. Other iterators, such as files or database cursors,
+    are returned as is, since replaying them would hide their other methods.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        return _Recording(result) if type(result) in _RECORDED_TYPES else result
+
+    return wrapper
+
+
+def _as_tags(tags):
+    """
+    _as_tags
+    ========
+    Normalizes tags to a tuple; a str or other non iterable value is a single tag.
+    """
+
+    if tags is None:
+        return ()
+    if isinstance(tags, (str, bytes)):
+        return (tags,)
+    try:
+        return tuple(tags)
+    except TypeError:
+        return (tags,)
+
+
+def invalidate_tag(tag):
+    """
+    invalidate_tag
+    ==============
+    Removes every entry with the given tag from every store.
+
+    Parameters
+    ----------
+    :param tag: The tag to invalidate.
+    :type tag: Hashable
+
+    Return
+    ------
+    :return: The number of entries removed.
+    :rtype: int
+    """
+
+    with _TAGS_LOCK:
+        stores = set(_TAGS.get(tag, ())) | set(_BACKED)
+
+    removed = sum(store.invalidate_memory(tag) for store in stores)
+    # stores sharing a backend namespace only need to sweep it once
+    backends = {
+        (id(store.backend), store.namespace): store
+        for store in stores
+        if store.backend is not None
+    }
+    return removed + sum(store.invalidate_backend(tag) for store in backends.values())
+
+
+def _sweep_loop(store_ref, interval):
+    """
+    _sweep_loop
+    ===========
+    Periodically removes expired entries from a store in small batches,
+    releasing the lock between batches so callers are not starved.
+    Exits once the store has been garbage collected.
+
+    Parameters
+    ----------
+    :param store_ref: A weak reference to the store to sweep.
+    :type store_ref: weakref.ref
+    :param interval: The time in seconds to wait between sweeps.
+    :type interval: int | float
+    """
+
+    while True:
+        sleep(interval)
+
+        store = store_ref()
+        if store is None:
+            return
+
+        while store.expire(_SWEEP_BATCH) == _SWEEP_BATCH:
+            sleep(0)
+
+        # drop the strong reference before sleeping
+        del store
+
+
+def _stats_loop(store_ref, hook, interval, stopped):
+    """
+    _stats_loop
+    ===========
+    Periodically passes a snapshot of a store's statistics to a hook
+    until stopped is set or the store has been garbage collected.
+
+    Parameters
+    ----------
+    :param store_ref: A weak reference to the store to report on.
+    :type store_ref: weakref.ref
+    :param hook: The callable to pass each CacheInfo snapshot to.
+    :type hook: Callable[[CacheInfo], Any]
+    :param interval: The time in seconds to wait between reports.
+    :type interval: int | float
+    :param stopped: The event that stops the reports when set.
+    :type stopped: threading.Event
+    """
+
+    while not stopped.wait(interval):
+        store = store_ref()
+        if store is None:
+            return
+
+        info = store.info()
+        del store
+        hook(info)
+
+
+# --stores-- #
+# the store owns its entries, their metadata, statistics, and background work in one place,
+# so that a hit only has to touch a single object under a single lock
+class _CacheStore:  # pylint: disable=too-many-instance-attributes
+    """
+    _CacheStore
+    ===========
+    In-memory store backing the cache decorator, evicting entries with the given policy.
+    When thread_safe is True, every operation is locked and concurrent misses
+    of the same key are deduplicated so that only one caller computes it.
+    When a ttl is given, entries expire lazily on lookup and, if a sweep_interval
+    is given, in bulk on a background daemon thread.
+    When a backend is given, misses are looked up in it before being computed,
+    and computed values are written through to it.
+    When refresh_ahead or stale_grace is given, hits on entries close to or just past
+    their expiry return the current value and recompute it in the background.
+    When exceptions are given, those raised by computations are cached in a separate
+    store and raised again for the same key.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        maxsize=None,
+        *,
+        policy="lru",
+        maxbytes=None,
+        sizeof="shallow",
+        thread_safe=False,
+        ttl=None,
+        sweep_interval=None,
+        refresh_ahead=None,
+        stale_grace=None,
+        exceptions=(),
+        exception_ttl=None,
+        exception_maxsize=None,
+        tags=None,
+        backend=None,
+        namespace="",
+    ):
+        """
+        _CacheStore
+        ===========
+        In-memory store backing the cache decorator, evicting entries with the given policy.
+
+        Parameters
+        ----------
+        :param maxsize: The maximum number of entries to store, defaults to None.
+        - Enter None for no size limitation.\n
+        :type maxsize: int | None, optional
+        :param policy: The eviction policy, defaults to "lru".
+        :type policy: Literal["lru", "lfu", "tinylfu"], optional
+        :param maxbytes: The maximum estimated size in bytes of the values stored, defaults to None.
+        - Enter None for no size limitation.\n
+        :type maxbytes: int | None, optional
+        :param sizeof: How to estimate the size of values when maxbytes is given, defaults to "shallow".
+        - "shallow": Uses sys.getsizeof.
+        - "deep": Also counts every object the value references.
+        - Enter a callable that takes a value and returns its size for custom estimation.\n
+        :type sizeof: Literal["shallow", "deep"] | Callable[[Any], int], optional
+        :param thread_safe: Whether to lock the store and deduplicate concurrent misses, defaults to False.
+        :type thread_safe: bool, optional
+        :param ttl: The time in seconds entries live for, defaults to None.
+        - Enter None for entries that never expire.
+        - Enter a callable to compute the ttl of each entry from its value;
+        it may return None for entries that never expire.\n
+        :type ttl: int | float | Callable[[Any], int | float | None] | None, optional
+        :param sweep_interval: The time in seconds between background sweeps of expired entries,
+        defaults to None.
+        - Enter None to only expire entries lazily on lookup.\n
+        :type sweep_interval: int | float | None, optional
+        :param refresh_ahead: The time in seconds before expiry from which a hit
+        triggers a background refresh of the entry, defaults to None.
+        :type refresh_ahead: int | float | None, optional
+        :param stale_grace: The time in seconds after expiry during which an entry
+        is still returned while it is refreshed in the background, defaults to None.
+        :type stale_grace: int | float | None, optional
+        :param exceptions: The exception types to cache when raised by a computation, defaults to ().
+        :type exceptions: Tuple[Type[BaseException], ...], optional
+        :param exception_ttl: The time in seconds cached exceptions live for, defaults to None.
+        :type exception_ttl: int | float | None, optional
+        :param exception_maxsize: The maximum number of cached exceptions, defaults to None.
+        :type exception_maxsize: int | None, optional
+        :param tags: The tags of every entry, or a callable computing them from
+        the args and kwargs of the call that computed the entry, defaults to None.
+        :type tags: Hashable | Iterable[Hashable] | Callable[..., Hashable | Iterable[Hashable]] | None, optional
+        :param backend: The second tier to consult on misses, such as a DiskStore, defaults to None.
+        :type backend: DiskStore | SharedMemoryStore | None, optional
+        :param namespace: The namespace of the entries in the backend, defaults to "".
+        :type namespace: str, optional
+        """
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.thread_safe = thread_safe
+        self.ttl = ttl
+        self.backend = backend
+        self.namespace = namespace
+
+        self._data = {}
+        self._sizes = {}
+        self._sizeof = SIZERS.get(sizeof, sizeof)
+        self.currbytes = 0
+        self._policy = POLICIES[policy](maxsize)
+        # background refreshes insert from other threads
+        self._refreshing = refresh_ahead is not None or stale_grace is not None
+        self._refresh_ahead = refresh_ahead or 0
+        self._grace = stale_grace or 0
+        self._refreshes = {}
+
+        # negative cache, kept apart so failures never evict results
+        self.exceptions = exceptions
+        self._errors = None
+
+        # tag -> keys, and key -> tags to untag removed entries
+        self.tags = tags
+        self._tagged = {}
+        self._key_tags = {}
+        if exceptions:
+            self._errors = _CacheStore(
+                exception_maxsize,
+                thread_safe=thread_safe or sweep_interval is not None or self._refreshing,
+                ttl=exception_ttl,
+            )
+
+        if backend is not None:
+            with _TAGS_LOCK:
+                _BACKED.add(self)
+
+        self._locked = thread_safe or sweep_interval is not None or self._refreshing
+        self._lock = Lock() if self._locked else nullcontext()
+        self._flights = {}
+        self._tasks = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_time = 0.0
+
+        self._expires = {}
+        # (deadline, tiebreaker, key) heap, only kept when sweeping
+        self._deadlines = None
+        self._counter = count()
+
+        if sweep_interval is not None:
+            self._deadlines = []
+            Thread(
+                target=_sweep_loop,
+                args=(ref(self), sweep_interval),
+                name="devgizmos-cache-sweeper",
+                daemon=True,
+            ).start()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def get(self, key, default=_MISSING):
+        """
+        get
+        ===
+        Returns the value stored under key, marking it as recently used.
+
+        Parameters
+        ----------
+        :param key: The key to look up.
+        :type key: Hashable
+        :param default: The value to return if key is not stored.
+        :type default: Any, optional
+
+        Return
+        ------
+        :return: The stored value, or default if it is missing.
+        :rtype: Any
+        """
+
+        with self._lock:
+            value = self._lookup(key)
+
+        return default if value is _MISSING else value
+
+    def _lookup(self, key):
+        # callers must hold the lock
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+
+        if self._expires:
+            deadline = self._expires.get(key)
+            # entries within their stale grace period are still returned
+            if deadline is not None and deadline + self._grace <= monotonic():
+                self._remove(key)
+                return _MISSING
+
+        self._policy.hit(key)
+        return value
+
+    def set(self, key, value):
+        """
+        set
+        ===
+        Stores value under key, evicting the least recently used entry if the store is full.
+
+        Parameters
+        ----------
+        :param key: The key to store the value under.
+        :type key: Hashable
+        :param value: The value to store.
+        :type value: Any
+        """
+
+        ttl = self._ttl_for(value)
+        with self._lock:
+            self._insert(key, value, ttl)
+
+    def _ttl_for(self, value):
+        return self.ttl(value) if callable(self.ttl) else self.ttl
+
+    def tags_for(self, args, kwargs):
+        """
+        tags_for
+        ========
+        Returns the tags of an entry computed with the given args and kwargs.
+        """
+
+        if callable(self.tags):
+            return _as_tags(self.tags(*args, **kwargs))
+        return _as_tags(self.tags)
+
+    def _insert(self, key, value, ttl, tags=()):
+        # callers must hold the lock
+        size = 0
+        if self.maxbytes is not None:
+            size = self._sizeof(value)
+            # a value that can never fit is not stored at all
+            if size > self.maxbytes:
+                if key in self._data:
+                    self._remove(key)
+                return
+
+        if key in self._data:
+            self._policy.hit(key)
+        else:
+            self._policy.add(key)
+
+        self._data[key] = value
+        if self.maxbytes is not None and type(value) is _Recording:
+            # recorded items are only known as they are pulled, so they are accounted for then
+            value.on_item = partial(self._grow, key)
+        if tags or self._key_tags:
+            self._untag(key)
+            self._tag(key, tags)
+        if self.maxbytes is not None:
+            self.currbytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            deadline = monotonic() + ttl
+            self._expires[key] = deadline
+            if self._deadlines is not None:
+                heappush(self._deadlines, (deadline, next(self._counter), key))
+
+        # admission policies may evict the new key itself
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._evict()
+        if self.maxbytes is not None:
+            while self.currbytes > self.maxbytes:
+                self._evict()
+
+    def _grow(self, key, recording, item):
+        # accounts for an item recorded by the recording stored under key,
+        # evicting entries to stay within maxbytes
+        with self._lock:
+            if self._data.get(key) is not recording:
+                return
+
+            size = self._sizeof(item)
+            self.currbytes += size
+            self._sizes[key] += size
+            # a recording that can never fit is not stored any longer
+            if self._sizes[key] > self.maxbytes:
+                self._remove(key)
+            while self.currbytes > self.maxbytes:
+                self._evict()
+
+    def _tag(self, key, tags):
+        # callers must hold the lock
+        if not tags:
+            return
+
+        self._key_tags[key] = tags
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is None:
+                keys = self._tagged[tag] = set()
+                with _TAGS_LOCK:
+                    _TAGS.setdefault(tag, WeakSet()).add(self)
+            keys.add(key)
+
+    def _untag(self, key):
+        # callers must hold the lock
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+                with _TAGS_LOCK:
+                    stores = _TAGS.get(tag)
+                    if stores is not None:
+                        stores.discard(self)
+                        if not stores:
+                            del _TAGS[tag]
+
+    def invalidate(self, tag):
+        """
+        invalidate
+        ==========
+        Removes every entry and cached exception with the given tag, from the backend too,
+        including the entries stored there by other processes.
+
+        Parameters
+        ----------
+        :param tag: The tag to invalidate.
+        :type tag: Hashable
+
+        Return
+        ------
+        :return: The number of entries removed, not counting cached exceptions.
+        :rtype: int
+        """
+
+        return self.invalidate_memory(tag) + self.invalidate_backend(tag)
+
+    def invalidate_memory(self, tag):
+        """
+        invalidate_memory
+        =================
+        Removes every entry and cached exception with the given tag from memory,
+        along with the backend copies of those entries,
+        in time proportional to the number of such entries.
+
+        Return
+        ------
+        :return: The number of entries removed, not counting cached exceptions.
+        :rtype: int
+        """
+
+        if self._errors is not None:
+            self._errors.invalidate(tag)
+
+        with self._lock:
+            keys = list(self._tagged.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+
+        if self.backend is not None:
+            for key in keys:
+                digest = _digest(key)
+                if digest is not None:
+                    self.backend.delete(self.namespace, digest)
+
+        return len(keys)
+
+    def invalidate_backend(self, tag):
+        """
+        invalidate_backend
+        ==================
+        Removes every entry with the given tag that is only held by the backend,
+        such as the entries stored by other processes.
+
+        Return
+        ------
+        :return: The number of entries removed.
+        :rtype: int
+        """
+
+        digest = None if self.backend is None else _digest(tag)
+        if digest is None:
+            return 0
+        return self.backend.delete_tagged(self.namespace, digest)
+
+    def _evict(self):
+        # callers must hold the lock
+        key = self._policy.evict()
+        del self._data[key]
+        self._expires.pop(key, None)
+        self.currbytes -= self._sizes.pop(key, 0)
+        if self._key_tags:
+            self._untag(key)
+        self.evictions += 1
+
+    def _remove(self, key):
+        # callers must hold the lock
+        del self._data[key]
+        self._expires.pop(key, None)
+        self.currbytes -= self._sizes.pop(key, 0)
+        if self._key_tags:
+            self._untag(key)
+        self._policy.remove(key)
+
+    def expire(self, limit=None):
+        """
+        expire
+        ======
+        Removes expired entries from the store.
+
+        Parameters
+        ----------
+        :param limit: The maximum number of entries to remove, defaults to None.
+        - Enter None for no limit.\n
+        :type limit: int | None, optional
+
+        Return
+        ------
+        :return: The number of entries removed.
+        :rtype: int
+        """
+
+        now = monotonic()
+        removed = 0
+
+        with self._lock:
+            if self._deadlines is None:
+                expired = [
+                    key
+                    for key, deadline in self._expires.items()
+                    if deadline + self._grace <= now
+                ]
+                if limit is not None:
+                    expired = expired[:limit]
+
+                for key in expired:
+                    self._remove(key)
+                return len(expired)
+
+            while self._deadlines and self._deadlines[0][0] + self._grace <= now:
+                if limit is not None and removed >= limit:
+                    break
+
+                deadline, _, key = heappop(self._deadlines)
+                # skip heap items made stale by an overwrite or eviction
+                if self._expires.get(key) == deadline:
+                    self._remove(key)
+                    removed += 1
+
+        return removed
+
+    def clear(self):
+        """
+        clear
+        =====
+        Removes every entry (and cached exception) from the store and its backend namespace,
+        and resets its statistics.
+        """
+
+        if self.backend is not None:
+            self.backend.clear(self.namespace)
+        if self._errors is not None:
+            self._errors.clear()
+
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.currbytes = 0
+            self._policy.clear()
+            self._expires.clear()
+            if self._deadlines is not None:
+                self._deadlines.clear()
+            for key in list(self._key_tags):
+                self._untag(key)
+
+            self.hits = self.misses = self.evictions = 0
+            self.miss_time = 0.0
+
+    def info(self):
+        """
+        info
+        ====
+        Returns a snapshot of the store's statistics.
+
+        Return
+        ------
+        :return: The store's statistics.
+        :rtype: CacheInfo
+        """
+
+        with self._lock:
+            return CacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.maxsize,
+                len(self._data),
+                self.miss_time,
+                self.maxbytes,
+                self.currbytes,
+            )
+
+    def add_stats_hook(self, hook, interval):
+        """
+        add_stats_hook
+        ==============
+        Passes a snapshot of the store's statistics to hook every interval seconds
+        from a daemon thread.
+
+        Parameters
+        ----------
+        :param hook: The callable to pass each CacheInfo snapshot to.
+        :type hook: Callable[[CacheInfo], Any]
+        :param interval: The time in seconds between snapshots.
+        :type interval: int | float
+
+        Return
+        ------
+        :return: A function that stops the reports when called.
+        :rtype: Callable[[], None]
+        """
+
+        stopped = Event()
+        Thread(
+            target=_stats_loop,
+            args=(ref(self), hook, interval, stopped),
+            name="devgizmos-cache-stats",
+            daemon=True,
+        ).start()
+
+        return stopped.set
+
+    def get_or_compute(self, key, func, args, kwargs):
+        """
+        get_or_compute
+        ==============
+        Returns the value stored under key, computing and storing it with func if it is missing.
+        In thread safe mode, only the first caller computes a missing key
+        while the others wait for its result.
+
+        Parameters
+        ----------
+        :param key: The key to look up.
+        :type key: Hashable
+        :param func: The function used to compute missing values.
+        :type func: Callable[..., Any]
+        :param args: The arguments to pass to func.
+        :type args: Tuple[Any, ...]
+        :param kwargs: The keyword arguments to pass to func.
+        :type kwargs: Dict[str, Any]
+
+        Return
+        ------
+        :return: The stored or computed value.
+        :rtype: Any
+        """
+
+        if not self.thread_safe:
+            # skip entering the null lock on the hot path
+            if self._locked:
+                with self._lock:
+                    value = self._lookup(key)
+            elif self._expires:
+                value = self._lookup(key)
+            else:
+                # _lookup inlined, since without ttls a stored value is always valid
+                value = self._data.get(key, _MISSING)
+                if value is not _MISSING:
+                    self._policy.hit(key)
+                    self.hits += 1
+                    return value
+
+            if value is not _MISSING:
+                self.hits += 1
+                if self._refreshing:
+                    self._refresh_if_due(key, func, args, kwargs)
+                return value
+
+            value, ttl, tags = self._fill(key, func, args, kwargs)
+            with self._lock:
+                self._insert(key, value, ttl, tags)
+            return value
+
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                due = self._refreshing and self._claim_refresh(key)
+            else:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    # the result is shared rather than recomputed
+                    self.hits += 1
+
+        if value is not _MISSING:
+            if due:
+                self._start_refresh(key, func, args, kwargs)
+            return value
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            value, ttl, tags = self._fill(key, func, args, kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._flights[key]
+            flight.set_exception(e)
+            raise
+
+        # store the value before releasing the flight so that
+        # no caller can miss both the entry and the flight
+        with self._lock:
+            self._insert(key, value, ttl, tags)
+            del self._flights[key]
+        flight.set_result(value)
+
+        return value
+
+    def _claim_refresh(self, key):
+        # returns whether the entry is due for a refresh that nobody else started;
+        # callers must hold the lock
+        deadline = self._expires.get(key)
+        if deadline is None or key in self._refreshes:
+            return False
+        if monotonic() < deadline - self._refresh_ahead:
+            return False
+
+        self._refreshes[key] = None
+        return True
+
+    def _refresh_if_due(self, key, func, args, kwargs):
+        with self._lock:
+            due = self._claim_refresh(key)
+        if due:
+            self._start_refresh(key, func, args, kwargs)
+
+    def _start_refresh(self, key, func, args, kwargs):
+        Thread(
+            target=self._refresh,
+            args=(key, func, args, kwargs),
+            name="devgizmos-cache-refresh",
+            daemon=True,
+        ).start()
+
+    def _refresh(self, key, func, args, kwargs):
+        # recomputes an entry in the background; if func raises,
+        # the current value is kept until it expires for good
+        try:
+            value = func(*args, **kwargs)
+            self.preload(key, value, self.tags_for(args, kwargs))
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+        finally:
+            with self._lock:
+                self._refreshes.pop(key, None)
+
+    async def _refresh_async(self, key, func, args, kwargs):
+        # async counterpart of _refresh
+        try:
+            value = await func(*args, **kwargs)
+            self.preload(key, value, self.tags_for(args, kwargs))
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+        finally:
+            with self._lock:
+                self._refreshes.pop(key, None)
+
+    def preload(self, key, value, tags=()):
+        """
+        preload
+        =======
+        Stores a precomputed value under key, writing it through to the backend if there is one.
+
+        Parameters
+        ----------
+        :param key: The key to store the value under.
+        :type key: Hashable
+        :param value: The value to store.
+        :type value: Any
+        :param tags: The tags of the entry, defaults to ().
+        :type tags: Tuple[Hashable, ...], optional
+        """
+
+        ttl = self._ttl_for(value)
+        if self.backend is not None:
+            digest = _digest(key)
+            if digest is not None:
+                self._write_back(digest, value, ttl, tags)
+
+        with self._lock:
+            self._insert(key, value, ttl, tags)
+
+    def _write_back(self, digest, value, ttl, tags):
+        # stores a value in the backend along with the digests of its tags, so any process can
+        # invalidate it; a value with a tag that has no digest could not be, so it stays in memory
+        tag_digests = tuple(map(_digest, tags))
+        if None not in tag_digests:
+            self.backend.set(self.namespace, digest, value, ttl, tag_digests)
+
+    def fill_computed(self, key, args, kwargs, value, error, elapsed):
+        """
+        fill_computed
+        =============
+        Stores the outcome of a computation of a missing key made elsewhere, such as in a worker,
+        counting it as a miss: a value is stored and written through to the backend,
+        while an exception is cached if it is of one of the cached types.
+
+        Parameters
+        ----------
+        :param key: The key that was computed.
+        :type key: Hashable
+        :param args: The arguments the value was computed with.
+        :type args: Tuple[Any, ...]
+        :param kwargs: The keyword arguments the value was computed with.
+        :type kwargs: Dict[str, Any]
+        :param value: The computed value, ignored if error is not None.
+        :type value: Any
+        :param error: The exception raised by the computation, or None if it succeeded.
+        :type error: Exception | None
+        :param elapsed: The time in seconds the computation took.
+        :type elapsed: float
+        """
+
+        with self._lock:
+            self.misses += 1
+            self.miss_time += elapsed
+
+        tags = self.tags_for(args, kwargs)
+        if error is None:
+            self.preload(key, value, tags)
+        elif isinstance(error, self.exceptions):
+            self._cache_error(key, error, tags)
+
+    def get_or_compute_many(self, items, func, args, kwargs):
+        """
+        get_or_compute_many
+        ===================
+        Returns the values stored for the given items, computing every missing one
+        with a single call to func(missing_items, *args, **kwargs), which must return a mapping
+        from items to values. Items missing from that mapping are neither stored nor returned.
+
+        Parameters
+        ----------
+        :param items: A dict mapping each requested item to its key in the store.
+        :type items: Dict[Hashable, Hashable]
+        :param func: The batch function used to compute missing values.
+        :type func: Callable[..., Mapping[Hashable, Any]]
+        :param args: The extra arguments to pass to func.
+        :type args: Tuple[Any, ...]
+        :param kwargs: The keyword arguments to pass to func.
+        :type kwargs: Dict[str, Any]
+
+        Return
+        ------
+        :return: A dict mapping the items found or computed to their values, in the order requested.
+        :rtype: Dict[Hashable, Any]
+        """
+
+        found, missing = self._lookup_many(items)
+        if missing:
+            start = perf_counter()
+            try:
+                computed = func(missing, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                with self._lock:
+                    self.miss_time += elapsed
+
+            self._store_many(items, missing, computed, found)
+
+        return {item: found[item] for item in items if item in found}
+
+    async def get_or_compute_many_async(self, items, func, args, kwargs):
+        """
+        get_or_compute_many_async
+        =========================
+        Async counterpart of get_or_compute_many, awaiting func for the missing items.
+        """
+
+        found, missing = self._lookup_many(items)
+        if missing:
+            start = perf_counter()
+            try:
+                computed = await func(missing, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                with self._lock:
+                    self.miss_time += elapsed
+
+            self._store_many(items, missing, computed, found)
+
+        return {item: found[item] for item in items if item in found}
+
+    def _lookup_many(self, items):
+        # splits items into a dict of found values and a list of missing items,
+        # consulting the backend for the ones not in memory
+        found = {}
+        missing = []
+
+        with self._lock:
+            for item, key in items.items():
+                value = self._lookup(key)
+                if value is _MISSING:
+                    missing.append(item)
+                else:
+                    found[item] = value
+
+        if self.backend is not None and missing:
+            still_missing = []
+            for item in missing:
+                digest = _digest(items[item])
+                loaded = None if digest is None else self.backend.get(self.namespace, digest)
+                if loaded is None:
+                    still_missing.append(item)
+                    continue
+
+                value, ttl = loaded
+                found[item] = value
+                with self._lock:
+                    self._insert(items[item], value, ttl)
+            missing = still_missing
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def _store_many(self, items, missing, computed, found):
+        # stores the computed values of the missing items and adds them to found
+        for item in missing:
+            if item in computed:
+                value = computed[item]
+                self.preload(items[item], value)
+                found[item] = value
+
+    def _raise_cached_error(self, key):
+        # raises a clone of the exception cached for key, if any,
+        # so that concurrent callers do not share one traceback
+        if self._errors is None:
+            return
+
+        error = self._errors.get(key, None)
+        if error is not None:
+            with self._lock:
+                self.hits += 1
+            raise _clone_error(error)
+
+    def _cache_error(self, key, error, tags):
+        # stores a clone without the traceback, which would keep the failed call's frames alive
+        self._errors.preload(key, _clone_error(error), tags)
+
+    def _fill(self, key, func, args, kwargs):
+        # loads a missing value from the backend or computes it,
+        # returning the value, its ttl and its tags; callers must not hold the lock
+        self._raise_cached_error(key)
+
+        digest = None
+        if self.backend is not None:
+            digest = _digest(key)
+            found = None if digest is None else self.backend.get(self.namespace, digest)
+            if found is not None:
+                with self._lock:
+                    self.hits += 1
+                return (*found, self.tags_for(args, kwargs))
+
+        with self._lock:
+            self.misses += 1
+
+        start = perf_counter()
+        try:
+            value = func(*args, **kwargs)
+        except self.exceptions as e:
+            self._cache_error(key, e, self.tags_for(args, kwargs))
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.miss_time += elapsed
+
+        ttl = self._ttl_for(value)
+        tags = self.tags_for(args, kwargs)
+        if digest is not None:
+            self._write_back(digest, value, ttl, tags)
+
+        return value, ttl, tags
+
+    async def get_or_compute_async(self, key, func, args, kwargs):
+        """
+        get_or_compute_async
+        ====================
+        Returns the value stored under key, awaiting and storing the result of func if it is missing.
+        Concurrent awaiters of the same missing key share one task,
+        and results of tasks that are cancelled or raise are not stored.
+
+        Parameters
+        ----------
+        :param key: The key to look up.
+        :type key: Hashable
+        :param func: The coroutine function used to compute missing values.
+        :type func: Callable[..., Awaitable[Any]]
+        :param args: The arguments to pass to func.
+        :type args: Tuple[Any, ...]
+        :param kwargs: The keyword arguments to pass to func.
+        :type kwargs: Dict[str, Any]
+
+        Return
+        ------
+        :return: The stored or computed value.
+        :rtype: Any
+        """
+
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                if self._refreshing and self._claim_refresh(key):
+                    # keep a reference so the task is not garbage collected
+                    self._refreshes[key] = ensure_future(
+                        self._refresh_async(key, func, args, kwargs)
+                    )
+                return value
+
+            task = self._tasks.get(key)
+            # tasks are bound to their event loop, so a task left
+            # behind by another loop cannot be shared
+            if task is None or task.get_loop() is not get_running_loop():
+                task = self._tasks[key] = ensure_future(
+                    self._compute_async(key, func, args, kwargs)
+                )
+            else:
+                self.hits += 1
+
+        # shield the shared task so cancelling one awaiter does not cancel the others
+        return await shield(task)
+
+    async def _compute_async(self, key, func, args, kwargs):
+        try:
+            value, ttl, tags = await self._fill_async(key, func, args, kwargs)
+        except BaseException:
+            with self._lock:
+                if self._tasks.get(key) is current_task():
+                    del self._tasks[key]
+            raise
+
+        with self._lock:
+            self._insert(key, value, ttl, tags)
+            if self._tasks.get(key) is current_task():
+                del self._tasks[key]
+
+        return value
+
+    async def _fill_async(self, key, func, args, kwargs):
+        # async counterpart of _fill
+        self._raise_cached_error(key)
+
+        digest = None
+        if self.backend is not None:
+            digest = _digest(key)
+            found = None if digest is None else self.backend.get(self.namespace, digest)
+            if found is not None:
+                with self._lock:
+                    self.hits += 1
+                return (*found, self.tags_for(args, kwargs))
+
+        with self._lock:
+            self.misses += 1
+
+        start = perf_counter()
+        try:
+            value = await func(*args, **kwargs)
+        except self.exceptions as e:
+            self._cache_error(key, e, self.tags_for(args, kwargs))
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.miss_time += elapsed
+
+        ttl = self._ttl_for(value)
+        tags = self.tags_for(args, kwargs)
+        if digest is not None:
+            self._write_back(digest, value, ttl, tags)
+
+        return value, ttl, tags
+
+
+class _ShardedCacheStore:
+    """
+    _ShardedCacheStore
+    ==================
+    A store split into independent thread safe _CacheStore shards, each with its own lock
+    and eviction order, so that threads working on different keys rarely wait for each other.
+    Keys are assigned to shards by hash, and the size limits are split evenly between the shards.
+    """
+
+    def __init__(self, shards, maxsize=None, *, maxbytes=None, **options):
+        """
+        _ShardedCacheStore
+        ==================
+        A store split into independent thread safe _CacheStore shards.
+
+        Parameters
+        ----------
+        :param shards: The number of shards.
+        :type shards: int
+        :param maxsize: The maximum number of entries to store across all shards, defaults to None.
+        :type maxsize: int | None, optional
+        :param maxbytes: The maximum estimated size in bytes of the values stored across all shards,
+        defaults to None.
+        :type maxbytes: int | None, optional
+        :param options: The other options of every shard, as taken by _CacheStore.
+        :type options: Any
+        """
+
+        def split(total, index):
+            # the remainder goes to the first shards, and every shard can hold at least one entry
+            if total is None:
+                return None
+            return max(1, total // shards + (index < total % shards))
+
+        options["thread_safe"] = True
+        self.thread_safe = True
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._shards = tuple(
+            _CacheStore(split(maxsize, i), maxbytes=split(maxbytes, i), **options)
+            for i in range(shards)
+        )
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, key):
+        return key in self._shards[hash(key) % len(self._shards)]
+
+    def get_or_compute(self, key, func, args, kwargs):
+        """
+        get_or_compute
+        ==============
+        Returns the value stored under key by its shard, computing and storing it with func if it is missing.
+        """
+
+        shard = self._shards[hash(key) % len(self._shards)]
+        return shard.get_or_compute(key, func, args, kwargs)
+
+    async def get_or_compute_async(self, key, func, args, kwargs):
+        """
+        get_or_compute_async
+        ====================
+        Returns the value stored under key by its shard, awaiting and storing the result of func
+        if it is missing.
+        """
+
+        shard = self._shards[hash(key) % len(self._shards)]
+        return await shard.get_or_compute_async(key, func, args, kwargs)
+
+    def preload(self, key, value, tags=()):
+        """
+        preload
+        =======
+        Stores a precomputed value under key in its shard.
+        """
+
+        self._shards[hash(key) % len(self._shards)].preload(key, value, tags)
+
+    def fill_computed(self, key, args, kwargs, value, error, elapsed):
+        """
+        fill_computed
+        =============
+        Stores the outcome of a computation of a missing key made elsewhere in its shard.
+        """
+
+        shard = self._shards[hash(key) % len(self._shards)]
+        shard.fill_computed(key, args, kwargs, value, error, elapsed)
+
+    def tags_for(self, args, kwargs):
+        """
+        tags_for
+        ========
+        Returns the tags of an entry computed with the given args and kwargs.
+        """
+
+        return self._shards[0].tags_for(args, kwargs)
+
+    def invalidate(self, tag):
+        """
+        invalidate
+        ==========
+        Removes every entry with the given tag from every shard,
+        sweeping the backend they share once.
+        """
+
+        removed = sum(shard.invalidate_memory(tag) for shard in self._shards)
+        return removed + self._shards[0].invalidate_backend(tag)
+
+    def clear(self):
+        """
+        clear
+        =====
+        Removes every entry from every shard and resets their statistics.
+        """
+
+        for shard in self._shards:
+            shard.clear()
+
+    def info(self):
+        """
+        info
+        ====
+        Returns the statistics of every shard combined.
+        """
+
+        infos = [shard.info() for shard in self._shards]
+        return CacheInfo(
+            sum(info.hits for info in infos),
+            sum(info.misses for info in infos),
+            sum(info.evictions for info in infos),
+            self.maxsize,
+            sum(info.currsize for info in infos),
+            sum(info.miss_time for info in infos),
+            self.maxbytes,
+            sum(info.currbytes for info in infos),
+        )
+
+    # the stats thread only relies on info()
+    add_stats_hook = _CacheStore.add_stats_hook
@@ -0,0 +1,19 @@
+# pylint: disable=all
+
+from typing import Hashable, NamedTuple, Optional
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+    miss_time: float
+    maxbytes: Optional[int]
+    currbytes: int
+    @property
+    def hit_ratio(self) -> float: ...
+    @property
+    def time_saved(self) -> float: ...
+
+def invalidate_tag(tag: Hashable) -> int: ...
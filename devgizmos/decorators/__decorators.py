@@ -7,16 +7,21 @@ Module containing decorators.
 """
 
 # --imports-- #
+from asyncio import Semaphore, gather
 from asyncio import sleep as async_sleep
-from collections import OrderedDict
-from functools import wraps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import partial, update_wrapper, wraps
+from inspect import iscoroutinefunction
 from logging import ERROR, INFO, WARNING, Logger
+from os import cpu_count
 from platform import system
 from re import findall
-from statistics import mean
-from time import perf_counter, perf_counter_ns, sleep
+from threading import Lock
+from time import monotonic, perf_counter, perf_counter_ns, sleep
 from typing import Any, Callable, TypeVar, get_type_hints
 from warnings import warn
+from weakref import ref
 
 from ..checks import (
     check_callable,
@@ -25,6 +30,18 @@ from ..checks import (
     check_type,
     check_value,
 )
+from .__backends import DiskStore, SharedMemoryStore
+from .__benchmarking import _record_baseline, _run_benchmark, _run_benchmark_async
+from .__caching import (
+    SIZERS,
+    _CacheStore,
+    _record_iterators,
+    _Recording,
+    _ShardedCacheStore,
+)
+from .__histogram import LatencyHistogram
+from .__keys import KEY_STRATEGIES, _make_key_builder
+from .__policies import POLICIES
 
 if system() in ("Darwin", "Linux"):
     # pylint: disable=no-name-in-module
@@ -40,6 +57,9 @@ Decorator = Callable[[F], F]
 LoggingLevel = int
 
 TIME_UNITS = ("ns", "us", "ms", "s")
+CACHE_POLICIES = tuple(POLICIES)
+CACHE_SIZERS = tuple(SIZERS)
+CACHE_KEYS = tuple(KEY_STRATEGIES)
 LOGGING_LEVELS = (
     0,  # NOTSET
     10,  # DEBUG
@@ -156,12 +176,171 @@ def _handle_result_reporting(fmt, default, logger, level, **kwargs):
         _print_msg(fmt, default, **kwargs)
 
 
+def _check_refresh(ttl, refresh_ahead, stale_grace):
+    """
+    _check_refresh
+    ==============
+    Validates the values of the refresh_ahead and stale_grace cache options.
+    """
+
+    for name, value in (("refresh_ahead", refresh_ahead), ("stale_grace", stale_grace)):
+        if value is not None:
+            check_in_bounds(value, 0, None, inclusive=False)
+            if ttl is None:
+                raise ValueError(f"{name} requires a ttl")
+
+
+def _as_args(call):
+    """
+    _as_args
+    ========
+    Returns the positional args of a prefetch or preload item;
+    items that are not tuples are a single arg.
+    """
+
+    return call if isinstance(call, tuple) else (call,)
+
+
+def _check_prefetch(workers, processes):
+    """
+    _check_prefetch
+    ===============
+    Validates the arguments of the prefetch attribute of cached functions.
+    """
+
+    # type checks
+    check_type(workers, int, optional=True)
+    check_type(processes, bool)
+
+    # value checks
+    if workers is not None:
+        check_in_bounds(workers, 1, None)
+
+
+def _pending_calls(store, make_key, calls):
+    """
+    _pending_calls
+    ==============
+    Maps the keys of the given calls that are not cached yet to their args, dropping duplicates.
+    """
+
+    pending = {}
+    for call in calls:
+        args = _as_args(call)
+        key = make_key(args, {})
+        if key not in pending and key not in store:
+            pending[key] = args
+
+    return pending
+
+
+def _call_wrapped(wrapper, *args):
+    """
+    _call_wrapped
+    =============
+    Calls the function wrapped by a cached function in a prefetch worker process, bypassing
+    the process's copy of the cache, which may hold flights of the prefetching threads if forked.
+    """
+
+    return wrapper.__wrapped__(*args)
+
+
+def _timed_call(func, args):
+    """
+    _timed_call
+    ===========
+    Calls func with args in a prefetch worker, returning its result or the exception it raised,
+    and the time it took, so that the calling thread can store it like a miss.
+    """
+
+    start = perf_counter()
+    try:
+        value, error = func(*args), None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        value, error = None, e
+    return value, error, perf_counter() - start
+
+
+def _prefetch(store, make_key, target, calls, workers, processes):
+    """
+    _prefetch
+    =========
+    Computes the missing results of the given calls on a thread or process pool,
+    storing them like misses: they count towards the statistics, and exceptions are cached
+    if they are of the cached types. Thread safe stores are filled by worker threads through
+    get_or_compute, so concurrent calls for a key being prefetched wait for it instead of
+    computing it again. Other stores are filled from the calling thread only, as results complete.
+    """
+
+    pending = _pending_calls(store, make_key, calls)
+    if not pending:
+        return 0
+
+    executor_type = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with ExitStack() as stack:
+        executors = [stack.enter_context(executor_type(workers))]
+
+        if store.thread_safe:
+            compute = target
+            if processes:
+                # worker threads wait on the processes, so the store is only used in this process
+                pool = executors[0]
+                executors.append(stack.enter_context(ThreadPoolExecutor(workers or cpu_count())))
+
+                def compute(*args):
+                    return pool.submit(target, *args).result()
+
+            futures = {
+                executors[-1].submit(store.get_or_compute, key, compute, args, {}): key
+                for key, args in pending.items()
+            }
+        else:
+            futures = {
+                executors[0].submit(_timed_call, target, args): key
+                for key, args in pending.items()
+            }
+
+        try:
+            for future in as_completed(futures):
+                if store.thread_safe:
+                    future.result()
+                    continue
+
+                key = futures[future]
+                value, error, elapsed = future.result()
+                store.fill_computed(key, pending[key], {}, value, error, elapsed)
+                if error is not None:
+                    raise error
+        except BaseException:
+            for executor in reversed(executors):
+                executor.shutdown(cancel_futures=True)
+            raise
+
+    return len(futures)
+
+
 # --decorators-- #
-def timer(unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
+def timer(
+    unit="ns",
+    precision=3,
+    *,
+    fmt="",
+    logger=None,
+    level=INFO,
+    aggregate=False,
+    interval=None,
+):
     """
     timer
     =====
     Times how long function it is decorated to takes to run.
+    Coroutine functions are awaited inside the timed region, so their wrapper must be awaited too.
+
+    In aggregating mode, each duration is recorded into a LatencyHistogram instead of being reported,
+    which costs far less than formatting and printing or logging a message on every call.
+    A summary of the durations recorded since the last one is reported every interval seconds
+    (checked when a call ends, so no thread is used) or when the wrapper's flush attribute is called.
+    The wrapper's histogram attribute holds the histogram.
 
     Parameter
     ---------
@@ -179,21 +358,30 @@ def timer(unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
     - args: The arguments passed to the function.
     - kwargs: The keyword arguments passed to the function.
     - returned: The return value of the function.
-    - Ex: fmt="Func {name} took {elapsed} {unit} to run and returned {returned}."\n
+    - Ex: fmt="Func {name} took {elapsed} {unit} to run and returned {returned}."
+    - In aggregating mode, the fields are instead name, unit, count, mean, min, p50, p90, p99, p999, and max.\n
     :type fmt: str, optional
     :param logger: The logger to use if desired, defaults to None.
     - If a logger is used, the result message will not be printed and will instead be passed to the logger.\n
     :type logger: Logger | None, optional
     :param level: The logging level to use, defaults to logging.INFO (20).
     :type level: LoggingLevel, optional
+    :param aggregate: Whether to record durations into a histogram and report summaries, defaults to False.
+    :type aggregate: bool, optional
+    :param interval: The number of seconds between summaries in aggregating mode, defaults to None.
+    - Leave as None to only report summaries when flush is called.\n
+    :type interval: int | float | None, optional
 
     Raises
     ------
     :raises TypeError: If precision is not an int.
     :raises TypeError: If fmt is not a str.
     :raises TypeError: If logger is not a logging.Logger.
+    :raises TypeError: If aggregate is not a bool.
+    :raises TypeError: If interval is not an int, float, or None.
     :raises ValueError: If unit is not 'ns', 'us', 'ms', or 's'.
     :raises ValueError: If level is not a level from logging.
+    :raises ValueError: If interval is not positive, or is given without aggregate.
 
     Example Usage
     -------------
@@ -206,6 +394,17 @@ def timer(unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
     ...
     >>> perf_example()
     [TIMER]: perf_example RAN IN 1277000.0 ns
+    >>>
+    >>> @timer("us", aggregate=True, interval=60)
+    ... def handle_request():
+    ...     sleep(0.001)
+    ...
+    >>> for _ in range(1000):
+    ...     handle_request()
+    ...
+    >>> handle_request.flush()
+    [TIMER]: handle_request RAN 1000 TIMES; MEAN: 1071.612 us, MIN: 1053.305 us, P50: 1063.935 us,
+    P90: 1080.319 us, P99: 1178.623 us, P99.9: 1441.791 us, MAX: 1490.561 us
     ```
     """
 
@@ -213,22 +412,23 @@ def timer(unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
     check_type(precision, int)
     check_type(fmt, str)
     check_type(logger, Logger, optional=True)
+    check_type(aggregate, bool)
+    check_type(interval, (int, float), optional=True)
 
     # value checks
     check_value(unit, TIME_UNITS)
     check_value(level, LOGGING_LEVELS)
+    if interval is not None:
+        check_in_bounds(interval, 0, None, inclusive=False)
+        if not aggregate:
+            raise ValueError("interval requires aggregate")
 
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            local_unit = unit.lower()
-            if local_unit not in TIME_UNITS:
-                local_unit = "ns"
+        local_unit = unit.lower()
+        if local_unit not in TIME_UNITS:
+            local_unit = "ns"
 
-            start_time = perf_counter_ns()
-            result = func(*args, **kwargs)
-
-            delta = perf_counter_ns() - start_time
+        def report(delta, args, kwargs, result):
             elapsed = delta / (1000 ** TIME_UNITS.index(local_unit))
             rounded = round(elapsed, precision)
 
@@ -244,9 +444,64 @@ def timer(unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
 
             _handle_result_reporting(fmt, default, logger, level, **fmt_kwargs)
 
+        if aggregate:
+            histogram = LatencyHistogram()
+            # when the last summary was reported, shared by every thread
+            flushed = [monotonic()]
+
+            def flush():
+                flushed[0] = monotonic()
+                summary = histogram.summary(local_unit, precision, reset=True)
+                if not summary["count"]:
+                    return summary
+
+                fmt_kwargs = {"name": func.__name__, "unit": local_unit, **summary}
+                default = (
+                    f"[TIMER]: {func.__name__} RAN {summary['count']} TIMES; "
+                    f"MEAN: {summary['mean']} {local_unit}, MIN: {summary['min']} {local_unit}, "
+                    f"P50: {summary['p50']} {local_unit}, P90: {summary['p90']} {local_unit}, "
+                    f"P99: {summary['p99']} {local_unit}, P99.9: {summary['p999']} {local_unit}, "
+                    f"MAX: {summary['max']} {local_unit}"
+                )
+
+                _handle_result_reporting(fmt, default, logger, level, **fmt_kwargs)
+                return summary
+
+            def record(delta, *_):
+                histogram.record(delta)
+                if interval is not None and monotonic() - flushed[0] >= interval:
+                    flush()
+
+        observe = record if aggregate else report
+
+        def finish(wrapper):
+            if aggregate:
+                wrapper.histogram = histogram
+                wrapper.flush = flush
+            return wrapper
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # awaited inside the timed region, otherwise only creating the coroutine is timed
+                start_time = perf_counter_ns()
+                result = await func(*args, **kwargs)
+
+                observe(perf_counter_ns() - start_time, args, kwargs, result)
+                return result
+
+            return finish(async_wrapper)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = perf_counter_ns()
+            result = func(*args, **kwargs)
+
+            observe(perf_counter_ns() - start_time, args, kwargs, result)
             return result
 
-        return wrapper
+        return finish(wrapper)
 
     return decorator
 
@@ -258,6 +513,7 @@ def timer_rs(unit="ns", precision=3):
     Acts like timer, but returns the stats.
     Times how long function it is decorated to takes to run,
     and returns a tuple containing the result and the time elapsed.
+    Coroutine functions are awaited inside the timed region, so their wrapper must be awaited too.
 
     Parameter
     ---------
@@ -293,53 +549,109 @@ def timer_rs(unit="ns", precision=3):
     check_value(unit, TIME_UNITS)
 
     def decorator(func):
+        local_unit = unit.lower()
+        if local_unit not in TIME_UNITS:
+            local_unit = "ns"
+        scale = 1000 ** TIME_UNITS.index(local_unit)
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = perf_counter_ns()
+                result = await func(*args, **kwargs)
+
+                delta = perf_counter_ns() - start_time
+                return result, round(delta / scale, precision)
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            local_unit = unit.lower()
-            if local_unit not in TIME_UNITS:
-                local_unit = "ns"
-
             start_time = perf_counter_ns()
             result = func(*args, **kwargs)
 
             delta = perf_counter_ns() - start_time
-            elapsed = delta / (1000 ** TIME_UNITS.index(local_unit))
-            rounded = round(elapsed, precision)
-
-            return result, rounded
+            return result, round(delta / scale, precision)
 
         return wrapper
 
     return decorator
 
 
-def benchmark(trials=10, unit="ns", precision=3, *, fmt="", logger=None, level=INFO):
+# the options past precision are keyword-only and map onto separate steps of a run
+# (warmup, timing, baseline comparison, memory, reporting), which callers mostly leave as is
+def benchmark(  # pylint: disable=too-many-arguments
+    trials=10,
+    unit="ns",
+    precision=3,
+    *,
+    warmup=1,
+    loops=None,
+    baseline=None,
+    threshold=0.05,
+    memory=False,
+    fmt="",
+    logger=None,
+    level=INFO,
+):
     """
     benchmark
     =========
-    Runs the function multiple times and reports average, min, and max execution times.
+    Runs the function multiple times and reports statistics of its execution time per call.
+    The function is first called warmup times untimed, then each of the trials times loops calls,
+    so that functions much faster than the timer's resolution can still be measured accurately.
+    Coroutine functions are awaited inside the timed region, so their wrapper must be awaited too;
+    other tasks running on the event loop meanwhile are timed as well.
 
     Parameters
     ----------
-    :param trials: The number of times to run the function, defaults to 10.
+    :param trials: The number of timed trials, defaults to 10.
     :type trials: int
     :param unit: The unit of time to use, defaults to "ns".
     - Supported units are "ns", "us", "ms", "s".\n
     :type unit: Literal["ns", "us", "ms", "s"], optional
     :param precision: The precision to use when rounding the time, defaults to 3
     :type precision: int, optional
+    :param warmup: The number of untimed calls made before the trials, defaults to 1.
+    :type warmup: int, optional
+    :param loops: The number of calls timed together in each trial, defaults to None.
+    - Leave as None to calibrate it automatically so that each trial lasts a few milliseconds.\n
+    :type loops: int | None, optional
+    :param baseline: The path of a baseline file to compare the results against, defaults to None.
+    - The first results are stored as the baseline, later ones emit a RegressionWarning
+    if they are significantly slower than it by more than threshold.
+    - Files ending in .csv are stored as CSV, others as JSON.\n
+    :type baseline: str | None, optional
+    :param threshold: The tolerated slowdown against the baseline, defaults to 0.05 (5%).
+    :type threshold: int | float, optional
+    :param memory: Whether to also measure the memory allocated per call with tracemalloc, defaults to False.
+    - Memory is measured on separate calls after the timed trials, since tracing slows allocations down.\n
+    :type memory: bool, optional
     :param fmt: Used to enter a custom message format, defaults to "".
     - Leave as an empty string to use the pre-made message.
     - Enter an unformatted string with the following fields to include their values
     - name: The name of the function.
     - trials: The number of trials ran.
-    - avg: The average time of each trial.
-    - min: The shortest time from the trials.
-    - max: The longest time from the trials.
+    - loops: The number of calls in each trial.
+    - warmup: The number of untimed calls made before the trials.
+    - unit: The unit used in the timing.
+    - avg: The average time per call.
+    - median: The median time per call.
+    - stdev: The standard deviation of the time per call.
+    - min: The shortest time per call from the trials.
+    - max: The longest time per call from the trials.
+    - p50, p90, p99: The 50th, 90th, and 99th percentiles of the time per call.
+    - ci_low, ci_high: The bounds of the 95% confidence interval of the average.
+    - outliers: The number of trials outside 1.5 interquartile ranges of the quartiles.
+    - peak_memory: The median peak memory in bytes allocated during a call, or None without memory.
+    - net_memory: The median memory in bytes still allocated after a call, or None without memory.
+    - blocks: The median number of memory blocks still allocated after a call, or None without memory.
+    - baseline: The comparison against the baseline, or an empty string without one.
     - args: The arguments passed to the function.
     - kwargs: The keyword arguments passed to the function.
     - returned: The return value of the function.
-    - Ex: fmt="Func {name} was called with args={args} and kwargs={kwargs} and raised {raised}."\n
+    - Ex: fmt="Func {name} took {median} {unit} (p99 {p99} {unit}) per call."\n
     :type fmt: str, optional
     :param logger: The logger to use if desired, defaults to None.
     - If a logger is used, the result message will not be printed and will instead be passed to the logger.\n
@@ -351,9 +663,17 @@ def benchmark(trials=10, unit="ns", precision=3, *, fmt="", logger=None, level=I
     ------
     :raises TypeError: If trials is not an int.
     :raises TypeError: If precision is not an int.
+    :raises TypeError: If warmup is not an int.
+    :raises TypeError: If loops is not an int or None.
+    :raises TypeError: If baseline is not a str or None.
+    :raises TypeError: If threshold is not an int or float.
+    :raises TypeError: If memory is not a bool.
     :raises TypeError: If fmt is not a str.
     :raises TypeError: If logger is not a logging.Logger.
     :raises ValueError: If trials is less than 1.
+    :raises ValueError: If warmup is less than 0.
+    :raises ValueError: If loops is less than 1.
+    :raises ValueError: If threshold is negative.
     :raises ValueError: If unit is not 'ns', 'us', 'ms', or 's'.
     :raises ValueError: If level is not a level from logging.
 
@@ -367,95 +687,173 @@ def benchmark(trials=10, unit="ns", precision=3, *, fmt="", logger=None, level=I
     ...     sleep(0.001)
     ...
     >>> perf_example()
-    [BENCHMARK]: RAN 10 TRIALS ON perf_example; AVG: 1089670.0 ns, MIN: 1025200.0 ns, MAX: 1140400.0 ns
+    [BENCHMARK]: RAN 10 TRIALS OF 2 LOOPS ON perf_example; AVG: 1062370.0 ns (95% CI 1058930.0-1065810.0),
+    MEDIAN: 1061900.0 ns, STDEV: 4808.3 ns, MIN: 1056450.0 ns, MAX: 1071150.0 ns, P99: 1070950.0 ns, OUTLIERS: 0
     ```
     """
 
     # type checks
     check_type(trials, int)
     check_type(precision, int)
+    check_type(warmup, int)
+    check_type(loops, int, optional=True)
+    check_type(baseline, str, optional=True)
+    check_type(threshold, (int, float))
+    check_type(memory, bool)
     check_type(fmt, str)
     check_type(logger, Logger, optional=True)
 
     # value checks
     check_in_bounds(trials, 1, None)
+    check_in_bounds(warmup, 0, None)
+    if loops is not None:
+        check_in_bounds(loops, 1, None)
+    check_in_bounds(threshold, 0, None)
     check_value(unit, TIME_UNITS)
     check_value(level, LOGGING_LEVELS)
 
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            local_unit = unit.lower()
-            if local_unit not in TIME_UNITS:
-                local_unit = "ns"
-
-            results = []
-            returned = [None]
-
-            for i in range(trials):
-                start_time = perf_counter_ns()
-
-                if i == len(range(trials)) - 1:
-                    returned[0] = func(*args, **kwargs)
-                else:
-                    func(*args, **kwargs)
-
-                delta = perf_counter_ns() - start_time
-                elapsed = delta / (1000 ** TIME_UNITS.index(local_unit))
-
-                results.append(elapsed)
-
-            avg_time = float(round(mean(results), precision))
-            min_time = float(round(min(results), precision))
-            max_time = float(round(max(results), precision))
-
+        options = {
+            "trials": trials,
+            "warmup": warmup,
+            "loops": loops,
+            "unit": unit,
+            "precision": precision,
+            "memory": memory,
+        }
+
+        def report(result, comparison, args, kwargs):
             fmt_kwargs = {
                 "name": func.__name__,
                 "trials": trials,
-                "avg": avg_time,
-                "min": min_time,
-                "max": max_time,
+                "loops": result.loops,
+                "warmup": warmup,
+                "unit": unit,
+                "avg": result.mean,
+                "median": result.median,
+                "stdev": result.stdev,
+                "min": result.min,
+                "max": result.max,
+                "p50": result.p50,
+                "p90": result.p90,
+                "p99": result.p99,
+                "ci_low": result.ci_low,
+                "ci_high": result.ci_high,
+                "outliers": result.outliers,
+                "peak_memory": result.peak_memory,
+                "net_memory": result.net_memory,
+                "blocks": result.blocks,
+                "baseline": comparison.verdict if comparison else "",
                 "args": args,
                 "kwargs": kwargs,
-                "returned": repr(returned[0]),
+                "returned": repr(result.returned),
             }
             default = (
-                f"[BENCHMARK]: RAN {trials} TRIALS ON {func.__name__}; "
-                f"AVG: {avg_time} {local_unit}, MIN: {min_time} {local_unit}, MAX: {max_time} {local_unit}"
+                f"[BENCHMARK]: RAN {trials} TRIALS OF {result.loops} LOOPS ON {func.__name__}; "
+                f"AVG: {result.mean} {unit} (95% CI {result.ci_low}-{result.ci_high}), "
+                f"MEDIAN: {result.median} {unit}, STDEV: {result.stdev} {unit}, "
+                f"MIN: {result.min} {unit}, MAX: {result.max} {unit}, "
+                f"P99: {result.p99} {unit}, OUTLIERS: {result.outliers}"
             )
+            if memory:
+                default += (
+                    f"; PEAK MEMORY: {result.peak_memory} B, NET MEMORY: {result.net_memory} B, "
+                    f"BLOCKS: {result.blocks}"
+                )
+            if comparison is not None:
+                default += f"; BASELINE: {comparison.verdict}"
 
             _handle_result_reporting(fmt, default, logger, level, **fmt_kwargs)
 
-            return returned[0]
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await _run_benchmark_async(func, args, kwargs, **options)
+                comparison = None
+                if baseline is not None:
+                    comparison = _record_baseline(result, baseline, threshold)
+
+                report(result, comparison, args, kwargs)
+                return result.returned
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = _run_benchmark(func, args, kwargs, **options)
+            comparison = None
+            if baseline is not None:
+                comparison = _record_baseline(result, baseline, threshold)
+
+            report(result, comparison, args, kwargs)
+            return result.returned
 
         return wrapper
 
     return decorator
 
 
-def benchmark_rs(trials=10, unit="ns", precision=3):
+def benchmark_rs(
+    trials=10,
+    unit="ns",
+    precision=3,
+    *,
+    warmup=1,
+    loops=None,
+    baseline=None,
+    threshold=0.05,
+    memory=False,
+):
     """
     benchmark_rs
     ============
     Acts like benchmark, but returns the stats.
-    Runs the function multiple times and returns a tuple containing
-    the result along with the average, min, and max execution times.
+    Runs the function multiple times and returns a BenchmarkResult holding the result
+    along with the mean, median, standard deviation, min, max, percentiles,
+    confidence interval, and outlier count of the execution time per call,
+    and optionally the memory allocated per call.
+    It still unpacks into a tuple of the result and the average, min, and max times.
+    Coroutine functions are awaited inside the timed region, so their wrapper must be awaited too.
 
     Parameters
     ----------
-    :param trials: The number of times to run the function, defaults to 10.
+    :param trials: The number of timed trials, defaults to 10.
     :type trials: int
     :param unit: The unit of time to use, defaults to "ns".
     - Supported units are "ns", "us", "ms", "s".\n
     :type unit: Literal["ns", "us", "ms", "s"], optional
     :param precision: The precision to use when rounding the time, defaults to 3
     :type precision: int, optional
+    :param warmup: The number of untimed calls made before the trials, defaults to 1.
+    :type warmup: int, optional
+    :param loops: The number of calls timed together in each trial, defaults to None.
+    - Leave as None to calibrate it automatically so that each trial lasts a few milliseconds.\n
+    :type loops: int | None, optional
+    :param baseline: The path of a baseline file to compare the results against, defaults to None.
+    - The first results are stored as the baseline, later ones emit a RegressionWarning
+    if they are significantly slower than it by more than threshold.
+    - Files ending in .csv are stored as CSV, others as JSON.\n
+    :type baseline: str | None, optional
+    :param threshold: The tolerated slowdown against the baseline, defaults to 0.05 (5%).
+    :type threshold: int | float, optional
+    :param memory: Whether to also measure the memory allocated per call with tracemalloc, defaults to False.
+    - Memory is measured on separate calls after the timed trials, since tracing slows allocations down.\n
+    :type memory: bool, optional
 
     Raises
     ------
     :raises TypeError: If trials is not an int.
     :raises TypeError: If precision is not an int.
+    :raises TypeError: If warmup is not an int.
+    :raises TypeError: If loops is not an int or None.
+    :raises TypeError: If baseline is not a str or None.
+    :raises TypeError: If threshold is not an int or float.
+    :raises TypeError: If memory is not a bool.
     :raises ValueError: If trials is less than 1.
+    :raises ValueError: If warmup is less than 0.
+    :raises ValueError: If loops is less than 1.
+    :raises ValueError: If threshold is negative.
     :raises ValueError: If unit is not 'ns', 'us', 'ms', or 's'.
 
     Example Usage
@@ -467,47 +865,60 @@ def benchmark_rs(trials=10, unit="ns", precision=3):
     ... def perf_example():
     ...     sleep(0.001)
     ...
-    >>> perf_example()
-    (None, 1121070.0, 1074200.0, 1266400.0)
+    >>> returned, avg, low, high = perf_example()
+    >>> (returned, avg, low, high)
+    (None, 1062370.0, 1056450.0, 1071150.0)
+    >>> perf_example().p99
+    1070950.0
     ```
     """
 
     # type checks
     check_type(trials, int)
     check_type(precision, int)
+    check_type(warmup, int)
+    check_type(loops, int, optional=True)
+    check_type(baseline, str, optional=True)
+    check_type(threshold, (int, float))
+    check_type(memory, bool)
 
     # value checks
     check_in_bounds(trials, 1, None)
+    check_in_bounds(warmup, 0, None)
+    if loops is not None:
+        check_in_bounds(loops, 1, None)
+    check_in_bounds(threshold, 0, None)
     check_value(unit, TIME_UNITS)
 
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            local_unit = unit.lower()
-            if local_unit not in TIME_UNITS:
-                local_unit = "ns"
-
-            results = []
-            returned = [None]
-
-            for i in range(trials):
-                start_time = perf_counter_ns()
-
-                if i == len(range(trials)) - 1:
-                    returned[0] = func(*args, **kwargs)
-                else:
-                    func(*args, **kwargs)
+        options = {
+            "trials": trials,
+            "warmup": warmup,
+            "loops": loops,
+            "unit": unit,
+            "precision": precision,
+            "memory": memory,
+        }
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await _run_benchmark_async(func, args, kwargs, **options)
+                if baseline is not None:
+                    _record_baseline(result, baseline, threshold)
 
-                delta = perf_counter_ns() - start_time
-                elapsed = delta / (1000 ** TIME_UNITS.index(local_unit))
+                return result
 
-                results.append(elapsed)
+            return async_wrapper
 
-            avg_time = float(round(mean(results), precision))
-            min_time = float(round(min(results), precision))
-            max_time = float(round(max(results), precision))
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = _run_benchmark(func, args, kwargs, **options)
+            if baseline is not None:
+                _record_baseline(result, baseline, threshold)
 
-            return returned[0], avg_time, min_time, max_time
+            return result
 
         return wrapper
 
@@ -1484,28 +1895,207 @@ def rate_limit(*args):
     return decorator
 
 
-def cache(maxsize=None, *, type_specific=False):
+# every option is keyword-only and mirrors a feature of the store, so grouping them would only
+# move the same flat list of settings into another object callers have to build
+def cache(  # pylint: disable=too-many-arguments
+    maxsize=None,
+    *,
+    policy="lru",
+    maxbytes=None,
+    sizeof="shallow",
+    key=None,
+    type_specific=False,
+    thread_safe=False,
+    shards=None,
+    ttl=None,
+    sweep_interval=None,
+    refresh_ahead=None,
+    stale_grace=None,
+    exceptions=(),
+    exception_ttl=None,
+    exception_maxsize=None,
+    tags=None,
+    backend=None,
+):
     """
     cache
     =====
     Caches the output of the decorated function and instantly returns it
     when given the same args and kwargs later.
-    Uses LRU caching if a maxsize is provided.
+    Args and kwargs are bound against the function's signature, so calls such as
+    func(1, 2), func(1, b=2), and func(b=2, a=1) share the same cached result.
+    Evicts results with the given policy if a maxsize is provided,
+    and expires results after ttl seconds if a ttl is provided.
+
+    The decorated function gains the following attributes:
+    - cache_info(): Returns a CacheInfo with the hits, misses, evictions, maxsize,
+    current size, total time spent computing misses, maxbytes, and current size in bytes.
+    - cache_clear(): Removes every cached result and resets the statistics.
+    - add_stats_hook(hook, interval=60): Calls hook with a CacheInfo every interval seconds
+    from a daemon thread and returns a function that stops the calls.
+    - prefetch(calls, workers=None, *, processes=False): Computes the results of the given calls
+    that are not cached yet in parallel on a thread pool of the given number of workers
+    (or a process pool if processes is True, which requires the function to be defined at module level),
+    and returns how many were computed. Each call is a tuple of positional args,
+    or a single arg if it is not a tuple. For coroutine functions, it is a coroutine running
+    at most workers calls concurrently. Prefetched calls count as misses, their exceptions are
+    cached as configured by exceptions, and in thread safe mode concurrent calls of a key
+    being prefetched wait for it. If a call raises, the pending calls are cancelled
+    and the exception is raised; completed results stay cached.
+    - preload(results): Stores precomputed results from a dict mapping calls, as in prefetch,
+    to their results.
+    - invalidate(tag): Removes every result with the given tag (see tags) and returns how many were removed.
+
+    If the decorated function returns a generator (or a lazy map, filter, or zip iterator),
+    each call gets a new iterator replaying the same items. Items are recorded lazily
+    as the first consumers pull them, so an iterator abandoned early is not consumed
+    any further than needed, and they count towards maxbytes as they are recorded.
+    Other iterators, such as files or database cursors, are cached as is.
+
+    If the decorated function is a coroutine function, the awaited result is cached instead
+    of the coroutine object. Concurrent awaiters of the same missing result share one task,
+    and results of tasks that are cancelled or raise are not cached.
 
     Parameters
     ----------
-    :param maxsize: The maximum number of results to store in the cache using an LRU system, defaults to None.
+    :param maxsize: The maximum number of results to store in the cache, defaults to None.
     - Enter None for no size limitation.\n
     :type maxsize: int | None, optional
+    :param policy: The eviction policy used when the cache is full, defaults to "lru".
+    - "lru": Evicts the least recently used result.
+    - "lfu": Evicts the least frequently used result.
+    - "tinylfu": Window TinyLFU; new results only replace results that have been used less often recently,
+    so scans over many one-off args do not flush frequently used results.\n
+    :type policy: Literal["lru", "lfu", "tinylfu"], optional
+    :param maxbytes: The maximum estimated size in bytes of the results stored in the cache, defaults to None.
+    - Enter None for no size limitation.
+    - Results are evicted with the policy until the total fits, and results
+    larger than maxbytes on their own are not cached.
+    - Can be combined with maxsize, in which case both limits apply.\n
+    :type maxbytes: int | None, optional
+    :param sizeof: How to estimate the size of each result when maxbytes is given, defaults to "shallow".
+    - "shallow": Uses sys.getsizeof, which is exact for bytes, str, and numbers.
+    - "deep": Also counts every object the result references, such as the items of a list.
+    - Enter a callable that takes a result and returns its size in bytes for custom estimation.\n
+    :type sizeof: Literal["shallow", "deep"] | Callable[[Any], int], optional
+    :param key: How to turn the args and kwargs into a cache key, defaults to None.
+    - Enter None to use them as is, which requires them to be hashable.
+    - "freeze": Converts lists, dicts, and sets (including nested ones) into hashable equivalents.
+    - "digest": Like "freeze", but also replaces buffers such as bytes and NumPy arrays
+    by a blake2 digest of their contents, so large arrays can be passed without converting them.
+    - "identity": Identifies unhashable args by identity plus their version attribute if they have one,
+    for mutable objects that count their own mutations. These keys are never sent to a backend.
+    - Enter a callable taking the same args and kwargs as the function and returning
+    a hashable key for full control.\n
+    :type key: Literal["freeze", "digest", "identity"] | Callable[..., Hashable] | None, optional
     :param type_specific: Whether to cache results differently depending on differently
     typed yet equal parameters, such as func(1) vs func(1.0), defaults to False.
     :type type_specific: bool, optional
+    :param thread_safe: Whether to lock the cache so it can be shared between threads, defaults to False.
+    - When True, only the first caller computes a missing result while
+    concurrent callers with the same args and kwargs wait for it.
+    - If the computation raises, the waiting callers raise the same exception.\n
+    :type thread_safe: bool, optional
+    :param shards: The number of independent segments to split the cache into, defaults to None.
+    - Enter None for a single segment.
+    - Keys are spread across the segments by hash, and each segment has its own lock and
+    eviction order, so threads looking up different keys rarely wait for each other.
+    - Implies thread_safe, and maxsize and maxbytes are split evenly between the segments,
+    so eviction is only approximately global.\n
+    :type shards: int | None, optional
+    :param ttl: The time in seconds a result stays cached for, defaults to None.
+    - Enter None for results that never expire.
+    - Enter a callable that takes the result and returns its ttl (or None) for per-result expiry.
+    - Expired results are removed lazily when they are looked up.\n
+    :type ttl: int | float | Callable[[Any], int | float | None] | None, optional
+    :param sweep_interval: The time in seconds between background sweeps that remove
+    expired results in bulk, defaults to None.
+    - Enter None to only remove expired results lazily.
+    - The sweep runs on a daemon thread and implies locking the cache.\n
+    :type sweep_interval: int | float | None, optional
+    :param refresh_ahead: The time in seconds before a result expires from which a hit returns it
+    at once and recomputes it on a daemon thread (or a task for coroutine functions), defaults to None.
+    - Enter None to never refresh results before they expire.
+    - Keeps hot results from ever expiring, so their callers never wait for a recompute.
+    - A result is only refreshed by one background call at a time; if it raises,
+    the current result is kept until it expires.
+    - Implies locking the cache.\n
+    :type refresh_ahead: int | float | None, optional
+    :param stale_grace: The time in seconds after a result expires during which a hit still
+    returns it at once while it is recomputed in the background, defaults to None.
+    - Enter None to treat expired results as missing right away.
+    - Results are removed for good once the grace period is over.
+    - Implies locking the cache.\n
+    :type stale_grace: int | float | None, optional
+    :param exceptions: A tuple of the exception types to cache when raised, defaults to ().
+    - Later calls with the same args raise a copy of the cached exception without calling the function,
+    so repeated failing lookups are answered from memory.
+    - Cached exceptions are kept apart from results, with their own ttl and size limit,
+    so they never evict results.\n
+    :type exceptions: Tuple[Type[BaseException], ...], optional
+    :param exception_ttl: The time in seconds an exception stays cached for, defaults to None.
+    - Enter None for exceptions that are cached until cleared.\n
+    :type exception_ttl: int | float | None, optional
+    :param exception_maxsize: The maximum number of exceptions to cache, defaults to None.
+    - Enter None for no size limitation.\n
+    :type exception_maxsize: int | None, optional
+    :param tags: The tags of the cached results, defaults to None.
+    - Enter a tag or a collection of tags to tag every result of the function.
+    - Enter a callable taking the same args and kwargs as the function and returning a tag
+    or an iterable of tags to tag each result according to its args,
+    such as lambda tenant, *args: f"tenant:{tenant}".
+    - Results with a tag are removed by func.invalidate(tag) for this function only,
+    or by invalidate_tag(tag) for every cached function, in time proportional
+    to the number of results with the tag. Cached exceptions are tagged and removed too.
+    - With a backend, tags are stored along with the results, so invalidating a tag also removes
+    the results stored by earlier runs or sibling processes. Results with a tag that cannot be
+    pickled are only cached in memory.\n
+    :type tags: Hashable | Collection[Hashable] | Callable[..., Hashable | Iterable[Hashable]] | None, optional
+    :param backend: A second tier to fall back on when a result is not in memory,
+    defaults to None.
+    - Results are keyed by a stable hash of the args and kwargs, so a freshly started process
+    can reuse results computed by earlier runs or sibling processes.
+    - Use a DiskStore to persist results across runs, or a SharedMemoryStore to share them
+    between live processes without touching the disk; bytes-like results read from a
+    SharedMemoryStore are returned as zero-copy read-only memoryviews.
+    - Computed results are written through to the backend; results or args that
+    cannot be pickled are only cached in memory.\n
+    :type backend: DiskStore | SharedMemoryStore | None, optional
 
     Raises
     ------
     :raises TypeError: If maxsize is not an int or None.
+    :raises TypeError: If policy is not a str.
+    :raises TypeError: If maxbytes is not an int or None.
+    :raises TypeError: If sizeof is not a str or callable.
+    :raises TypeError: If key is not a str, callable, or None.
     :raises TypeError: If type_specific is not a bool.
+    :raises TypeError: If thread_safe is not a bool.
+    :raises TypeError: If shards is not an int or None.
+    :raises TypeError: If ttl is not an int, float, callable, or None.
+    :raises TypeError: If sweep_interval is not an int, float, or None.
+    :raises TypeError: If refresh_ahead is not an int, float, or None.
+    :raises TypeError: If stale_grace is not an int, float, or None.
+    :raises TypeError: If exceptions is not a tuple.
+    :raises TypeError: If exception_ttl is not an int, float, or None.
+    :raises TypeError: If exception_maxsize is not an int or None.
+    :raises TypeError: If tags is not a str, int, tuple, list, set, frozenset, callable, or None.
+    :raises TypeError: If backend is not a DiskStore, SharedMemoryStore, or None.
     :raises ValueError: If maxsize is less than 1.
+    :raises ValueError: If policy is not 'lru', 'lfu', or 'tinylfu'.
+    :raises ValueError: If maxbytes is less than 1.
+    :raises ValueError: If sizeof is not 'shallow', 'deep', or a callable.
+    :raises ValueError: If key is not 'freeze', 'digest', 'identity', a callable, or None.
+    :raises ValueError: If shards is less than 1.
+    :raises ValueError: If ttl is 0 or less.
+    :raises ValueError: If sweep_interval is 0 or less.
+    :raises ValueError: If sweep_interval is given without a ttl.
+    :raises ValueError: If refresh_ahead is 0 or less.
+    :raises ValueError: If stale_grace is 0 or less.
+    :raises ValueError: If refresh_ahead or stale_grace is given without a ttl.
+    :raises ValueError: If an item inside exceptions is not a subclass of BaseException.
+    :raises ValueError: If exception_ttl is 0 or less.
+    :raises ValueError: If exception_maxsize is less than 1.
 
     Example Usage
     -------------
@@ -1524,36 +2114,570 @@ def cache(maxsize=None, *, type_specific=False):
     0.8902874918377771
     >>> random_results(2)
     0.8902874918377771
+    >>> random_results.preload({(3,): 0.5})
+    >>> random_results(3)
+    0.5
+    >>> random_results.prefetch([(4,), (5, 6)], workers=2)
+    2
+    >>> random_results.cache_info()
+    CacheInfo(hits=3, misses=4, evictions=0, maxsize=None, currsize=5, miss_time=1.0e-05, maxbytes=None, currbytes=0)
     ```
     """
 
+    # type checks
     check_type(maxsize, int, optional=True)
+    check_type(policy, str)
+    check_type(maxbytes, int, optional=True)
+    if not callable(sizeof):
+        check_type(sizeof, str)
+    if not callable(key):
+        check_type(key, str, optional=True)
     check_type(type_specific, bool)
+    check_type(thread_safe, bool)
+    check_type(shards, int, optional=True)
+    if not callable(ttl):
+        check_type(ttl, (int, float), optional=True)
+    check_type(sweep_interval, (int, float), optional=True)
+    check_type(refresh_ahead, (int, float), optional=True)
+    check_type(stale_grace, (int, float), optional=True)
+    check_type(exceptions, tuple)
+    check_type(exception_ttl, (int, float), optional=True)
+    check_type(exception_maxsize, int, optional=True)
+    if not callable(tags):
+        check_type(tags, (str, int, tuple, list, set, frozenset), optional=True)
+    check_type(backend, (DiskStore, SharedMemoryStore), optional=True)
+
+    # value checks
+    if maxsize is not None:
+        check_in_bounds(maxsize, 1, None)
+    check_value(policy, CACHE_POLICIES)
+    if maxbytes is not None:
+        check_in_bounds(maxbytes, 1, None)
+    if not callable(sizeof):
+        check_value(sizeof, CACHE_SIZERS)
+    if key is not None and not callable(key):
+        check_value(key, CACHE_KEYS)
+    if shards is not None:
+        check_in_bounds(shards, 1, None)
+    if ttl is not None and not callable(ttl):
+        check_in_bounds(ttl, 0, None, inclusive=False)
+    if sweep_interval is not None:
+        check_in_bounds(sweep_interval, 0, None, inclusive=False)
+        if ttl is None:
+            raise ValueError("sweep_interval requires a ttl")
+    _check_refresh(ttl, refresh_ahead, stale_grace)
+    if exceptions:
+        check_subclass(BaseException, exceptions)
+    if exception_ttl is not None:
+        check_in_bounds(exception_ttl, 0, None, inclusive=False)
+    if exception_maxsize is not None:
+        check_in_bounds(exception_maxsize, 1, None)
 
     def decorator(func):
-        cache_ = OrderedDict()
+        # spawned worker processes import the main script as __mp_main__
+        module = "__main__" if func.__module__ == "__mp_main__" else func.__module__
+
+        options = {
+            "policy": policy,
+            "maxbytes": maxbytes,
+            "sizeof": sizeof,
+            "thread_safe": thread_safe,
+            "ttl": ttl,
+            "sweep_interval": sweep_interval,
+            "refresh_ahead": refresh_ahead,
+            "stale_grace": stale_grace,
+            "exceptions": exceptions,
+            "exception_ttl": exception_ttl,
+            "exception_maxsize": exception_maxsize,
+            "tags": tags,
+            "backend": backend,
+            "namespace": f"{module}.{func.__qualname__}",
+        }
+        if shards is None:
+            store = _CacheStore(maxsize, **options)
+        else:
+            store = _ShardedCacheStore(shards, maxsize, **options)
+
+        make_key = _make_key_builder(func, type_specific, key=key)
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                return await store.get_or_compute_async(key, func, args, kwargs)
+
+        else:
+            compute = _record_iterators(func)
+            get_or_compute = store.get_or_compute
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                value = get_or_compute(make_key(args, kwargs), compute, args, kwargs)
+                # every call replays iterator results from the start
+                return iter(value) if type(value) is _Recording else value
+
+        def add_stats_hook(hook, interval=60):
+            # type checks
+            check_callable(hook)
+            check_type(interval, (int, float))
+
+            # value checks
+            check_in_bounds(interval, 0, None, inclusive=False)
+
+            return store.add_stats_hook(hook, interval)
+
+        if iscoroutinefunction(func):
+
+            async def prefetch(calls, workers=None, *, processes=False):
+                _check_prefetch(workers, processes)
+                if processes:
+                    raise ValueError("coroutine functions cannot be prefetched in processes")
+
+                pending = _pending_calls(store, make_key, calls)
+                semaphore = Semaphore(workers or len(pending) or 1)
+
+                async def fetch(args):
+                    async with semaphore:
+                        await wrapper(*args)
+
+                await gather(*(fetch(args) for args in pending.values()))
+                return len(pending)
+
+        else:
+
+            def prefetch(calls, workers=None, *, processes=False):
+                _check_prefetch(workers, processes)
+
+                # worker processes cannot unpickle the undecorated function,
+                # so they get the wrapper, found by name, and call the function it wraps
+                target = partial(_call_wrapped, wrapper) if processes else compute
+                return _prefetch(store, make_key, target, calls, workers, processes)
+
+        def preload(results):
+            # type checks
+            check_type(results, dict)
+
+            for call, value in results.items():
+                args = _as_args(call)
+                store.preload(make_key(args, {}), value, store.tags_for(args, {}))
+
+        wrapper.cache_info = store.info
+        wrapper.cache_clear = store.clear
+        wrapper.add_stats_hook = add_stats_hook
+        wrapper.prefetch = prefetch
+        wrapper.preload = preload
+        wrapper.invalidate = store.invalidate
 
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            if type_specific:
-                key = (
-                    tuple((type(arg), arg) for arg in args),
-                    tuple((type(v), k, v) for k, v in kwargs.items()),
-                )
-            else:
-                key = (args, tuple(kwargs.items()))
+        return wrapper
 
-            if key in cache_:
-                cache_.move_to_end(key)
-                return cache_[key]
+    return decorator
 
-            result = func(*args, **kwargs)
 
-            if maxsize is not None and len(cache_) >= maxsize:
-                cache_.popitem(last=False)
+class _BoundCachedMethod:
+    """
+    _BoundCachedMethod
+    ==================
+    A method decorated with cache_method bound to an instance, calling through its instance's cache.
+    """
 
-            cache_[key] = result
-            return result
+    __slots__ = ("__self__", "__func__", "_store", "_make_key", "_compute", "_get_or_compute")
+
+    def __init__(self, instance, func, store, make_key, compute, is_async):
+        self.__self__ = instance
+        self.__func__ = func
+        self._store = store
+        self._make_key = make_key
+        self._compute = compute
+        self._get_or_compute = store.get_or_compute_async if is_async else store.get_or_compute
+
+    def __call__(self, *args, **kwargs):
+        key = self._make_key(args, kwargs)
+        value = self._get_or_compute(key, self._compute, (self.__self__, *args), kwargs)
+        # every call replays iterator results from the start
+        return iter(value) if type(value) is _Recording else value
+
+    def __repr__(self):
+        return f"<cached method {self.__func__.__qualname__} of {self.__self__!r}>"
+
+    def cache_info(self):
+        """
+        cache_info
+        ==========
+        Returns the statistics of this instance's cache.
+        """
+
+        return self._store.info()
+
+    def cache_clear(self):
+        """
+        cache_clear
+        ===========
+        Removes every entry from this instance's cache and resets its statistics.
+        """
+
+        self._store.clear()
+
+
+class _CachedMethod:
+    """
+    _CachedMethod
+    =============
+    The descriptor returned by cache_method, giving each instance its own cache.
+    """
+
+    def __init__(self, func, options, type_specific, key):
+        update_wrapper(self, func)
+        self.func = func
+        self.options = options
+
+        self._make_key = _make_key_builder(func, type_specific, method=True, key=key)
+        self._is_async = iscoroutinefunction(func)
+        self._compute = func if self._is_async else _record_iterators(func)
+        # stores keyed by the id of their instance and dropped by a weakref callback,
+        # kept out of the instances so they are not pickled, copied, or listed by vars()
+        self._stores = {}
+        self._lock = Lock()
+
+    def _store_for(self, instance):
+        key = id(instance)
+        entry = self._stores.get(key)
+        if entry is not None and entry[0]() is instance:
+            return entry[1]
+
+        with self._lock:
+            entry = self._stores.get(key)
+            if entry is not None and entry[0]() is instance:
+                return entry[1]
+
+            stores = self._stores
+
+            def forget(_, key=key):
+                stores.pop(key, None)
+
+            try:
+                instance_ref = ref(instance, forget)
+            except TypeError:
+                raise TypeError(
+                    f"cache_method requires {type(instance).__name__} instances "
+                    "to support weak references"
+                ) from None
+
+            store = _CacheStore(**self.options)
+            stores[key] = (instance_ref, store)
+            return store
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return _BoundCachedMethod(
+            instance,
+            self.func,
+            self._store_for(instance),
+            self._make_key,
+            self._compute,
+            self._is_async,
+        )
+
+
+def cache_method(
+    maxsize=None,
+    *,
+    policy="lru",
+    maxbytes=None,
+    sizeof="shallow",
+    key=None,
+    type_specific=False,
+    thread_safe=False,
+    ttl=None,
+    refresh_ahead=None,
+    stale_grace=None,
+):
+    """
+    cache_method
+    ============
+    Caches the results of a method separately for each instance.
+    Unlike cache, self is not part of the keys, so the cache never keeps an instance alive:
+    each instance's entries live in its own store, held outside the instance in a table
+    cleared by a weak reference to it, and are freed along with it. Size limits apply
+    per instance, so one busy instance cannot evict the entries of the others.
+    Generator results are replayed from the start on every call, as with cache.
+
+    Accessing the method on an instance returns a bound method with the attributes:
+    - cache_info(): Returns a CacheInfo of the instance's cache.
+    - cache_clear(): Removes every entry of the instance's cache and resets its statistics.
+
+    Parameters
+    ----------
+    :param maxsize: The maximum number of results cached for each instance, defaults to None.
+    - Enter None for an unbounded cache.\n
+    :type maxsize: int | None, optional
+    :param policy: The eviction policy used once maxsize is reached, defaults to "lru".
+    - See cache for the supported policies.\n
+    :type policy: Literal["lru", "lfu", "tinylfu"], optional
+    :param maxbytes: The maximum total estimated size in bytes of the results cached
+    for each instance, defaults to None.
+    :type maxbytes: int | None, optional
+    :param sizeof: How to estimate the size of each result, defaults to "shallow".
+    - See cache for the supported estimators.\n
+    :type sizeof: Literal["shallow", "deep"] | Callable[[Any], int], optional
+    :param key: How to turn the args and kwargs (without self) into a cache key, defaults to None.
+    - See cache for the supported strategies, or enter a callable returning a hashable key.\n
+    :type key: Literal["freeze", "digest", "identity"] | Callable[..., Hashable] | None, optional
+    :param type_specific: Whether to cache args of different types separately, defaults to False.
+    :type type_specific: bool, optional
+    :param thread_safe: Whether to lock each instance's cache and deduplicate concurrent misses,
+    defaults to False.
+    :type thread_safe: bool, optional
+    :param ttl: The time in seconds each result lives for, defaults to None.
+    - Enter a callable to compute the ttl of each result from its value.\n
+    :type ttl: int | float | Callable[[Any], int | float | None] | None, optional
+    :param refresh_ahead: The time in seconds before a result expires from which a hit
+    returns it and recomputes it in the background, defaults to None.
+    :type refresh_ahead: int | float | None, optional
+    :param stale_grace: The time in seconds after a result expires during which a hit
+    still returns it while it is recomputed in the background, defaults to None.
+    :type stale_grace: int | float | None, optional
+
+    Raises
+    ------
+    :raises TypeError: If maxsize is not an int or None.
+    :raises TypeError: If policy is not a str.
+    :raises TypeError: If maxbytes is not an int or None.
+    :raises TypeError: If sizeof is not a str or callable.
+    :raises TypeError: If key is not a str, callable, or None.
+    :raises TypeError: If type_specific is not a bool.
+    :raises TypeError: If thread_safe is not a bool.
+    :raises TypeError: If ttl is not an int, float, callable, or None.
+    :raises TypeError: If refresh_ahead is not an int, float, or None.
+    :raises TypeError: If stale_grace is not an int, float, or None.
+    :raises TypeError: If an instance does not support weak references.
+    :raises ValueError: If maxsize is less than 1.
+    :raises ValueError: If policy is not 'lru', 'lfu', or 'tinylfu'.
+    :raises ValueError: If maxbytes is less than 1.
+    :raises ValueError: If sizeof is not 'shallow', 'deep', or a callable.
+    :raises ValueError: If key is not 'freeze', 'digest', 'identity', a callable, or None.
+    :raises ValueError: If ttl is 0 or less.
+    :raises ValueError: If refresh_ahead is 0 or less.
+    :raises ValueError: If stale_grace is 0 or less.
+    :raises ValueError: If refresh_ahead or stale_grace is given without a ttl.
+
+    Example Usage
+    -------------
+    ```python
+    >>> class Account:
+    ...     def __init__(self, owner):
+    ...         self.owner = owner
+    ...     @cache_method(maxsize=128)
+    ...     def balance(self, currency):
+    ...         print(f"Fetching {self.owner}'s balance in {currency}")
+    ...         return 100
+    ...
+    >>> account = Account("alice")
+    >>> account.balance("usd")
+    Fetching alice's balance in usd
+    100
+    >>> account.balance("usd")
+    100
+    >>> account.balance.cache_info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=128, currsize=1, miss_time=1.2e-05, maxbytes=None, currbytes=0)
+    >>> del account  # its cached results are freed with it
+    ```
+    """
+
+    # type checks
+    check_type(maxsize, int, optional=True)
+    check_type(policy, str)
+    check_type(maxbytes, int, optional=True)
+    if not callable(sizeof):
+        check_type(sizeof, str)
+    if not callable(key):
+        check_type(key, str, optional=True)
+    check_type(type_specific, bool)
+    check_type(thread_safe, bool)
+    if not callable(ttl):
+        check_type(ttl, (int, float), optional=True)
+    check_type(refresh_ahead, (int, float), optional=True)
+    check_type(stale_grace, (int, float), optional=True)
+
+    # value checks
+    if maxsize is not None:
+        check_in_bounds(maxsize, 1, None)
+    check_value(policy, CACHE_POLICIES)
+    if maxbytes is not None:
+        check_in_bounds(maxbytes, 1, None)
+    if not callable(sizeof):
+        check_value(sizeof, CACHE_SIZERS)
+    if key is not None and not callable(key):
+        check_value(key, CACHE_KEYS)
+    if ttl is not None and not callable(ttl):
+        check_in_bounds(ttl, 0, None, inclusive=False)
+    _check_refresh(ttl, refresh_ahead, stale_grace)
+
+    options = {
+        "maxsize": maxsize,
+        "policy": policy,
+        "maxbytes": maxbytes,
+        "sizeof": sizeof,
+        "thread_safe": thread_safe,
+        "ttl": ttl,
+        "refresh_ahead": refresh_ahead,
+        "stale_grace": stale_grace,
+    }
+
+    def decorator(func):
+        return _CachedMethod(func, options, type_specific, key)
+
+    return decorator
+
+
+def cache_batch(
+    maxsize=None,
+    *,
+    policy="lru",
+    maxbytes=None,
+    sizeof="shallow",
+    thread_safe=False,
+    ttl=None,
+    backend=None,
+):
+    """
+    cache_batch
+    ===========
+    Caches the results of a batch function, which takes a list of items as its first argument
+    and returns a mapping from items to results, such as a function fetching many rows at once.
+    Each call is split into the items already cached and the missing ones, the function is called
+    once with only the missing items, and the results are cached per item and merged.
+    Any other args and kwargs are part of the cache key of each item.
+
+    The decorated function returns a dict mapping the requested items, in order and without
+    duplicates, to their results. Items missing from the function's mapping are neither
+    cached nor returned. If the function raises, nothing is cached.
+    The decorated function has the cache_info and cache_clear attributes described in cache,
+    counting a hit or a miss per item.
+
+    Coroutine functions are supported, in which case the decorated function must be awaited.
+
+    Parameters
+    ----------
+    :param maxsize: The maximum number of item results to store in the cache, defaults to None.
+    - Enter None for no size limitation.\n
+    :type maxsize: int | None, optional
+    :param policy: The eviction policy used when the cache is full, defaults to "lru".
+    - See cache for the supported policies.\n
+    :type policy: Literal["lru", "lfu", "tinylfu"], optional
+    :param maxbytes: The maximum estimated size in bytes of the results stored in the cache, defaults to None.
+    :type maxbytes: int | None, optional
+    :param sizeof: How to estimate the size of each result, defaults to "shallow".
+    - See cache for the supported estimators.\n
+    :type sizeof: Literal["shallow", "deep"] | Callable[[Any], int], optional
+    :param thread_safe: Whether to lock the cache so it can be shared between threads, defaults to False.
+    - Concurrent calls are not deduplicated, so they may compute the same missing items.\n
+    :type thread_safe: bool, optional
+    :param ttl: The time in seconds each item result stays cached for, defaults to None.
+    - Enter a callable that takes a result and returns its ttl (or None) for per-result expiry.\n
+    :type ttl: int | float | Callable[[Any], int | float | None] | None, optional
+    :param backend: A second tier to fall back on for items not in memory, defaults to None.
+    - See cache for details.\n
+    :type backend: DiskStore | SharedMemoryStore | None, optional
+
+    Raises
+    ------
+    :raises TypeError: If maxsize is not an int or None.
+    :raises TypeError: If policy is not a str.
+    :raises TypeError: If maxbytes is not an int or None.
+    :raises TypeError: If sizeof is not a str or callable.
+    :raises TypeError: If thread_safe is not a bool.
+    :raises TypeError: If ttl is not an int, float, callable, or None.
+    :raises TypeError: If backend is not a DiskStore, SharedMemoryStore, or None.
+    :raises ValueError: If maxsize is less than 1.
+    :raises ValueError: If policy is not 'lru', 'lfu', or 'tinylfu'.
+    :raises ValueError: If maxbytes is less than 1.
+    :raises ValueError: If sizeof is not 'shallow', 'deep', or a callable.
+    :raises ValueError: If ttl is 0 or less.
+
+    Example Usage
+    -------------
+    ```python
+    >>> @cache_batch(maxsize=10000)
+    ... def fetch_users(ids, table="users"):
+    ...     print(f"Querying {ids}")
+    ...     return {row.id: row for row in db.select(table, ids)}
+    ...
+    >>> fetch_users([1, 2, 3])
+    Querying [1, 2, 3]
+    {1: User(id=1), 2: User(id=2), 3: User(id=3)}
+    >>> fetch_users([2, 3, 4])
+    Querying [4]
+    {2: User(id=2), 3: User(id=3), 4: User(id=4)}
+    ```
+    """
+
+    # type checks
+    check_type(maxsize, int, optional=True)
+    check_type(policy, str)
+    check_type(maxbytes, int, optional=True)
+    if not callable(sizeof):
+        check_type(sizeof, str)
+    check_type(thread_safe, bool)
+    if not callable(ttl):
+        check_type(ttl, (int, float), optional=True)
+    check_type(backend, (DiskStore, SharedMemoryStore), optional=True)
+
+    # value checks
+    if maxsize is not None:
+        check_in_bounds(maxsize, 1, None)
+    check_value(policy, CACHE_POLICIES)
+    if maxbytes is not None:
+        check_in_bounds(maxbytes, 1, None)
+    if not callable(sizeof):
+        check_value(sizeof, CACHE_SIZERS)
+    if ttl is not None and not callable(ttl):
+        check_in_bounds(ttl, 0, None, inclusive=False)
+
+    def decorator(func):
+        # spawned worker processes import the main script as __mp_main__
+        module = "__main__" if func.__module__ == "__mp_main__" else func.__module__
+
+        store = _CacheStore(
+            maxsize,
+            policy=policy,
+            maxbytes=maxbytes,
+            sizeof=sizeof,
+            thread_safe=thread_safe,
+            ttl=ttl,
+            backend=backend,
+            namespace=f"{module}.{func.__qualname__}",
+        )
+
+        # the other args are keyed like a method's args, leaving out the items
+        make_key = _make_key_builder(func, method=True)
+
+        def store_keys(items, args, kwargs):
+            extra = make_key(args, kwargs)
+            # functions taking nothing but the items are keyed by the items alone
+            if extra == ():
+                return {item: item for item in items}
+            return {item: (item, extra) for item in items}
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(items, *args, **kwargs):
+                return await store.get_or_compute_many_async(
+                    store_keys(items, args, kwargs), func, args, kwargs
+                )
+
+        else:
+
+            @wraps(func)
+            def wrapper(items, *args, **kwargs):
+                return store.get_or_compute_many(
+                    store_keys(items, args, kwargs), func, args, kwargs
+                )
+
+        wrapper.cache_info = store.info
+        wrapper.cache_clear = store.clear
 
         return wrapper
 
@@ -6,7 +6,9 @@ import logging
 from typing import (
     Any,
     Callable,
+    Collection,
     Generic,
+    Hashable,
     Literal,
     Optional,
     Protocol,
@@ -17,6 +19,9 @@ from typing import (
     overload,
 )
 
+from .__backends import DiskStore, SharedMemoryStore
+from .__benchmarking import BenchmarkResult
+
 # generic types
 T = TypeVar("T")  # generic type
 C = TypeVar("C")  # generic class instance type
@@ -30,6 +35,7 @@ DecoratedFunc = Decorator
 DecoratedCls = Callable[[Type], Type]
 
 BackoffFunc = Callable[[Union[int, float], int], Union[int, float]]
+TTL = Union[int, float, Callable[[Any], Optional[Union[int, float]]]]
 
 # base class to enforce type hints for lazy_property decorator
 class SupportsLazyProperty(Protocol):
@@ -45,6 +51,8 @@ def timer(
     fmt: str = "",
     logger: Optional[logging.Logger] = None,
     level: LoggingLevel = logging.INFO,
+    aggregate: bool = False,
+    interval: Optional[Union[int, float]] = None,
 ) -> DecoratedFunc: ...
 def timer_rs(
     unit: Literal["ns", "us", "ms", "s"] = "ns",
@@ -55,13 +63,26 @@ def benchmark(
     unit: Literal["ns", "us", "ms", "s"] = "ns",
     precision: int = 3,
     *,
+    warmup: int = 1,
+    loops: Optional[int] = None,
+    baseline: Optional[str] = None,
+    threshold: Union[int, float] = 0.05,
+    memory: bool = False,
     fmt: str = "",
     logger: Optional[logging.Logger] = None,
     level: LoggingLevel = logging.INFO,
 ) -> DecoratedFunc: ...
 def benchmark_rs(
-    trials: int = 10, unit: Literal["ns", "us", "ms", "s"] = "ns", precision: int = 3
-) -> DecoratedFunc: ...
+    trials: int = 10,
+    unit: Literal["ns", "us", "ms", "s"] = "ns",
+    precision: int = 3,
+    *,
+    warmup: int = 1,
+    loops: Optional[int] = None,
+    baseline: Optional[str] = None,
+    threshold: Union[int, float] = 0.05,
+    memory: bool = False,
+) -> Callable[[Callable[..., T]], Callable[..., BenchmarkResult[T]]]: ...
 def retry(
     max_attempts: int,
     delay: Union[int, float],
@@ -123,9 +144,70 @@ def rate_limit(interval: Union[int, float]) -> DecoratedFunc: ...
 @overload
 def rate_limit(calls: int, period: Union[int, float]) -> DecoratedFunc: ...
 @overload
-def cache(*, type_specific: bool = False) -> DecoratedFunc: ...
+def cache(
+    *,
+    policy: Literal["lru", "lfu", "tinylfu"] = "lru",
+    maxbytes: Optional[int] = None,
+    sizeof: Union[Literal["shallow", "deep"], Callable[[Any], int]] = "shallow",
+    key: Optional[Union[Literal["freeze", "digest", "identity"], Callable[..., Hashable]]] = None,
+    type_specific: bool = False,
+    thread_safe: bool = False,
+    shards: Optional[int] = None,
+    ttl: Optional[TTL] = None,
+    sweep_interval: Optional[Union[int, float]] = None,
+    refresh_ahead: Optional[Union[int, float]] = None,
+    stale_grace: Optional[Union[int, float]] = None,
+    exceptions: Tuple[Type[BaseException], ...] = (),
+    exception_ttl: Optional[Union[int, float]] = None,
+    exception_maxsize: Optional[int] = None,
+    tags: Optional[Union[Hashable, Collection[Hashable], Callable[..., Any]]] = None,
+    backend: Optional[Union[DiskStore, SharedMemoryStore]] = None,
+) -> DecoratedFunc: ...
 @overload
-def cache(maxsize: int, *, type_specific: bool = False) -> DecoratedFunc: ...
+def cache(
+    maxsize: int,
+    *,
+    policy: Literal["lru", "lfu", "tinylfu"] = "lru",
+    maxbytes: Optional[int] = None,
+    sizeof: Union[Literal["shallow", "deep"], Callable[[Any], int]] = "shallow",
+    key: Optional[Union[Literal["freeze", "digest", "identity"], Callable[..., Hashable]]] = None,
+    type_specific: bool = False,
+    thread_safe: bool = False,
+    shards: Optional[int] = None,
+    ttl: Optional[TTL] = None,
+    sweep_interval: Optional[Union[int, float]] = None,
+    refresh_ahead: Optional[Union[int, float]] = None,
+    stale_grace: Optional[Union[int, float]] = None,
+    exceptions: Tuple[Type[BaseException], ...] = (),
+    exception_ttl: Optional[Union[int, float]] = None,
+    exception_maxsize: Optional[int] = None,
+    tags: Optional[Union[Hashable, Collection[Hashable], Callable[..., Any]]] = None,
+    backend: Optional[Union[DiskStore, SharedMemoryStore]] = None,
+) -> DecoratedFunc: ...
+
+def cache_method(
+    maxsize: Optional[int] = None,
+    *,
+    policy: Literal["lru", "lfu", "tinylfu"] = "lru",
+    maxbytes: Optional[int] = None,
+    sizeof: Union[Literal["shallow", "deep"], Callable[[Any], int]] = "shallow",
+    key: Optional[Union[Literal["freeze", "digest", "identity"], Callable[..., Hashable]]] = None,
+    type_specific: bool = False,
+    thread_safe: bool = False,
+    ttl: Optional[TTL] = None,
+    refresh_ahead: Optional[Union[int, float]] = None,
+    stale_grace: Optional[Union[int, float]] = None,
+) -> DecoratedFunc: ...
+def cache_batch(
+    maxsize: Optional[int] = None,
+    *,
+    policy: Literal["lru", "lfu", "tinylfu"] = "lru",
+    maxbytes: Optional[int] = None,
+    sizeof: Union[Literal["shallow", "deep"], Callable[[Any], int]] = "shallow",
+    thread_safe: bool = False,
+    ttl: Optional[TTL] = None,
+    backend: Optional[Union[DiskStore, SharedMemoryStore]] = None,
+) -> DecoratedFunc: ...
 
 class lazy_property(Generic[C, T]):
     def __init__(self, func: Callable[[C], T]) -> None: ...
@@ -0,0 +1,234 @@
+"""
+decorators.__histogram
+======================
+Module containing the latency histogram used by the aggregating mode of the timer decorator.
+"""
+
+# --imports-- #
+from array import array
+from threading import Lock
+
+# --consts-- #
+# each power of two range is split into 2 ** _SUB_BITS linear buckets,
+# bounding the relative error of recorded values by 2 ** -_SUB_BITS (about 3%)
+_SUB_BITS = 5
+_SUB_COUNT = 1 << _SUB_BITS
+# values below 2 ** (_MAX_BITS + 1) ns (about 37 minutes) get their own bucket, longer ones share the last
+_MAX_BITS = 40
+_BUCKETS = (_MAX_BITS - _SUB_BITS) * _SUB_COUNT + 2 * _SUB_COUNT
+_LINEAR_LIMIT = 2 * _SUB_COUNT
+# stand in for the extremes while nothing is recorded, so recording needs no None checks
+_NO_MIN = 1 << 63
+_NO_MAX = -1
+_UNIT_SCALES = {"ns": 1, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000}
+# the percentiles included in summaries, keyed by their name in summaries
+SUMMARY_PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+
+
+# --helpers-- #
+def _bucket_bounds(index):
+    # returns the lowest and highest value sharing the bucket at index
+    if index < 2 * _SUB_COUNT:
+        return index, index
+    shift = index // _SUB_COUNT - 1
+    mantissa = index - shift * _SUB_COUNT
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+# --histograms-- #
+class LatencyHistogram:
+    """
+    LatencyHistogram
+    ================
+    A compact, fixed size histogram of durations in nanoseconds, in the style of HdrHistogram.
+    Durations are counted in logarithmic buckets, each power of two being split into 32 linear
+    sub-buckets, so recording is O(1), memory stays at about 9 KiB no matter how many durations
+    are recorded, and percentiles are accurate to about 3%. Counts, sums, and extremes are exact.
+
+    Recording takes no lock, to keep its overhead low enough to stay on in production, so a record
+    racing with another one from a different thread (or with a reset) can rarely be lost.
+    Summaries and resets are locked, so concurrent summaries never report the same durations twice.
+
+    Example Usage
+    -------------
+    ```python
+    >>> histogram = LatencyHistogram()
+    >>> for duration in (1200, 1300, 1250, 98000):
+    ...     histogram.record(duration)
+    ...
+    >>> histogram.percentile(50)
+    1263
+    >>> histogram.summary("us")
+    {'count': 4, 'mean': 25.438, 'min': 1.2, 'p50': 1.263, 'p90': 98.0, 'p99': 98.0, 'p999': 98.0, 'max': 98.0}
+    ```
+    """
+
+    __slots__ = ("_counts", "_lock", "_min", "_max", "count", "total")
+
+    def __init__(self):
+        self._counts = array("Q", bytes(8 * _BUCKETS))
+        self._lock = Lock()
+        self._min = _NO_MIN
+        self._max = _NO_MAX
+        self.count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def min(self):
+        """
+        min
+        ===
+        The shortest recorded duration in nanoseconds, or None if nothing was recorded.
+        """
+
+        return self._min if self.count else None
+
+    @property
+    def max(self):
+        """
+        max
+        ===
+        The longest recorded duration in nanoseconds, or None if nothing was recorded.
+        """
+
+        return self._max if self.count else None
+
+    def record(self, value):
+        """
+        record
+        ======
+        Records a duration.
+
+        Parameters
+        ----------
+        :param value: The duration in nanoseconds.
+        :type value: int
+        """
+
+        # values below _LINEAR_LIMIT are exact, larger ones keep their
+        # _SUB_BITS + 1 most significant bits (like HdrHistogram)
+        if value < _LINEAR_LIMIT:
+            index = value if value > 0 else 0
+        else:
+            shift = value.bit_length() - _SUB_BITS - 1
+            index = (shift << _SUB_BITS) + (value >> shift)
+            if index >= _BUCKETS:
+                index = _BUCKETS - 1
+
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def percentile(self, q):
+        """
+        percentile
+        ==========
+        Returns the q-th percentile of the recorded durations in nanoseconds,
+        as the middle of the bucket it falls in, or None if nothing was recorded.
+
+        Parameters
+        ----------
+        :param q: The percentile, between 0 and 100.
+        :type q: int | float
+
+        Return
+        ------
+        :return: The q-th percentile.
+        :rtype: int | None
+        """
+
+        with self._lock:
+            return self._percentiles((q,))[0]
+
+    def _percentiles(self, qs):
+        # finds every percentile of qs (sorted) in a single pass over the buckets
+        if not self.count:
+            return [None] * len(qs)
+
+        # the ranks of the percentiles, counting from 1
+        ranks = [max(1, -(-self.count * q // 100)) for q in qs]
+        results = []
+        seen = 0
+        for index, count in enumerate(self._counts):
+            if not count:
+                continue
+            seen += count
+            while len(results) < len(ranks) and seen >= ranks[len(results)]:
+                low, high = _bucket_bounds(index)
+                if seen == self.count:
+                    # the last bucket holds the max, which is known exactly
+                    results.append(self._max)
+                else:
+                    results.append(min(max((low + high) // 2, self._min), self._max))
+            if len(results) == len(ranks):
+                break
+
+        return results + [self._max] * (len(ranks) - len(results))
+
+    def summary(self, unit="ns", precision=3, reset=False):
+        """
+        summary
+        =======
+        Summarizes the recorded durations.
+
+        Parameters
+        ----------
+        :param unit: The unit of time to use, defaults to "ns".
+        :type unit: Literal["ns", "us", "ms", "s"], optional
+        :param precision: The precision to use when rounding the times, defaults to 3.
+        :type precision: int, optional
+        :param reset: Whether to forget the recorded durations in the same step,
+        so that no duration recorded concurrently is lost, defaults to False.
+        :type reset: bool, optional
+
+        Return
+        ------
+        :return: The count, and the mean, min, percentiles (see SUMMARY_PERCENTILES), and max
+        durations, which are None if nothing was recorded.
+        :rtype: Dict[str, int | float | None]
+        """
+
+        scale = _UNIT_SCALES[unit]
+
+        def convert(value):
+            return None if value is None else round(value / scale, precision)
+
+        with self._lock:
+            summary = {
+                "count": self.count,
+                "mean": convert(self.total / self.count if self.count else None),
+                "min": convert(self.min),
+            }
+            percentiles = self._percentiles(tuple(SUMMARY_PERCENTILES.values()))
+            for name, value in zip(SUMMARY_PERCENTILES, percentiles):
+                summary[name] = convert(value)
+            summary["max"] = convert(self.max)
+
+            if reset:
+                self._reset()
+
+        return summary
+
+    def reset(self):
+        """
+        reset
+        =====
+        Forgets every recorded duration.
+        """
+
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._counts = array("Q", bytes(8 * _BUCKETS))
+        self._min = _NO_MIN
+        self._max = _NO_MAX
+        self.count = 0
+        self.total = 0
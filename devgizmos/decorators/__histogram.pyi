@@ -0,0 +1,22 @@
+# pylint: disable=all
+
+from typing import Dict, Literal, Optional, Union
+
+SUMMARY_PERCENTILES: Dict[str, Union[int, float]]
+
+class LatencyHistogram:
+    count: int
+    total: int
+    min: Optional[int]
+    max: Optional[int]
+    def __init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    def record(self, value: int) -> None: ...
+    def percentile(self, q: Union[int, float]) -> Optional[int]: ...
+    def summary(
+        self,
+        unit: Literal["ns", "us", "ms", "s"] = "ns",
+        precision: int = 3,
+        reset: bool = False,
+    ) -> Dict[str, Optional[Union[int, float]]]: ...
+    def reset(self) -> None: ...
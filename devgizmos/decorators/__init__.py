@@ -6,18 +6,85 @@ Module containing decorators such as timer, retry, benchmark, etc.
 Built-in Utilizations
 ---------------------
 This module utilizes the following functionality from built-in modules/packages:
+array
+- array\n
 asyncio
+- Semaphore
+- current_task
+- ensure_future
+- gather
+- get_running_loop
+- shield
 - sleep\n
 collections
 - OrderedDict
+- namedtuple\n
+concurrent.futures
+- ProcessPoolExecutor
+- ThreadPoolExecutor
+- as_completed\n
+contextlib
+- ExitStack
+- contextmanager
+- nullcontext\n
+csv
+- DictReader
+- DictWriter\n
+fcntl (Unix)
+- LOCK_EX
+- LOCK_SH
+- LOCK_UN
+- flock\n
 functools
+- partial
+- update_wrapper
 - wraps\n
+gc
+- get_referents\n
+hashlib
+- blake2b\n
+heapq
+- heappop
+- heappush\n
+inspect
+- Parameter
+- iscoroutinefunction
+- signature\n
+itertools
+- count
+- repeat\n
+json
+- dump
+- load\n
 logging
 - ERROR
 - INFO
 - WARNING
 - Logger\n
+math
+- erfc
+- sqrt\n
+msvcrt (Windows)
+- LK_LOCK
+- LK_UNLCK
+- locking\n
+multiprocessing
+- resource_tracker
+- shared_memory.SharedMemory\n
+os
+- cpu_count
+- path\n
+pickle
+- HIGHEST_PROTOCOL
+- PicklingError
+- dumps
+- loads\n
 platform
+- machine
+- platform
+- processor
+- python_implementation
+- python_version
 - system\n
 re
 - findall\n
@@ -25,14 +92,40 @@ signal (Unix)
 - SIGALRM
 - alarm
 - signal\n
+sqlite3
+- connect\n
 statistics
-- mean\n
-threading (Windows)
+- mean
+- median
+- stdev\n
+struct
+- Struct\n
+sys
+- getsizeof\n
+tempfile
+- gettempdir\n
+threading
+- Event
+- Lock
 - Thread\n
 time
+- monotonic
 - perf_counter
 - perf_counter_ns
-- sleep\n
+- sleep
+- time\n
+tracemalloc
+- Filter
+- get_traced_memory
+- is_tracing
+- reset_peak
+- start
+- stop
+- take_snapshot\n
+types
+- FunctionType
+- GeneratorType
+- ModuleType\n
 typing
 - Any
 - Callable
@@ -40,9 +133,25 @@ typing
 - Union
 - get_type_hints\n
 warnings
-- warn
+- warn\n
+weakref
+- WeakSet
+- ref
 """
 
+from .__backends import DiskStore, SharedMemoryStore
+from .__benchmarking import (
+    BASELINE_VERSION,
+    BenchmarkResult,
+    Comparison,
+    RegressionWarning,
+    check_baseline,
+    compare,
+    environment,
+    load_baseline,
+    save_baseline,
+)
+from .__caching import CacheInfo, invalidate_tag
 from .__decorators import (
     ConditionError,
     UnsupportedOSError,
@@ -50,6 +159,8 @@ from .__decorators import (
     benchmark,
     benchmark_rs,
     cache,
+    cache_batch,
+    cache_method,
     conditional,
     decorate_all_methods,
     deprecated,
@@ -66,3 +177,4 @@ from .__decorators import (
     tracer,
     type_checker,
 )
+from .__histogram import LatencyHistogram
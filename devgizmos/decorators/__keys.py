@@ -0,0 +1,368 @@
+"""
+decorators.__keys
+=================
+Module containing the key builders used by the cache decorators.
+"""
+
+# --imports-- #
+from hashlib import blake2b
+from inspect import Parameter, signature
+
+# --consts-- #
+# below this many values, hashing a plain tuple on each lookup
+# is cheaper than building a _HashedKey
+_HASHED_MIN_LENGTH = 8
+_POSITIONAL = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+_VARIADIC = (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+# types that are hashable and never need converting by the key strategies
+_ATOMIC = frozenset((int, float, str, bool, type(None)))
+
+
+# --keys-- #
+class _HashedKey(list):
+    """
+    _HashedKey
+    ==========
+    A cache key that computes its hash once, since a single call hashes its key several times.
+    Only used for keys with many values, where hashing is expensive.
+    """
+
+    __slots__ = ("hashvalue",)
+
+    def __init__(self, values, hash=hash):  # pylint: disable=redefined-builtin
+        self[:] = values
+        self.hashvalue = hash(values)
+
+    def __hash__(self):
+        return self.hashvalue
+
+    def __reduce__(self):
+        # pickle as a plain tuple so digests do not depend on the per-process hash seed
+        return tuple, (tuple(self),)
+
+
+class _IdentityKey:
+    """
+    _IdentityKey
+    ============
+    A cache key standing for a mutable object by identity, plus its version attribute if it has one,
+    so that objects which count their own mutations are recomputed after each change.
+    The key holds a reference to the object, so its id cannot be reused while it is cached.
+    """
+
+    __slots__ = ("obj", "version", "hashvalue")
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.version = getattr(obj, "version", None)
+        self.hashvalue = hash((id(obj), self.version))
+
+    def __hash__(self):
+        return self.hashvalue
+
+    def __eq__(self, other):
+        return (
+            type(other) is _IdentityKey
+            and other.obj is self.obj
+            and other.version == self.version
+        )
+
+    def __reduce__(self):
+        # identities are meaningless in other processes, so these keys are never sent to a backend
+        raise TypeError("identity keys cannot be pickled")
+
+
+# --strategies-- #
+def _stable_order(value):
+    # a sort key for values that cannot be compared with each other
+    return (type(value).__module__, type(value).__qualname__, repr(value))
+
+
+def _canonical(values, by=None):
+    # sorts values into a tuple whose order, unlike a frozenset's, depends neither on insertion
+    # order nor on the per-process hash seed, so keys pickle and digest the same in every process
+    try:
+        return tuple(sorted(values, key=by))
+    except TypeError:
+        if by is None:
+            return tuple(sorted(values, key=_stable_order))
+        return tuple(sorted(values, key=lambda item: _stable_order(by(item))))
+
+
+def _first(item):
+    return item[0]
+
+
+def _convert(value, leaf):
+    # recursively replaces lists, dicts, and sets with hashable equivalents tagged with their type
+    # (so that [1, 2] and (1, 2) do not share a key), applying leaf to every other value
+    if type(value) in _ATOMIC:
+        return value
+    if isinstance(value, tuple):
+        return tuple([_convert(item, leaf) for item in value])
+    if isinstance(value, list):
+        return (type(value), tuple([_convert(item, leaf) for item in value]))
+    if isinstance(value, dict):
+        items = _canonical(((k, _convert(v, leaf)) for k, v in value.items()), _first)
+        return (type(value), items)
+    if isinstance(value, (set, frozenset)):
+        return (type(value), _canonical(_convert(item, leaf) for item in value))
+    return leaf(value)
+
+
+def _unchanged(value):
+    return value
+
+
+def _freeze(value):
+    """
+    _freeze
+    =======
+    Converts lists, dicts, and sets, including nested ones, into hashable tuples,
+    sorting the items of dicts and sets.
+    """
+
+    return _convert(value, _unchanged)
+
+
+def _digest_buffer(value):
+    # buffer objects (bytes, bytearray, memoryview, array, numpy arrays, etc.) are replaced by
+    # their type, format, shape, and a digest of their contents, so large buffers
+    # are neither kept alive by the cache nor compared byte by byte on every hit
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return value
+
+    with view:
+        try:
+            digest = blake2b(view, digest_size=16).digest()
+        except BufferError:
+            # non contiguous buffers must be copied first
+            digest = blake2b(view.tobytes(), digest_size=16).digest()
+        return (type(value), view.format, view.shape, digest)
+
+
+def _digest(value):
+    """
+    _digest
+    =======
+    Like _freeze, but also replaces buffer objects by a blake2 digest of their contents.
+    """
+
+    return _convert(value, _digest_buffer)
+
+
+def _identity(value):
+    """
+    _identity
+    =========
+    Replaces unhashable values by an _IdentityKey, leaving hashable values as is.
+    """
+
+    try:
+        hash(value)
+    except TypeError:
+        return _IdentityKey(value)
+    return value
+
+
+KEY_STRATEGIES = {
+    "freeze": _freeze,
+    "digest": _digest,
+    "identity": _identity,
+}
+
+
+# --builders-- #
+class _Unbound:
+    """
+    _Unbound
+    ========
+    Marks the keys of calls whose arguments do not bind to the function's signature.
+    """
+
+
+class _Default:
+    """
+    _Default
+    ========
+    Stands in the keys for the unhashable default of a parameter, such as opts=[].
+    """
+
+
+def _key_default(param):
+    # the default of param as it appears in keys, so that calls relying on it share a key
+    # with calls passing an equal value; unhashable defaults are replaced by a tag naming param,
+    # which pickles the same in every process
+    try:
+        hash(param.default)
+    except TypeError:
+        return (_Default, param.name)
+    return param.default
+
+
+def _unbound_key(args, kwargs):
+    # tagged with a class rather than an object() so the key pickles the same in every process
+    return (_Unbound, args, tuple(kwargs.items()))
+
+
+def _make_key_builder(func, type_specific=False, method=False, key=None):
+    """
+    _make_key_builder
+    =================
+    Creates a function that builds cache keys for calls to func.
+    The arguments are bound against func's signature once, so calls such as
+    f(1, 2), f(1, b=2), f(b=2, a=1), and f(1) (if b defaults to 2) share a key.
+
+    Parameters
+    ----------
+    :param func: The function the keys are built for.
+    :type func: Callable[..., Any]
+    :param type_specific: Whether to include the type of each argument in the key, defaults to False.
+    :type type_specific: bool, optional
+    :param method: Whether the first parameter of func (such as self) is not passed
+    to the builder and is left out of the key, defaults to False.
+    :type method: bool, optional
+    :param key: How to convert the arguments before building the key, defaults to None.
+    - Enter the name of a strategy from KEY_STRATEGIES to convert each argument with it.
+    - Enter a callable taking the same arguments as func (without self for methods)
+    to use its return value as the key.\n
+    :type key: str | Callable[..., Hashable] | None, optional
+
+    Return
+    ------
+    :return: A function taking args and kwargs and returning a hashable key.
+    :rtype: Callable[[Tuple[Any, ...], Dict[str, Any]], Hashable]
+    """
+
+    if callable(key):
+        return lambda args, kwargs: key(*args, **kwargs)
+
+    if key is not None:
+        build = _make_key_builder(func, type_specific, method)
+        convert = KEY_STRATEGIES[key]
+
+        def build_converted(args, kwargs):
+            args = tuple([convert(value) for value in args])
+            if kwargs:
+                kwargs = {name: convert(value) for name, value in kwargs.items()}
+            return build(args, kwargs)
+
+        return build_converted
+
+    # single atomic args can be used as the key directly, since they never equal a tuple key;
+    # when keys are type specific, only str and int are, since equal bools and floats
+    # would share the key of an int
+    fast_types = frozenset((str, int)) if type_specific else _ATOMIC
+
+    def finish(values):
+        if len(values) == 1 and type(values[0]) in fast_types:
+            return values[0]
+
+        if type_specific:
+            values += tuple(type(value) for value in values)
+        if len(values) < _HASHED_MIN_LENGTH:
+            return values
+        return _HashedKey(values)
+
+    try:
+        params = list(signature(func).parameters.values())
+    except (TypeError, ValueError):
+        params = None
+
+    if params and method and params[0].kind in _POSITIONAL:
+        params = params[1:]
+
+    # without a signature, fall back to an order independent key
+    if params is None:
+
+        def build_unbound(args, kwargs):
+            if kwargs:
+                items = tuple(sorted(kwargs.items()))
+                if type_specific:
+                    items += tuple(type(value) for _, value in items)
+                return (finish(args), items)
+            return finish(args)
+
+        return build_unbound
+
+    # every named parameter gets a slot in the key, positional ones first
+    named = [p for p in params if p.kind not in _VARIADIC]
+    slots = {
+        p.name: index
+        for index, p in enumerate(named)
+        if p.kind != Parameter.POSITIONAL_ONLY
+    }
+    defaults = tuple(_key_default(p) for p in named)
+    positional = sum(p.kind in _POSITIONAL for p in named)
+    var_args = any(p.kind == Parameter.VAR_POSITIONAL for p in params)
+    var_kwargs = any(p.kind == Parameter.VAR_KEYWORD for p in params)
+    simple = len(named) == positional and not var_args and not var_kwargs
+    # whether every parameter can be passed by keyword, so kwargs can fill the slots by name
+    keywords = simple and len(slots) == positional
+    # the names of the parameters after the first n, by n
+    trailing = tuple(tuple(p.name for p in named[n:]) for n in range(positional + 1))
+    # whether finish returns keys of every parameter unchanged
+    plain = not type_specific and 1 < positional < _HASHED_MIN_LENGTH
+
+    def build_single(args, kwargs):
+        # fast path: the only parameter passed positionally as an atomic value
+        if not kwargs and len(args) == 1 and type(args[0]) in fast_types:
+            return args[0]
+        return build_simple(args, kwargs)
+
+    def build_simple(args, kwargs):
+        # fast path: every parameter passed positionally, so args can be reused as is
+        if not kwargs:
+            if len(args) == positional:
+                return args if plain else finish(args)
+        # fast path: every parameter passed once, the trailing ones by keyword in order
+        elif (
+            keywords
+            and len(args) + len(kwargs) == positional
+            and tuple(kwargs) == trailing[len(args)]
+        ):
+            values = args + tuple(kwargs.values())
+            return values if plain else finish(values)
+        return build(args, kwargs)
+
+    def build(args, kwargs):
+        nargs = len(args)
+
+        # calls that could not bind keep their raw arguments as the key,
+        # so they miss and the call raises its TypeError instead of sharing a valid call's key
+        if nargs > positional and not var_args:
+            return _unbound_key(args, kwargs)
+
+        values = list(args[:positional])
+        filled = len(values)
+        values.extend(defaults[filled:])
+        extra_kwargs = []
+
+        for name, value in kwargs.items():
+            index = slots.get(name)
+            if index is None:
+                if not var_kwargs:
+                    return _unbound_key(args, kwargs)
+                extra_kwargs.append((name, value))
+            elif index < filled:
+                return _unbound_key(args, kwargs)
+            else:
+                values[index] = value
+
+        if not (var_args or var_kwargs):
+            return finish(tuple(values))
+
+        values = finish(tuple(values))
+        extra_args = args[positional:]
+        extra_kwargs = tuple(sorted(extra_kwargs))
+        if type_specific:
+            extra_args += tuple(type(value) for value in extra_args)
+            extra_kwargs += tuple(type(value) for _, value in extra_kwargs)
+
+        return (values, extra_args, extra_kwargs)
+
+    if simple and positional == 1:
+        return build_single
+    return build_simple if simple else build
@@ -0,0 +1,330 @@
+"""
+decorators.__policies
+=====================
+Module containing the eviction policies used by the cache decorators.
+
+Every policy tracks the keys of a store and exposes the same methods:
+- hit(key): Records an access to a stored key.
+- add(key): Records the insertion of a new key.
+- remove(key): Forgets a key removed by the store (expired, invalidated, etc.).
+- evict(): Chooses a key to evict, forgets it, and returns it.
+- clear(): Forgets every key.
+"""
+
+# --imports-- #
+from array import array
+from collections import OrderedDict
+
+
+# --policies-- #
+class _LRUPolicy:
+    """
+    _LRUPolicy
+    ==========
+    Evicts the least recently used key.
+    """
+
+    __slots__ = ("_order", "hit")
+
+    def __init__(self, capacity=None):
+        # pylint: disable=unused-argument
+        self._order = OrderedDict()
+        # bound directly to skip a python level call on every hit
+        self.hit = self._order.move_to_end
+
+    def __len__(self):
+        return len(self._order)
+
+    def add(self, key):
+        """
+        add
+        ===
+        Records the insertion of a new key.
+        """
+
+        self._order[key] = None
+
+    def remove(self, key):
+        """
+        remove
+        ======
+        Forgets a key removed by the store.
+        """
+
+        del self._order[key]
+
+    def evict(self):
+        """
+        evict
+        =====
+        Forgets and returns the least recently used key.
+        """
+
+        return self._order.popitem(last=False)[0]
+
+    def clear(self):
+        """
+        clear
+        =====
+        Forgets every key.
+        """
+
+        self._order.clear()
+
+
+class _LFUPolicy:
+    """
+    _LFUPolicy
+    ==========
+    Evicts the least frequently used key, breaking ties by least recent use.
+    All operations are O(1) using buckets of keys grouped by frequency.
+    """
+
+    __slots__ = ("_freqs", "_buckets", "_min_freq")
+
+    def __init__(self, capacity=None):
+        # pylint: disable=unused-argument
+        self._freqs = {}
+        self._buckets = {}
+        self._min_freq = 0
+
+    def __len__(self):
+        return len(self._freqs)
+
+    def _unlink(self, key, freq):
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+
+    def hit(self, key):
+        """
+        hit
+        ===
+        Records an access to a stored key.
+        """
+
+        freq = self._freqs[key]
+        self._unlink(key, freq)
+        if freq == self._min_freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+
+        self._freqs[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def add(self, key):
+        """
+        add
+        ===
+        Records the insertion of a new key.
+        """
+
+        self._freqs[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def remove(self, key):
+        """
+        remove
+        ======
+        Forgets a key removed by the store.
+        """
+
+        self._unlink(key, self._freqs.pop(key))
+
+    def evict(self):
+        """
+        evict
+        =====
+        Forgets and returns the least frequently used key.
+        """
+
+        # the minimum can go stale when keys are removed externally
+        if self._min_freq not in self._buckets:
+            self._min_freq = min(self._buckets)
+
+        key = next(iter(self._buckets[self._min_freq]))
+        self.remove(key)
+        return key
+
+    def clear(self):
+        """
+        clear
+        =====
+        Forgets every key.
+        """
+
+        self._freqs.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+
+class _FrequencySketch:
+    """
+    _FrequencySketch
+    ================
+    A count-min sketch of 4 bit counters estimating how often keys were seen recently.
+    Counters are halved periodically so that old popularity fades away.
+    """
+
+    __slots__ = ("_table", "_mask", "_additions", "_sample_size")
+
+    _SEEDS = (0x97CB3127, 0xB2A5EF1D, 0xC2B2AE35, 0x85EBCA6B)
+
+    def __init__(self, capacity):
+        width = 16
+        while width < capacity:
+            width <<= 1
+
+        self._table = array("B", bytes(width * len(self._SEEDS)))
+        self._mask = width - 1
+        self._additions = 0
+        self._sample_size = 10 * width
+
+    def _indexes(self, key):
+        hashed = hash(key)
+        width = self._mask + 1
+        for row, seed in enumerate(self._SEEDS):
+            mixed = ((hashed ^ seed) * 0x9E3779B1) & 0xFFFFFFFF
+            yield row * width + ((mixed ^ (mixed >> 15)) & self._mask)
+
+    def increment(self, key):
+        """
+        increment
+        =========
+        Records an occurrence of key.
+        """
+
+        table = self._table
+        for index in self._indexes(key):
+            if table[index] < 15:
+                table[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._table = array("B", (count >> 1 for count in table))
+            self._additions //= 2
+
+    def frequency(self, key):
+        """
+        frequency
+        =========
+        Returns the estimated number of recent occurrences of key.
+        """
+
+        table = self._table
+        return min(table[index] for index in self._indexes(key))
+
+
+class _TinyLFUPolicy:
+    """
+    _TinyLFUPolicy
+    ==============
+    Window TinyLFU, a scan resistant policy.
+    New keys enter a small LRU window and overflow into the probation segment of a main
+    segmented LRU. When the cache is full, the newest probation key only stays if it has been
+    seen more often recently than the oldest one, so one-off keys from a scan never flush the hot set.
+    """
+
+    __slots__ = ("_sketch", "_window", "_probation", "_protected")
+
+    def __init__(self, capacity=None):
+        self._sketch = _FrequencySketch(capacity or 1024)
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+
+    def __len__(self):
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def hit(self, key):
+        """
+        hit
+        ===
+        Records an access to a stored key.
+        """
+
+        self._sketch.increment(key)
+
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        else:
+            # promote from probation, demoting the oldest protected key
+            # if protected outgrows 80% of the main segment
+            del self._probation[key]
+            self._protected[key] = None
+
+            main = len(self._probation) + len(self._protected)
+            if len(self._protected) > main * 4 // 5:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+
+    def add(self, key):
+        """
+        add
+        ===
+        Records the insertion of a new key.
+        """
+
+        self._sketch.increment(key)
+        self._window[key] = None
+
+        # the window holds about 1% of the keys, overflowing
+        # into probation where keys compete for admission
+        if len(self._window) > max(1, len(self) // 100):
+            candidate, _ = self._window.popitem(last=False)
+            self._probation[candidate] = None
+
+    def remove(self, key):
+        """
+        remove
+        ======
+        Forgets a key removed by the store.
+        """
+
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def evict(self):
+        """
+        evict
+        =====
+        Forgets and returns either the newest probation key (the latest candidate from the window)
+        or the oldest probation key (the victim), whichever has been seen less often recently.
+        """
+
+        if len(self._probation) < 2:
+            segment = self._probation or self._protected or self._window
+            return segment.popitem(last=False)[0]
+
+        candidate = next(reversed(self._probation))
+        victim = next(iter(self._probation))
+
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            del self._probation[victim]
+            return victim
+
+        del self._probation[candidate]
+        return candidate
+
+    def clear(self):
+        """
+        clear
+        =====
+        Forgets every key.
+        """
+
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+
+
+POLICIES = {
+    "lru": _LRUPolicy,
+    "lfu": _LFUPolicy,
+    "tinylfu": _TinyLFUPolicy,
+}
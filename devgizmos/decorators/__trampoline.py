@@ -0,0 +1,15 @@
+"""
+decorators.__trampoline
+=======================
+Module containing the calls made by memory benchmarks. They live apart from the measuring code,
+whose allocations are filtered out, since tracemalloc attributes the allocations
+of functions implemented in C to the calling frame.
+"""
+
+
+def _call(func, args, kwargs):
+    return func(*args, **kwargs)
+
+
+async def _call_async(func, args, kwargs):
+    return await func(*args, **kwargs)
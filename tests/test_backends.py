@@ -0,0 +1,92 @@
+import subprocess
+import sys
+from os import path
+from uuid import uuid4
+
+from devgizmos.decorators import SharedMemoryStore
+from devgizmos.decorators.__backends import _digest
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def test_digest_ignores_object_identity():
+    a = "".join(["ten", "ant"])
+    b = "".join(["te", "nant"])
+    assert a == b and a is not b
+    assert _digest((a, a)) == _digest((a, b))
+
+
+def test_digest_ignores_frozenset_order():
+    assert _digest((frozenset({"x", "y", "z"}), 1)) == _digest((frozenset({"z", "y", "x"}), 1))
+
+
+def test_digest_is_stable_across_hash_seeds():
+    code = (
+        "from devgizmos.decorators.__backends import _digest\n"
+        "from devgizmos.decorators.__keys import _freeze\n"
+        "key = (_freeze({'a': 1, 'b': {1, 2, 'x'}}), frozenset({'p', 'q', 'r'}), 'tenant')\n"
+        "print(_digest(key).hex())\n"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            env={"PYTHONHASHSEED": seed, "PYTHONPATH": ROOT},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(digests) == 1
+
+
+def test_unpicklable_keys_have_no_digest():
+    assert _digest((lambda: None,)) is None
+
+
+def _run(code, *args):
+    return subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=ROOT,
+        env={"PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+_LOAD = (
+    "import sys\n"
+    "from devgizmos.decorators import DiskStore, cache\n"
+    "@cache(backend=DiskStore(sys.argv[1]), tags=lambda tenant: f'tenant:{tenant}')\n"
+    "def load(tenant):\n"
+    "    return f'data v{sys.argv[2]}'\n"
+)
+
+
+def test_disk_store_tags_are_invalidated_across_processes(tmp_path):
+    db = str(tmp_path / "cache.db")
+    assert _run(_LOAD + "print(load(1), load(2))", db, "1") == "data v1 data v1"
+    assert _run(_LOAD + "print(load.invalidate('tenant:1'))", db, "2") == "1"
+    assert _run(_LOAD + "print(load(1), load(2))", db, "2") == "data v2 data v1"
+
+
+def test_shared_memory_store_deletes_by_tag():
+    store = SharedMemoryStore(f"dgz-test-{uuid4().hex[:8]}", size=4096, slots=16)
+    try:
+        a, b = _digest("a"), _digest("b")
+        assert store.set("ns", _digest(1), b"one", tags=(a,))
+        assert store.set("ns", _digest(2), "two", tags=(a, b))
+        assert store.set("ns", _digest(3), "three", tags=(b,))
+        assert store.set("other", _digest(1), "one", tags=(a,))
+
+        assert store.get("ns", _digest(1))[0] == b"one"
+        assert store.delete_tagged("ns", a) == 2
+        assert store.get("ns", _digest(1)) is None
+        assert store.get("ns", _digest(2)) is None
+        assert store.get("ns", _digest(3))[0] == "three"
+        assert store.get("other", _digest(1))[0] == "one"
+    finally:
+        store.close()
+        store.unlink()
@@ -0,0 +1,33 @@
+from devgizmos.decorators import cache, cache_method
+
+
+def test_generator_results_are_replayed():
+    calls = []
+
+    @cache()
+    def count_to(n):
+        calls.append(n)
+        yield from range(n)
+
+    assert list(count_to(3)) == [0, 1, 2]
+    assert list(count_to(3)) == [0, 1, 2]
+    assert calls == [3]
+
+
+def test_generator_methods_are_replayed():
+    class Counter:
+        def __init__(self):
+            self.calls = 0
+
+        @cache_method()
+        def count_to(self, n):
+            self.calls += 1
+            yield from range(n)
+
+    counter = Counter()
+    first = counter.count_to(3)
+    second = counter.count_to(3)
+    assert list(first) == [0, 1, 2]
+    assert list(second) == [0, 1, 2]
+    assert list(counter.count_to(3)) == [0, 1, 2]
+    assert counter.calls == 1
@@ -0,0 +1,61 @@
+from devgizmos.decorators import cache
+
+
+def test_unhashable_positional_default():
+    calls = []
+
+    @cache()
+    def f(a, opts=[]):  # pylint: disable=dangerous-default-value
+        calls.append(a)
+        return a + len(opts)
+
+    assert f(1) == 1
+    assert f(1) == 1
+    assert f(a=1) == 1
+    assert calls == [1]
+
+
+def test_unhashable_keyword_only_default():
+    calls = []
+
+    @cache()
+    def f(a, *, flags={}):  # pylint: disable=dangerous-default-value
+        calls.append(a)
+        return a + len(flags)
+
+    assert f(2) == 2
+    assert f(2) == 2
+    assert calls == [2]
+
+
+def test_unhashable_default_with_key_strategy():
+    @cache(key="freeze")
+    def f(a, opts=[]):  # pylint: disable=dangerous-default-value
+        return len(a) + len(opts)
+
+    assert f([1, 2]) == 2
+    assert f([1, 2], opts=[3]) == 3
+    assert f.cache_info().currsize == 2
+
+
+def test_single_atomic_args_are_used_as_keys():
+    @cache()
+    def f(a):
+        return a
+
+    assert f(1) == 1
+    assert f(1.0) == 1
+    assert f(True) == 1
+    assert f(None) is None
+    assert f.cache_info().currsize == 2
+
+
+def test_type_specific_single_args():
+    @cache(type_specific=True)
+    def f(a):
+        return a
+
+    assert f(1) == 1
+    assert f(1.0) == 1.0
+    assert f(True) is True
+    assert f.cache_info().currsize == 3